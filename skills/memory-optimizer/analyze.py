@@ -9,22 +9,48 @@ import os
 import sys
 import re
 import json
+import zlib
+import math
+import random
 import argparse
+from array import array
 from datetime import datetime, timedelta
 from pathlib import Path
 from difflib import SequenceMatcher
-from collections import defaultdict
+from collections import defaultdict, Counter
+
+try:
+    import numpy as np  # optional: speeds up topic clustering
+except ImportError:
+    np = None
 
 VERSION = "1.0.0"
 STALE_DAYS = 30  # entries older than this are flagged
 
+# Topic clustering (consolidation candidates)
+CLUSTER_DIM = 1024           # hashed bag-of-words vector size
+CLUSTER_BATCH = 1024         # mini-batch size; bounds memory regardless of entry count
+CLUSTER_MAX_K = 256
+CLUSTER_MAX_K_PYTHON = 64    # fewer clusters when NumPy is missing, to keep runtime sane
+CLUSTER_MAX_STEPS = 200
+CLUSTER_MIN_SIZE = 3         # members needed to suggest a consolidation
+CLUSTER_MIN_COHESION = 0.5   # mean cosine similarity of members to their centroid
+UNCLUSTERED = -1             # label of entries with no features (too short, only stopwords)
+STOPWORDS = frozenset('the and for with that this from are was were have has had not but you your '
+                      'all any can will into its our out about been than then them they when what '
+                      'which who how also just more some only over such'.split())
+
 class MemoryAnalyzer:
-    def __init__(self, workspace_path, verbose=False):
+    def __init__(self, workspace_path, verbose=False, quiet=False, progress=None, cache=None):
         self.workspace = Path(workspace_path)
         self.verbose = verbose
+        self.quiet = quiet          # suppress all console output (library use)
+        self.progress = progress    # optional callback(stage, step, total)
+        self.cache = cache          # optional api.Workspace reusing parsed files between runs
         self.files = {}          # path -> content
         self.entries = []        # all extracted entries
         self.headings = []       # heading structure
+        self.clusters = []       # consolidation candidates
         self.issues = {
             'critical': [],
             'warning': [],
@@ -38,8 +64,16 @@ class MemoryAnalyzer:
             'stale_entries': 0,
             'missing_indexes': 0,
             'structure_issues': 0,
+            'consolidation_candidates': 0,
+            'consolidation_bytes': 0,
+            'unclustered_entries': 0,
         }
 
+    def _log(self, message=''):
+        """Print a status line unless running quietly."""
+        if not self.quiet:
+            print(message)
+
     def discover_files(self):
         """Find all memory-related markdown files."""
         patterns = [
@@ -68,7 +102,10 @@ class MemoryAnalyzer:
         files = self.discover_files()
         for f in files:
             try:
-                content = f.read_text(encoding='utf-8', errors='replace')
+                if self.cache is not None:
+                    content = self.cache.read(f)
+                else:
+                    content = f.read_text(encoding='utf-8', errors='replace')
                 self.files[str(f)] = content
                 self.stats['files_scanned'] += 1
                 self.stats['total_bytes'] += len(content.encode('utf-8'))
@@ -76,57 +113,69 @@ class MemoryAnalyzer:
                 self.issues['warning'].append(f"Could not read {f}: {e}")
         
         if self.verbose:
-            print(f"  Loaded {len(self.files)} files ({self.stats['total_bytes'] / 1024:.1f} KB)")
+            self._log(f"  Loaded {len(self.files)} files ({self.stats['total_bytes'] / 1024:.1f} KB)")
 
     def extract_entries(self):
         """Extract individual entries from all files."""
         for filepath, content in self.files.items():
-            lines = content.split('\n')
-            current_heading = ""
-            current_entry = []
-            entry_line = 0
+            if self.cache is not None:
+                entries, headings = self.cache.parsed(filepath, lambda: self.parse_file(filepath, content))
+            else:
+                entries, headings = self.parse_file(filepath, content)
+            self.entries.extend(entries)
+            self.headings.extend(headings)
             
-            for i, line in enumerate(lines):
-                # Track headings
-                heading_match = re.match(r'^(#{1,6})\s+(.+)', line)
-                if heading_match:
-                    level = len(heading_match.group(1))
-                    title = heading_match.group(2).strip()
-                    self.headings.append({
+        self.stats['total_entries'] = len(self.entries)
+        if self.verbose:
+            self._log(f"  Extracted {len(self.entries)} entries")
+
+    @staticmethod
+    def parse_file(filepath, content):
+        """Extract (entries, headings) from one file's content."""
+        entries = []
+        headings = []
+        lines = content.split('\n')
+        current_heading = ""
+        
+        for i, line in enumerate(lines):
+            # Track headings
+            heading_match = re.match(r'^(#{1,6})\s+(.+)', line)
+            if heading_match:
+                level = len(heading_match.group(1))
+                title = heading_match.group(2).strip()
+                headings.append({
+                    'file': filepath,
+                    'line': i + 1,
+                    'level': level,
+                    'title': title
+                })
+                current_heading = title
+            
+            # Extract list items as entries
+            list_match = re.match(r'^[\s]*[-*+]\s+(.+)', line)
+            if list_match:
+                entry_text = list_match.group(1).strip()
+                if len(entry_text) > 10:  # Skip trivial entries
+                    entries.append({
+                        'text': entry_text,
                         'file': filepath,
                         'line': i + 1,
-                        'level': level,
-                        'title': title
+                        'heading': current_heading,
+                        'type': 'list_item'
                     })
-                    current_heading = title
-                
-                # Extract list items as entries
-                list_match = re.match(r'^[\s]*[-*+]\s+(.+)', line)
-                if list_match:
-                    entry_text = list_match.group(1).strip()
-                    if len(entry_text) > 10:  # Skip trivial entries
-                        self.entries.append({
-                            'text': entry_text,
-                            'file': filepath,
-                            'line': i + 1,
-                            'heading': current_heading,
-                            'type': 'list_item'
-                        })
-                
-                # Extract paragraph blocks (non-heading, non-list, non-empty)
-                elif line.strip() and not heading_match and not line.strip().startswith(('```', '|', '---', '===')):
-                    if len(line.strip()) > 20:
-                        self.entries.append({
-                            'text': line.strip(),
-                            'file': filepath,
-                            'line': i + 1,
-                            'heading': current_heading,
-                            'type': 'paragraph'
-                        })
             
-        self.stats['total_entries'] = len(self.entries)
-        if self.verbose:
-            print(f"  Extracted {len(self.entries)} entries")
+            # Extract paragraph blocks (non-heading, non-list, non-empty)
+            elif line.strip() and not heading_match and not line.strip().startswith(('```', '|', '---', '===')):
+                if len(line.strip()) > 20:
+                    entries.append({
+                        'text': line.strip(),
+                        'file': filepath,
+                        'line': i + 1,
+                        'heading': current_heading,
+                        'type': 'paragraph'
+                    })
+        
+        return entries, headings
 
     def detect_duplicates(self, threshold=0.80):
         """Find duplicate entries using fuzzy matching."""
@@ -382,6 +431,211 @@ class MemoryAnalyzer:
         
         return missing
 
+    def _entry_features(self, text):
+        """Hashed bag-of-words features of an entry: {dimension: count}."""
+        features = {}
+        for word in re.findall(r'\b[^\W\d_]{3,}\b', text.lower()):
+            if word in STOPWORDS:
+                continue
+            dim = zlib.crc32(word.encode('utf-8')) % CLUSTER_DIM
+            features[dim] = features.get(dim, 0) + 1
+        return features
+
+    def _tfidf(self, features, idf):
+        """Weight features by idf and L2-normalize; returns (dims, weights)."""
+        dims = list(features)
+        weights = [features[d] * idf[d] for d in dims]
+        norm = math.sqrt(sum(w * w for w in weights)) or 1.0
+        return dims, [w / norm for w in weights]
+
+    def _kmeans_numpy(self, idf, k, rnd, featured):
+        """Mini-batch k-means over hashed vectors using NumPy.
+
+        Centroids are seeded and trained from `featured` (indices of entries
+        with any features); featureless entries are labelled UNCLUSTERED.
+        """
+        n = len(self.entries)
+        idf_arr = np.asarray(idf, dtype=np.float32)
+
+        def vectorize(indices):
+            batch = np.zeros((len(indices), CLUSTER_DIM), dtype=np.float32)
+            for row, i in enumerate(indices):
+                for dim, count in self._entry_features(self.entries[i]['text']).items():
+                    batch[row, dim] = count
+            batch *= idf_arr
+            norms = np.linalg.norm(batch, axis=1, keepdims=True)
+            norms[norms == 0] = 1.0
+            return batch / norms
+
+        centroids = vectorize(rnd.sample(featured, k))
+        counts = np.zeros(k, dtype=np.float64)
+        m = len(featured)
+        steps = min(CLUSTER_MAX_STEPS, max(10, 3 * math.ceil(m / CLUSTER_BATCH)))
+        for _ in range(steps):
+            batch = vectorize(rnd.sample(featured, min(CLUSTER_BATCH, m)))
+            scores = batch @ centroids.T - 0.5 * (centroids * centroids).sum(axis=1)
+            labels = scores.argmax(axis=1)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, labels, batch)
+            members = np.bincount(labels, minlength=k).astype(np.float64)
+            hit = members > 0
+            new_counts = counts + members
+            centroids[hit] = ((centroids[hit] * counts[hit, None] + sums[hit])
+                              / new_counts[hit, None]).astype(np.float32)
+            counts = new_counts
+
+        # Final assignment pass, batch by batch
+        unit = centroids / np.maximum(np.linalg.norm(centroids, axis=1, keepdims=True), 1e-12)
+        labels_out = array('i')
+        sims_out = array('f')
+        for start in range(0, n, CLUSTER_BATCH):
+            batch = vectorize(range(start, min(start + CLUSTER_BATCH, n)))
+            sims = batch @ unit.T
+            labels = sims.argmax(axis=1)
+            best = sims[np.arange(len(labels)), labels]
+            labels[~batch.any(axis=1)] = UNCLUSTERED
+            labels_out.extend(labels.tolist())
+            sims_out.extend(best.tolist())
+        return labels_out, sims_out
+
+    def _kmeans_python(self, idf, k, rnd, featured):
+        """Pure-Python mini-batch k-means (sequential updates on sparse vectors).
+
+        Centroids are stored as scale * values so that each update only
+        touches the entry's non-zero dimensions. As in _kmeans_numpy, only
+        `featured` entries train the centroids and featureless entries are
+        labelled UNCLUSTERED.
+        """
+        n = len(self.entries)
+        vectorize = lambda i: self._tfidf(self._entry_features(self.entries[i]['text']), idf)
+
+        values, scales, sq_norms, counts = [], [1.0] * k, [], [0] * k
+        for i in rnd.sample(featured, k):
+            dims, weights = vectorize(i)
+            c = [0.0] * CLUSTER_DIM
+            for d, w in zip(dims, weights):
+                c[d] = w
+            values.append(c)
+            sq_norms.append(sum(w * w for w in weights))
+
+        def nearest(dims, weights):
+            best, best_score, best_dot = 0, None, 0.0
+            for c in range(k):
+                vals = values[c]
+                dot = scales[c] * sum(vals[d] * w for d, w in zip(dims, weights))
+                score = dot - 0.5 * sq_norms[c]
+                if best_score is None or score > best_score:
+                    best, best_score, best_dot = c, score, dot
+            return best, best_dot
+
+        m = len(featured)
+        steps = min(CLUSTER_MAX_STEPS, max(10, 3 * math.ceil(m / CLUSTER_BATCH)))
+        for _ in range(steps):
+            for i in rnd.sample(featured, min(CLUSTER_BATCH, m)):
+                dims, weights = vectorize(i)
+                c, dot = nearest(dims, weights)
+                counts[c] += 1
+                eta = 1.0 / counts[c]
+                keep = 1.0 - eta
+                sq_norms[c] = keep * keep * sq_norms[c] + 2 * keep * eta * dot + eta * eta
+                if keep == 0.0:
+                    values[c] = [0.0] * CLUSTER_DIM
+                    scales[c] = 1.0
+                else:
+                    scales[c] *= keep
+                vals, scale = values[c], scales[c]
+                for d, w in zip(dims, weights):
+                    vals[d] += eta * w / scale
+                if scale < 1e-9:
+                    values[c] = [v * scale for v in vals]
+                    scales[c] = 1.0
+
+        labels_out = array('i')
+        sims_out = array('f')
+        for i in range(n):
+            dims, weights = vectorize(i)
+            if not dims:
+                labels_out.append(UNCLUSTERED)
+                sims_out.append(0.0)
+                continue
+            c, dot = nearest(dims, weights)
+            labels_out.append(c)
+            sims_out.append(dot / math.sqrt(sq_norms[c]) if sq_norms[c] > 0 else 0.0)
+        return labels_out, sims_out
+
+    def cluster_topics(self, max_report=15):
+        """Group entries about the same subject to suggest consolidation.
+
+        Entries become hashed, idf-weighted bag-of-words vectors clustered
+        with mini-batch k-means (NumPy when available, pure Python otherwise).
+        Only mini-batches, centroids and per-entry labels are held in memory.
+        """
+        n = len(self.entries)
+        candidates = []
+        # Document frequencies in hashed space (one streaming pass); entries
+        # with no features stay out of clustering in an unclustered bucket
+        df = [0] * CLUSTER_DIM
+        featured = array('i')
+        for i, entry in enumerate(self.entries):
+            features = self._entry_features(entry['text'])
+            if features:
+                featured.append(i)
+            for dim in features:
+                df[dim] += 1
+        self.stats['unclustered_entries'] = n - len(featured)
+        if len(featured) >= CLUSTER_MIN_SIZE * 2:
+            idf = [math.log((n + 1) / (f + 1)) + 1.0 for f in df]
+
+            max_k = CLUSTER_MAX_K if np is not None else CLUSTER_MAX_K_PYTHON
+            k = max(2, min(max_k, int(math.sqrt(len(featured) / 2))))
+            rnd = random.Random(0)
+            kmeans = self._kmeans_numpy if np is not None else self._kmeans_python
+            labels, sims = kmeans(idf, k, rnd, featured)
+
+            sizes, sim_sums = Counter(), defaultdict(float)
+            for label, sim in zip(labels, sims):
+                sizes[label] += 1
+                sim_sums[label] += sim
+            members = defaultdict(list)
+            for i, label in enumerate(labels):
+                if label == UNCLUSTERED:
+                    continue
+                if sizes[label] >= CLUSTER_MIN_SIZE and sim_sums[label] / sizes[label] >= CLUSTER_MIN_COHESION:
+                    members[label].append(i)
+
+            for label, indices in members.items():
+                files = {self.entries[i]['file'] for i in indices}
+                if len(files) < 2:
+                    continue  # entries already live together
+                words, total_bytes = Counter(), 0
+                for i in indices:
+                    text = self.entries[i]['text']
+                    total_bytes += len(text.encode('utf-8'))
+                    words.update(w for w in set(re.findall(r'\b[^\W\d_]{3,}\b', text.lower()))
+                                 if w not in STOPWORDS)
+                # A merged entry keeps roughly one copy of each distinct word
+                merged_bytes = sum(len(w.encode('utf-8')) + 1 for w in words)
+                candidates.append({
+                    'topic': ', '.join(w for w, _ in words.most_common(3)),
+                    'size': len(indices),
+                    'files': len(files),
+                    'cohesion': round(sim_sums[label] / sizes[label], 2),
+                    'bytes_saved': max(0, total_bytes - merged_bytes),
+                    'members': [{'file': self.entries[i]['file'], 'line': self.entries[i]['line'],
+                                 'text': self.entries[i]['text']} for i in indices[:10]],
+                })
+
+        candidates.sort(key=lambda c: c['bytes_saved'], reverse=True)
+        candidates = candidates[:max_report]
+        self.clusters = candidates
+        self.stats['consolidation_candidates'] = len(candidates)
+        self.stats['consolidation_bytes'] = sum(c['bytes_saved'] for c in candidates)
+        if self.verbose:
+            self._log(f"  Clustered {n} entries ({'numpy' if np is not None else 'pure python'}): "
+                  f"{len(candidates)} consolidation candidates, "
+                  f"{self.stats['unclustered_entries']} unclustered")
+        return candidates
+
     def calculate_score(self):
         """Calculate memory efficiency score (0-100)."""
         score = 100
@@ -405,23 +659,32 @@ class MemoryAnalyzer:
 
     def analyze(self):
         """Run full analysis."""
-        print(f"🧠 Agent Memory Optimizer v{VERSION}")
-        print(f"Scanning workspace: {self.workspace}")
+        self._log(f"🧠 Agent Memory Optimizer v{VERSION}")
+        self._log(f"Scanning workspace: {self.workspace}")
         
         self.load_files()
         
         if not self.files:
-            print("No memory files found!")
+            self._log("No memory files found!")
             return None
         
-        print(f"Found {self.stats['files_scanned']} memory files ({self.stats['total_bytes'] / 1024:.1f} KB total)")
-        print("Analyzing...\n")
+        self._log(f"Found {self.stats['files_scanned']} memory files ({self.stats['total_bytes'] / 1024:.1f} KB total)")
+        self._log("Analyzing...\n")
         
-        self.extract_entries()
-        self.detect_duplicates()
-        self.detect_stale()
-        self.check_structure()
-        self.check_missing_indexes()
+        stages = [
+            ('extract', self.extract_entries),
+            ('duplicates', self.detect_duplicates),
+            ('stale', self.detect_stale),
+            ('structure', self.check_structure),
+            ('indexes', self.check_missing_indexes),
+            ('clusters', self.cluster_topics),
+        ]
+        for step, (stage, fn) in enumerate(stages):
+            if self.progress:
+                self.progress(stage, step, len(stages))
+            fn()
+        if self.progress:
+            self.progress('done', len(stages), len(stages))
         
         score = self.calculate_score()
         
@@ -433,16 +696,17 @@ class MemoryAnalyzer:
         else:
             emoji = "🔴"
         
-        print(f"Memory Efficiency Score: {score}/100 {emoji}\n")
-        print("Issues found:")
-        print(f"  🔴 Critical: {len(self.issues['critical'])}")
-        print(f"  🟡 Warning: {len(self.issues['warning'])}")
-        print(f"  🟢 Suggestion: {len(self.issues['suggestion'])}")
+        self._log(f"Memory Efficiency Score: {score}/100 {emoji}\n")
+        self._log("Issues found:")
+        self._log(f"  🔴 Critical: {len(self.issues['critical'])}")
+        self._log(f"  🟡 Warning: {len(self.issues['warning'])}")
+        self._log(f"  🟢 Suggestion: {len(self.issues['suggestion'])}")
         
         return {
             'score': score,
             'stats': self.stats,
-            'issues': self.issues
+            'issues': self.issues,
+            'clusters': self.clusters
         }
 
     def generate_report(self, result, output_format='markdown'):
@@ -469,6 +733,7 @@ class MemoryAnalyzer:
         lines.append(f'- Stale entries: {stats["stale_entries"]}')
         lines.append(f'- Missing indexes: {stats["missing_indexes"]}')
         lines.append(f'- Structure issues: {stats["structure_issues"]}')
+        lines.append(f'- Consolidation candidates: {stats["consolidation_candidates"]}')
         lines.append('')
         
         if issues['critical']:
@@ -520,6 +785,18 @@ class MemoryAnalyzer:
                             lines.append(f'   - {detail["message"]}')
                 lines.append('')
         
+        clusters = result.get('clusters', [])
+        if clusters:
+            lines.append('## 🧩 Consolidation Candidates')
+            lines.append('')
+            for i, cluster in enumerate(clusters, 1):
+                lines.append(f'{i}. **{cluster["topic"]}** — {cluster["size"]} entries across '
+                             f'{cluster["files"]} files (~{cluster["bytes_saved"] / 1024:.1f} KB saved, '
+                             f'cohesion {cluster["cohesion"]})')
+                for m in cluster['members'][:5]:
+                    lines.append(f'   - `{m["text"][:60]}` ({os.path.basename(m["file"])}:{m["line"]})')
+            lines.append('')
+        
         # Recommended actions
         lines.append('## Recommended Actions')
         lines.append('')
@@ -532,6 +809,9 @@ class MemoryAnalyzer:
             lines.append(f'- [ ] Add index/TOC to {stats["missing_indexes"]} large files')
         if stats['structure_issues'] > 0:
             lines.append(f'- [ ] Fix {stats["structure_issues"]} structural issues')
+        if stats['consolidation_candidates'] > 0:
+            lines.append(f'- [ ] Consolidate {stats["consolidation_candidates"]} topic clusters '
+                         f'(saves ~{stats["consolidation_bytes"] / 1024:.1f} KB)')
         if stats['duplicates'] == 0 and stats['stale_entries'] == 0 and stats['structure_issues'] == 0:
             lines.append('✅ No critical actions needed — memory is well-organized!')
         lines.append('')
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Agent Memory Optimizer - Library API v1.0.0
+Quiet, in-process access to the analyzer and optimizer for orchestrators
+that manage many agent workspaces from one long-lived Python process.
+Author: Peru 🇵🇪
+
+    from api import Workspace, analyze_workspace, optimize_workspace
+
+    ws = Workspace('/path/to/workspace')
+    report = analyze_workspace(ws)              # parses files
+    report = analyze_workspace(ws)              # reuses parsed files
+    result = optimize_workspace(ws, ['structure', 'dedup'], apply=True)
+"""
+
+import os
+from pathlib import Path
+
+from analyze import MemoryAnalyzer
+from optimize import MemoryOptimizer, SHARD_MAX_BYTES
+
+OPERATIONS = ['dedup', 'reindex', 'stale', 'structure', 'shard']
+
+
+class Workspace:
+    """A workspace whose file contents and parsed entries are cached between calls.
+
+    Cached data is keyed by each file's (mtime_ns, size), so edits made by
+    agents between calls are picked up automatically; writes made by the
+    optimizer invalidate the cache explicitly.
+    """
+
+    def __init__(self, path):
+        self.path = Path(path).resolve()
+        self._files = {}  # path -> {'stamp', 'content', 'parsed'}
+
+    def _entry(self, filepath):
+        filepath = str(filepath)
+        st = os.stat(filepath)
+        stamp = (st.st_mtime_ns, st.st_size)
+        entry = self._files.get(filepath)
+        if entry is None or entry['stamp'] != stamp:
+            with open(filepath, 'r', encoding='utf-8', errors='replace') as f:
+                entry = {'stamp': stamp, 'content': f.read(), 'parsed': None}
+            self._files[filepath] = entry
+        return entry
+
+    def read(self, filepath):
+        """Return a file's content, re-reading it only if it changed on disk."""
+        return self._entry(filepath)['content']
+
+    def parsed(self, filepath, parse):
+        """Return parse() for a file, cached until the file changes."""
+        entry = self._entry(filepath)
+        if entry['parsed'] is None:
+            entry['parsed'] = parse()
+        return entry['parsed']
+
+    def invalidate(self, filepath=None):
+        """Drop cached data for one file, or for every file."""
+        if filepath is None:
+            self._files.clear()
+        else:
+            self._files.pop(str(filepath), None)
+
+
+def _as_workspace(workspace):
+    return workspace if isinstance(workspace, Workspace) else Workspace(workspace)
+
+
+def analyze_workspace(workspace, progress=None):
+    """Analyze a workspace without printing.
+
+    `workspace` is a path or a Workspace; `progress` is an optional
+    callback(stage, step, total). Returns the same dict as
+    MemoryAnalyzer.analyze() (score, stats, issues, clusters), or None if
+    the workspace has no memory files.
+    """
+    ws = _as_workspace(workspace)
+    analyzer = MemoryAnalyzer(ws.path, quiet=True, progress=progress, cache=ws)
+    return analyzer.analyze()
+
+
+def optimize_workspace(workspace, operations=None, apply=False, backup=False,
+                       durability='safe', shard_max_bytes=SHARD_MAX_BYTES,
+                       shard_max_tokens=None, progress=None):
+    """Optimize a workspace without printing.
+
+    `operations` is a list drawn from OPERATIONS (default: optimize.DEFAULT_OPERATIONS,
+    i.e. everything but shard, which must be asked for); an empty list
+    runs nothing.
+    Nothing is written unless `apply` is True. Returns a dict with
+    dry_run, operations, files_modified, bytes_saved, bytes_moved (content
+    shard relocated into topic files) and changes.
+    """
+    unknown = set(operations or []) - set(OPERATIONS)
+    if unknown:
+        raise ValueError(f"Unknown operations: {', '.join(sorted(unknown))}")
+    ws = _as_workspace(workspace)
+    optimizer = MemoryOptimizer(ws.path, dry_run=not apply, backup=backup,
+                                shard_max_bytes=shard_max_bytes,
+                                shard_max_tokens=shard_max_tokens,
+                                durability=durability, quiet=True,
+                                progress=progress, cache=ws)
+    return optimizer.run(only=operations)
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Agent Memory Optimizer - Benchmarks
+Times the hot paths of the optimizer on synthetic multi-MB memory files.
+Author: Peru 🇵🇪
+"""
+
+import io
+import re
+import sys
+import time
+import random
+import argparse
+
+from optimize import LineNormalizer
+
+
+def make_markdown(size_mb, seed=42):
+    """Build a synthetic memory file of roughly size_mb megabytes."""
+    rnd = random.Random(seed)
+    words = ['agent', 'memory', 'token', 'github', 'deploy', 'config', 'session',
+             'user', 'prefers', 'project', 'status', 'current', 'api', 'notes']
+    target = int(size_mb * 1024 * 1024)
+    out, size, n = [], 0, 0
+    while size < target:
+        n += 1
+        block = [f'## Section {n}   ', '- ' + ' '.join(rnd.choices(words, k=12)) + '  ']
+        block += ['- ' + ' '.join(rnd.choices(words, k=rnd.randint(5, 20))) for _ in range(rnd.randint(3, 12))]
+        if n % 7 == 0:
+            block += ['```', '# code comment   ', '', '', '', '', 'x = 1   ', '```']
+        block += [''] * rnd.randint(0, 5)
+        text = '\n'.join(block)
+        out.append(text)
+        size += len(text) + 1
+    return '\n'.join(out)
+
+
+def legacy_fix_structure(content):
+    """The four-pass regex cleanup fix_structure used before LineNormalizer."""
+    original = content
+    content = re.sub(r'\n{4,}', '\n\n\n', content)
+    content = re.sub(r'[ \t]+$', '', content, flags=re.MULTILINE)
+    if content and not content.endswith('\n'):
+        content += '\n'
+    content = re.sub(r'([^\n])\n(#{1,6}\s)', r'\1\n\n\2', content)
+    saved = len(original.encode('utf-8')) - len(content.encode('utf-8'))
+    return content, saved
+
+
+def normalizer_fix_structure(content):
+    normalizer = LineNormalizer()
+    out = ''.join(normalizer.normalize(io.StringIO(content)))
+    return out, -normalizer.delta
+
+
+def best_of(fn, arg, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(arg)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def bench_normalizer(sizes, repeat):
+    print("fix_structure: regex passes vs single-pass LineNormalizer")
+    print(f"  {'Size':>8} {'Regex':>10} {'Normalizer':>12} {'MB/s':>8}")
+    for size_mb in sizes:
+        content = make_markdown(size_mb)
+        mb = len(content.encode('utf-8')) / 1024 / 1024
+        legacy = best_of(legacy_fix_structure, content, repeat)
+        single = best_of(normalizer_fix_structure, content, repeat)
+        print(f"  {mb:>6.1f}MB {legacy * 1000:>8.1f}ms {single * 1000:>10.1f}ms {mb / single:>8.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Agent Memory Optimizer benchmarks')
+    parser.add_argument('--sizes', default='1,4,16', help='Comma-separated file sizes in MB')
+    parser.add_argument('--repeat', type=int, default=3, help='Runs per measurement (best is reported)')
+    args = parser.parse_args()
+
+    sizes = [float(s) for s in args.sizes.split(',') if s]
+    bench_normalizer(sizes, args.repeat)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
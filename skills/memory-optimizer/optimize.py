@@ -5,57 +5,274 @@ Applies recommended fixes: deduplication, re-indexing, stale entry handling.
 Author: Peru 🇵🇪
 """
 
+import io
 import os
 import sys
 import re
 import json
 import shutil
 import argparse
+import tempfile
+from contextlib import contextmanager
 from datetime import datetime, timedelta
 from pathlib import Path
 from difflib import SequenceMatcher
 from collections import defaultdict
 
+try:
+    import fcntl  # POSIX advisory locks; unavailable on Windows
+except ImportError:
+    fcntl = None
+
 VERSION = "1.0.0"
 STALE_DAYS = 30
 SIMILARITY_THRESHOLD = 0.80
+SHARD_MAX_BYTES = 8192   # sections larger than this are moved to memory/<topic>.md
+CHARS_PER_TOKEN = 4      # rough token estimate used by --shard-max-tokens
+SHARD_ROOT_FILES = ['MEMORY.md', 'TOOLS.md']
+LOCK_FILE = '.memory-optimizer.lock'  # agents writing memory can flock() this too
+DURABILITY_MODES = ['fast', 'safe']
+DEFAULT_OPERATIONS = ['dedup', 'reindex', 'stale', 'structure']  # shard moves content, so it is opt-in
+
+
+def _current_umask():
+    """The process umask (os.umask can only be read by setting it)."""
+    mask = os.umask(0)
+    os.umask(mask)
+    return mask
+
+
+def _copy_owner(src, dst):
+    """Give dst the owner and group of src; False if that is not permitted."""
+    if not hasattr(os, 'chown'):
+        return True
+    want, have = os.stat(src), os.stat(dst)
+    if (want.st_uid, want.st_gid) == (have.st_uid, have.st_gid):
+        return True
+    try:
+        os.chown(dst, want.st_uid, want.st_gid)
+    except PermissionError:
+        return False
+    return True
+
+
+class FenceTracker:
+    """Tracks fenced code blocks the way CommonMark does.
+
+    A fence opens on a run of three or more backticks or tildes and closes
+    only on a run of the same character at least as long with nothing but
+    whitespace after it, so a ~~~~ block may contain ~~~ lines.
+    """
+
+    FENCE_RE = re.compile(r'(`{3,}|~{3,})(.*)')
+
+    def __init__(self):
+        self.fence = None   # (character, run length) of the open fence
+
+    def feed(self, line):
+        """Advance past `line`; True if it is a fence delimiter or inside a fence."""
+        match = self.FENCE_RE.match(line.lstrip())
+        if self.fence:
+            if (match and match.group(1)[0] == self.fence[0]
+                    and len(match.group(1)) >= self.fence[1] and not match.group(2).strip()):
+                self.fence = None
+            return True
+        if match and not (match.group(1)[0] == '`' and '`' in match.group(2)):
+            self.fence = (match.group(1)[0], len(match.group(1)))
+            return True
+        return False
+
+
+class LineNormalizer:
+    """Single-pass markdown cleanup used by fix_structure.
+
+    Applies, line by line: trailing whitespace removal, collapsing runs of
+    more than MAX_BLANK_LINES blank lines, a blank line before headings and a
+    final newline. Lines inside ``` / ~~~ fences (see FenceTracker) are
+    passed through untouched.
+    Every edit only adds or removes ASCII, so the byte delta is tracked as we
+    go without re-encoding the file.
+    """
+
+    MAX_BLANK_LINES = 2
+
+    def __init__(self):
+        self.delta = 0      # output bytes minus input bytes
+        self.changes = 0    # number of edits made
+
+    def normalize(self, lines):
+        """Yield normalized lines (each ending in a newline) from an iterable of lines.
+
+        Outside fences the result matches the regex passes this replaced:
+        only truly empty lines count towards a blank run (a whitespace-only
+        line ends one), a file may open with one more blank line, a bare
+        `#` is a heading, and a whitespace-only last line without a newline
+        is dropped rather than turned into a blank line.
+        """
+        fences = FenceTracker()
+        blank_run = -1     # no newline precedes the first line, so a leading run may be one longer
+        prev_blank = True  # start of file counts as blank for heading spacing
+        for raw in lines:
+            line = raw[:-1] if raw.endswith('\n') else raw
+            last = not raw.endswith('\n')
+
+            if fences.fence:
+                fences.feed(line)
+                if last:
+                    self.delta += 1  # final newline
+                    self.changes += 1
+                yield line + '\n'
+                prev_blank, blank_run = not line.strip(), 0
+                continue
+
+            stripped = line.rstrip(' \t')
+            if len(stripped) != len(line):
+                self.delta -= len(line) - len(stripped)
+                self.changes += 1
+            if last and not stripped:
+                continue     # trailing whitespace with no newline after it: nothing left to end
+            if last:
+                self.delta += 1  # final newline
+                self.changes += 1
+
+            if not line:
+                blank_run += 1
+                if blank_run > self.MAX_BLANK_LINES:
+                    self.delta -= 1
+                    self.changes += 1
+                    continue
+                prev_blank = True
+                yield '\n'
+                continue
+            line = stripped
+            if not line:
+                blank_run, prev_blank = 0, True
+                yield '\n'
+                continue
+
+            opens_fence = fences.feed(line)
+            if not opens_fence and line[0] == '#' and not prev_blank and re.match(r'#{1,6}(\s|$)', line):
+                self.delta += 1
+                self.changes += 1
+                yield '\n'
+            blank_run = 0
+            prev_blank = False
+            yield line + '\n'
 
 
 class MemoryOptimizer:
-    def __init__(self, workspace_path, dry_run=True, backup=False):
+    def __init__(self, workspace_path, dry_run=True, backup=False,
+                 shard_max_bytes=SHARD_MAX_BYTES, shard_max_tokens=None,
+                 durability='safe', quiet=False, progress=None, cache=None):
         self.workspace = Path(workspace_path)
         self.dry_run = dry_run
         self.backup = backup
+        self.quiet = quiet          # suppress all console output (library use)
+        self.progress = progress    # optional callback(stage, step, total)
+        self.cache = cache          # optional api.Workspace shared with the analyzer
+        self.durability = durability
+        self._dirty_dirs = set()  # directories needing an fsync at end of run
+        self.shard_max_bytes = shard_max_bytes
+        self.shard_max_tokens = shard_max_tokens
         self.changes = []
         self.files_modified = 0
         self.bytes_saved = 0
+        self.bytes_moved = 0    # bytes shard() relocated into topic files
+
+    def _log(self, message=''):
+        """Print a status line unless running quietly."""
+        if not self.quiet:
+            print(message)
 
     def _backup_file(self, filepath):
         """Create .bak backup of a file."""
-        if self.backup:
+        if self.backup and os.path.exists(filepath):
             bak = f"{filepath}.bak"
             shutil.copy2(filepath, bak)
             self.changes.append(f"Created backup: {bak}")
 
     def _read_file(self, filepath):
         """Read file content."""
+        if self.cache is not None:
+            return self.cache.read(filepath)
         with open(filepath, 'r', encoding='utf-8', errors='replace') as f:
             return f.read()
 
     def _write_file(self, filepath, content):
-        """Write file content (respects dry_run)."""
+        """Write file content atomically via temp file + rename (respects dry_run).
+
+        Symlinks are written through to their target. A file whose owner the
+        replacement cannot be given (we are not root) is rewritten in place.
+        """
+        verb = 'modify' if os.path.exists(filepath) else 'create'
         if self.dry_run:
-            self.changes.append(f"[DRY RUN] Would modify: {filepath}")
+            self.changes.append(f"[DRY RUN] Would {verb}: {filepath}")
         else:
             self._backup_file(filepath)
-            with open(filepath, 'w', encoding='utf-8') as f:
-                f.write(content)
+            target = os.path.realpath(filepath)
+            directory = os.path.dirname(target)
+            fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.', suffix='.tmp')
+            try:
+                with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                    f.write(content)
+                    if self.durability == 'safe':
+                        f.flush()
+                        os.fsync(f.fileno())
+                if verb == 'create':
+                    # mkstemp creates 0600; give new files the mode open() would
+                    os.chmod(tmp_path, 0o666 & ~_current_umask())
+                    os.replace(tmp_path, target)
+                elif _copy_owner(target, tmp_path):
+                    shutil.copymode(target, tmp_path)
+                    os.replace(tmp_path, target)
+                else:
+                    os.unlink(tmp_path)
+                    self._write_in_place(target, content)
+            except BaseException:
+                if os.path.exists(tmp_path):
+                    os.unlink(tmp_path)
+                raise
+            if self.cache is not None:
+                self.cache.invalidate(filepath)
+            self._dirty_dirs.add(directory)
             self.files_modified += 1
-            self.changes.append(f"Modified: {filepath}")
+            self.changes.append(f"{'Modified' if verb == 'modify' else 'Created'}: {filepath}")
+
+    def _write_in_place(self, filepath, content):
+        """Overwrite a file's contents, keeping its inode (and so owner and mode)."""
+        with open(filepath, 'w', encoding='utf-8') as f:
+            f.write(content)
+            if self.durability == 'safe':
+                f.flush()
+                os.fsync(f.fileno())
+
+    def _sync_dirs(self):
+        """fsync every directory touched this run so the renames are durable."""
+        if self.durability == 'safe' and hasattr(os, 'O_DIRECTORY'):
+            for directory in sorted(self._dirty_dirs):
+                fd = os.open(directory, os.O_RDONLY | os.O_DIRECTORY)
+                try:
+                    os.fsync(fd)
+                finally:
+                    os.close(fd)
+        self._dirty_dirs.clear()
+
+    @contextmanager
+    def _workspace_lock(self):
+        """Hold an exclusive advisory lock on the workspace while applying changes."""
+        if self.dry_run or fcntl is None:
+            yield
+            return
+        with open(self.workspace / LOCK_FILE, 'a') as lock:
+            fcntl.flock(lock.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock.fileno(), fcntl.LOCK_UN)
 
     def dedup(self):
         """Remove duplicate entries from memory files."""
-        print("🔄 Running deduplication...")
+        self._log("🔄 Running deduplication...")
         
         # Collect all entries across files
         all_entries = {}  # file -> list of (line_num, text)
@@ -134,13 +351,13 @@ class MemoryOptimizer:
                 self._write_file(filepath, new_content)
         
         if total_removed == 0:
-            print("  ✅ No duplicates to remove")
+            self._log("  ✅ No duplicates to remove")
         else:
-            print(f"  {'Would remove' if self.dry_run else 'Removed'} {total_removed} duplicate entries")
+            self._log(f"  {'Would remove' if self.dry_run else 'Removed'} {total_removed} duplicate entries")
 
     def reindex(self):
         """Add or update table of contents for large files."""
-        print("📑 Running re-indexing...")
+        self._log("📑 Running re-indexing...")
         
         for filepath in self._find_md_files():
             content = self._read_file(filepath)
@@ -197,7 +414,7 @@ class MemoryOptimizer:
 
     def clean_stale(self):
         """Archive or flag stale entries."""
-        print("🕐 Cleaning stale entries...")
+        self._log("🕐 Cleaning stale entries...")
         
         now = datetime.now()
         cutoff = now - timedelta(days=STALE_DAYS)
@@ -229,41 +446,133 @@ class MemoryOptimizer:
                     pass
         
         if stale_found == 0:
-            print("  ✅ No stale entries to clean")
+            self._log("  ✅ No stale entries to clean")
         else:
-            print(f"  {'Would archive' if self.dry_run else 'Archived'} {stale_found} stale entries")
+            self._log(f"  {'Would archive' if self.dry_run else 'Archived'} {stale_found} stale entries")
 
     def fix_structure(self):
         """Fix structural issues in markdown files."""
-        print("🏗️ Fixing structure issues...")
+        self._log("🏗️ Fixing structure issues...")
         
         fixes = 0
         for filepath in self._find_md_files():
-            content = self._read_file(filepath)
-            original = content
-            
-            # Fix multiple consecutive blank lines
-            content = re.sub(r'\n{4,}', '\n\n\n', content)
-            
-            # Fix trailing whitespace
-            content = re.sub(r'[ \t]+$', '', content, flags=re.MULTILINE)
-            
-            # Ensure file ends with newline
-            if content and not content.endswith('\n'):
-                content += '\n'
+            normalizer = LineNormalizer()
+            if self.cache is not None:
+                # StringIO splits on '\n' only, like iterating the file; str.splitlines
+                # would also break on \f, \v, \x1c-\x1e, \x85, U+2028 and U+2029
+                content = ''.join(normalizer.normalize(io.StringIO(self.cache.read(filepath))))
+            else:
+                with open(filepath, 'r', encoding='utf-8', errors='replace') as f:
+                    content = ''.join(normalizer.normalize(f))
             
-            # Fix heading spacing (ensure blank line before headings)
-            content = re.sub(r'([^\n])\n(#{1,6}\s)', r'\1\n\n\2', content)
-            
-            if content != original:
-                self.bytes_saved += len(original.encode('utf-8')) - len(content.encode('utf-8'))
+            if normalizer.changes:
+                self.bytes_saved -= normalizer.delta
                 fixes += 1
                 self._write_file(filepath, content)
         
         if fixes == 0:
-            print("  ✅ No structure issues to fix")
+            self._log("  ✅ No structure issues to fix")
         else:
-            print(f"  {'Would fix' if self.dry_run else 'Fixed'} {fixes} files")
+            self._log(f"  {'Would fix' if self.dry_run else 'Fixed'} {fixes} files")
+
+    def _section_too_large(self, text):
+        """Check a section against the byte/token shard thresholds."""
+        size = len(text.encode('utf-8'))
+        if self.shard_max_bytes and size > self.shard_max_bytes:
+            return True
+        if self.shard_max_tokens and len(text) / CHARS_PER_TOKEN > self.shard_max_tokens:
+            return True
+        return False
+
+    def _shard_path(self, title, taken):
+        """Pick a free memory/<topic>.md path for a section title."""
+        slug = re.sub(r'[^\w\s-]', '', title.lower()).strip()
+        slug = re.sub(r'[\s_]+', '-', slug).strip('-') or 'section'
+        memory_dir = self.workspace / 'memory'
+        candidate, n = slug, 2
+        while candidate in taken or (memory_dir / f'{candidate}.md').exists():
+            candidate = f'{slug}-{n}'
+            n += 1
+        taken.add(candidate)
+        return memory_dir / f'{candidate}.md'
+
+    def shard(self):
+        """Split oversized MEMORY.md/TOOLS.md sections into memory/<topic>.md shards."""
+        self._log("✂️  Sharding oversized sections...")
+
+        sharded = 0
+        taken = set()
+        for name in SHARD_ROOT_FILES:
+            filepath = self.workspace / name
+            if not filepath.exists():
+                continue
+            content = self._read_file(filepath)
+            lines = content.split('\n')
+
+            # Split into level-2 sections, ignoring headings inside code fences
+            sections = []  # (start, end, title)
+            fences = FenceTracker()
+            for i, line in enumerate(lines):
+                if fences.feed(line):
+                    continue
+                if re.match(r'^#{1,2}\s+', line):
+                    if sections and sections[-1][1] is None:
+                        sections[-1][1] = i
+                    match = re.match(r'^##\s+(.+)', line)
+                    if match:
+                        sections.append([i, None, match.group(1).strip()])
+            if sections and sections[-1][1] is None:
+                sections[-1][1] = len(lines)
+
+            new_lines = []
+            cursor = 0
+            for start, end, title in sections:
+                body = lines[start + 1:end]
+                if not self._section_too_large('\n'.join(body)):
+                    continue
+
+                shard_path = self._shard_path(title, taken)
+                rel = f'memory/{shard_path.name}'
+
+                # Promote sub-headings one level so the shard starts at h1
+                shard_lines = [f'# {title}', '', f'> Shard of [{name}](../{name})', '']
+                fences = FenceTracker()
+                body_start = 0
+                while body_start < len(body) and not body[body_start].strip():
+                    body_start += 1
+                for line in body[body_start:]:
+                    if not fences.feed(line) and re.match(r'^#{3,6}\s', line):
+                        line = line[1:]
+                    shard_lines.append(line)
+                shard_content = '\n'.join(shard_lines).rstrip('\n') + '\n'
+
+                section_text = '\n'.join(lines[start:end])
+                index_lines = [
+                    lines[start], '',
+                    f'→ Moved to [{rel}]({rel}) ({len(body)} lines, '
+                    f'{len(section_text.encode("utf-8")) / 1024:.1f} KB)', '',
+                ]
+                new_lines.extend(lines[cursor:start])
+                new_lines.extend(index_lines)
+                cursor = end
+
+                self.changes.append(f"  Sharded \"{title}\" from {name} into {rel}")
+                if not self.dry_run:
+                    shard_path.parent.mkdir(exist_ok=True)
+                self._write_file(str(shard_path), shard_content)
+                sharded += 1
+
+            if cursor:
+                new_lines.extend(lines[cursor:])
+                new_content = '\n'.join(new_lines)
+                # Relocated, not saved: reported separately from bytes_saved
+                self.bytes_moved += len(content.encode('utf-8')) - len(new_content.encode('utf-8'))
+                self._write_file(str(filepath), new_content)
+
+        if sharded == 0:
+            self._log("  ✅ No oversized sections to shard")
+        else:
+            self._log(f"  {'Would shard' if self.dry_run else 'Sharded'} {sharded} sections")
 
     def _find_md_files(self):
         """Find all markdown files in workspace."""
@@ -280,47 +589,83 @@ class MemoryOptimizer:
         return files
 
     def run(self, only=None):
-        """Run optimization."""
-        print(f"🧠 Agent Memory Optimizer v{VERSION}")
-        print(f"Workspace: {self.workspace}")
-        print(f"Mode: {'DRY RUN' if self.dry_run else '⚡ APPLYING CHANGES'}")
-        print(f"Backup: {'Yes' if self.backup else 'No'}")
-        print()
+        """Run optimization. `only` may be one operation name or a list of them.
+
+        With `only` None, DEFAULT_OPERATIONS run; shard runs only when named,
+        and an empty list runs nothing.
+        """
+        self._log(f"🧠 Agent Memory Optimizer v{VERSION}")
+        self._log(f"Workspace: {self.workspace}")
+        self._log(f"Mode: {'DRY RUN' if self.dry_run else '⚡ APPLYING CHANGES'}")
+        self._log(f"Backup: {'Yes' if self.backup else 'No'}")
+        if not self.dry_run:
+            self._log(f"Durability: {self.durability}")
+        self._log()
         
         operations = {
             'dedup': self.dedup,
             'reindex': self.reindex,
             'stale': self.clean_stale,
-            'structure': self.fix_structure
+            'structure': self.fix_structure,
+            'shard': self.shard
         }
         
-        if only and only in operations:
-            operations[only]()
-        else:
-            for op in operations.values():
-                op()
-                print()
+        if only is None:
+            only = DEFAULT_OPERATIONS
+        elif isinstance(only, str):
+            only = [only]
+        selected = [name for name in operations if name in only]
+        
+        with self._workspace_lock():
+            for step, name in enumerate(selected):
+                if self.progress:
+                    self.progress(name, step, len(selected))
+                operations[name]()
+                if len(selected) > 1:
+                    self._log()
+            self._sync_dirs()
+        if self.progress:
+            self.progress('done', len(selected), len(selected))
         
         # Summary
-        print('=' * 50)
-        print('Summary:')
-        print(f'  Files modified: {self.files_modified}')
-        print(f'  Bytes saved: {self.bytes_saved}')
-        print(f'  Changes:')
+        self._log('=' * 50)
+        self._log('Summary:')
+        self._log(f'  Files modified: {self.files_modified}')
+        self._log(f'  Bytes saved: {self.bytes_saved}')
+        if self.bytes_moved:
+            self._log(f'  Bytes moved to shards: {self.bytes_moved}')
+        self._log(f'  Changes:')
         for c in self.changes:
-            print(f'    {c}')
+            self._log(f'    {c}')
         
         if self.dry_run:
-            print(f'\nThis was a dry run. Use --apply to make changes.')
+            self._log(f'\nThis was a dry run. Use --apply to make changes.')
+        
+        return {
+            'dry_run': self.dry_run,
+            'operations': selected,
+            'files_modified': self.files_modified,
+            'bytes_saved': self.bytes_saved,
+            'bytes_moved': self.bytes_moved,
+            'changes': self.changes
+        }
 
 
 def main():
     parser = argparse.ArgumentParser(description=f'Agent Memory Optimizer v{VERSION}')
     parser.add_argument('--path', default='.', help='Workspace directory')
     parser.add_argument('--apply', action='store_true', help='Apply fixes (default: dry run)')
-    parser.add_argument('--only', choices=['dedup', 'reindex', 'stale', 'structure'],
+    parser.add_argument('--only', choices=['dedup', 'reindex', 'stale', 'structure', 'shard'],
                        help='Only apply specific fix type')
+    parser.add_argument('--shard', action='store_true',
+                       help='Also split oversized sections into memory/<topic>.md (off by default)')
     parser.add_argument('--backup', action='store_true', help='Create .bak files before modifying')
+    parser.add_argument('--durability', choices=DURABILITY_MODES, default='safe',
+                       help='safe: fsync files and directories; fast: atomic rename only (default: safe)')
+    parser.add_argument('--shard-max-bytes', type=int, default=SHARD_MAX_BYTES,
+                       help=f'Shard sections larger than this many bytes (default: {SHARD_MAX_BYTES}, 0 disables)')
+    parser.add_argument('--shard-max-tokens', type=int, default=None,
+                       help='Shard sections estimated above this many tokens')
     
     args = parser.parse_args()
     
@@ -329,8 +674,14 @@ def main():
         print(f"Error: workspace not found: {workspace}", file=sys.stderr)
         sys.exit(1)
     
-    optimizer = MemoryOptimizer(workspace, dry_run=not args.apply, backup=args.backup)
-    optimizer.run(only=args.only)
+    optimizer = MemoryOptimizer(workspace, dry_run=not args.apply, backup=args.backup,
+                                shard_max_bytes=args.shard_max_bytes,
+                                shard_max_tokens=args.shard_max_tokens,
+                                durability=args.durability)
+    only = [args.only] if args.only else list(DEFAULT_OPERATIONS)
+    if args.shard:
+        only.append('shard')
+    optimizer.run(only=only)
 
 
 if __name__ == '__main__':
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Agent Memory Optimizer - Tests
+Run with: python3 -m unittest test_optimize   (or pytest)
+Author: Peru 🇵🇪
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+
+from api import optimize_workspace
+from bench import legacy_fix_structure, normalizer_fix_structure
+from optimize import MemoryOptimizer
+
+
+class WorkspaceTestCase(unittest.TestCase):
+    def setUp(self):
+        self.workspace = Path(tempfile.mkdtemp(prefix='memory-test-'))
+
+    def tearDown(self):
+        shutil.rmtree(self.workspace, ignore_errors=True)
+
+    def write(self, name, content):
+        path = self.workspace / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, 'w', encoding='utf-8', newline='') as f:
+            f.write(content)
+        return path
+
+    def read(self, name):
+        with open(self.workspace / name, encoding='utf-8', newline='') as f:
+            return f.read()
+
+
+class FixStructureTest(WorkspaceTestCase):
+    CONTENT = 'Intro\n- pasted\fform feed   \n- web copy a\u2028b\nText\n# Heading\n'
+    EXPECTED = 'Intro\n- pasted\fform feed\n- web copy a\u2028b\nText\n\n# Heading\n'
+
+    def test_library_path_splits_on_newlines_only(self):
+        self.write('MEMORY.md', self.CONTENT)
+        optimize_workspace(self.workspace, ['structure'], apply=True)
+        self.assertEqual(self.read('MEMORY.md'), self.EXPECTED)
+
+    def test_library_and_file_paths_agree(self):
+        self.write('MEMORY.md', self.CONTENT)
+        MemoryOptimizer(self.workspace, dry_run=False, quiet=True).run('structure')
+        self.assertEqual(self.read('MEMORY.md'), self.EXPECTED)
+
+
+class OperationsTest(WorkspaceTestCase):
+    MEMORY = '# Memory\n\n## Deploy Notes\n\n' + '- step with a long explanation\n' * 20
+
+    def setUp(self):
+        super().setUp()
+        self.write('MEMORY.md', self.MEMORY)
+
+    def test_default_run_does_not_shard(self):
+        result = optimize_workspace(self.workspace, apply=True, shard_max_bytes=100)
+        self.assertEqual(result['bytes_moved'], 0)
+        self.assertFalse((self.workspace / 'memory').exists())
+
+    def test_empty_operations_run_nothing(self):
+        self.write('MEMORY.md', 'Text   \n# Heading\n')
+        result = optimize_workspace(self.workspace, [], apply=True, shard_max_bytes=100)
+        self.assertEqual(result['files_modified'], 0)
+        self.assertEqual(self.read('MEMORY.md'), 'Text   \n# Heading\n')
+
+    def test_shard_runs_when_named(self):
+        result = optimize_workspace(self.workspace, ['shard'], apply=True, shard_max_bytes=100)
+        self.assertGreater(result['bytes_moved'], 0)
+        self.assertTrue(any((self.workspace / 'memory').glob('*.md')))
+
+
+class LineNormalizerTest(unittest.TestCase):
+    """Outside fences the single pass matches the regex passes it replaced."""
+
+    def assertMatchesLegacy(self, content, expected):
+        self.assertEqual(normalizer_fix_structure(content)[0], expected)
+        self.assertEqual(legacy_fix_structure(content)[0], expected)
+
+    def test_bare_hash_is_a_heading(self):
+        self.assertMatchesLegacy('Text\n#\nMore\n##   \n', 'Text\n\n#\nMore\n\n##\n')
+
+    def test_whitespace_only_last_line_is_dropped(self):
+        self.assertMatchesLegacy('Text\n   ', 'Text\n')
+        self.assertMatchesLegacy(' \t', '')
+
+    def test_whitespace_only_lines_do_not_count_as_a_blank_run(self):
+        self.assertMatchesLegacy('a\n\n \n\t\n\nb\n', 'a\n\n\n\n\nb\n')
+        self.assertMatchesLegacy('a\n\n\n\n\nb\n', 'a\n\n\nb\n')
+
+    def test_file_may_open_with_three_blank_lines(self):
+        self.assertMatchesLegacy('\n\n\n\n\na\n', '\n\n\na\n')
+
+    def test_heading_after_bare_hash_gets_a_blank_line(self):
+        # The old regex consumed the bare heading's newline and skipped this one
+        self.assertEqual(normalizer_fix_structure('Text\n#\n# Next\n')[0], 'Text\n\n#\n\n# Next\n')
+        self.assertEqual(legacy_fix_structure('Text\n#\n# Next\n')[0], 'Text\n\n#\n# Next\n')
+
+    def test_bytes_saved_match(self):
+        content = 'Intro  \n\n\n\n\n## Notes\t\n- a   \n#\n \n  '
+        self.assertEqual(normalizer_fix_structure(content), legacy_fix_structure(content))
+
+
+class WriteFileTest(WorkspaceTestCase):
+    def test_symlink_is_written_through(self):
+        dotfiles = Path(tempfile.mkdtemp(prefix='dotfiles-'))
+        self.addCleanup(shutil.rmtree, dotfiles, True)
+        real = dotfiles / 'MEMORY.md'
+        real.write_text('Text\n# Heading   \n', encoding='utf-8')
+        os.symlink(real, self.workspace / 'MEMORY.md')
+        MemoryOptimizer(self.workspace, dry_run=False, quiet=True).run('structure')
+        self.assertTrue((self.workspace / 'MEMORY.md').is_symlink())
+        self.assertEqual(real.read_text(encoding='utf-8'), 'Text\n\n# Heading\n')
+        self.assertEqual(os.listdir(dotfiles), ['MEMORY.md'])
+
+    @unittest.skipUnless(hasattr(os, 'geteuid') and os.geteuid() == 0, 'needs root to chown')
+    def test_owner_is_preserved(self):
+        path = self.write('MEMORY.md', 'Text\n# Heading\n')
+        os.chown(path, 1234, 1234)
+        MemoryOptimizer(self.workspace, dry_run=False, quiet=True).run('structure')
+        st = os.stat(path)
+        self.assertEqual((st.st_uid, st.st_gid), (1234, 1234))
+        self.assertEqual(self.read('MEMORY.md'), 'Text\n\n# Heading\n')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -5,42 +5,44 @@ Fetches posts, calculates engagement metrics, and generates reports.
 """
 
 import argparse
+import http.client
 import json
 import sys
 import os
 from datetime import datetime, timezone
 from collections import Counter
-import urllib.request
-import urllib.error
+
+from moltbook_client import APIError, BudgetExceeded, ClientFactory, OfflineMiss, RATE_LIMIT
 
 API_BASE = "https://www.moltbook.com/api/v1"
 
+clients = ClientFactory(API_BASE)   # shared clients, scheduler and cache settings for this run
+configure_scheduler = clients.configure_scheduler
+configure_cache = clients.configure_cache
+get_client = clients.get
 
-def fetch_posts(api_key, username, limit=50):
-    """Fetch posts from the Moltbook API."""
-    url = f"{API_BASE}/posts?limit={limit}"
-    if username:
-        url += f"&author={username}"
 
-    req = urllib.request.Request(url)
-    req.add_header("Authorization", f"Bearer {api_key}")
-    req.add_header("Accept", "application/json")
+def fetch_posts(api_key, username, limit=50, since=None):
+    """Fetch up to `limit` posts (0 = all), newest first, following pagination.
+
+    `since` (epoch seconds) stops at the first older post. Returns None if
+    the listing failed (after retries).
+    """
+    params = {"author": username} if username else {}
 
     try:
-        with urllib.request.urlopen(req, timeout=30) as resp:
-            data = json.loads(resp.read().decode())
-            return data if isinstance(data, list) else data.get("posts", data.get("data", []))
-    except urllib.error.HTTPError as e:
-        print(f"❌ API error: HTTP {e.code} - {e.reason}", file=sys.stderr)
-        if e.code == 401:
+        return list(get_client(api_key).iter_posts(params, max_items=limit or None, since=since))
+    except APIError as e:
+        print(f"❌ API error: HTTP {e.status} - {e.reason}", file=sys.stderr)
+        if e.status == 401:
             print("   Check your API key.", file=sys.stderr)
-        sys.exit(1)
-    except urllib.error.URLError as e:
-        print(f"❌ Connection error: {e.reason}", file=sys.stderr)
-        sys.exit(1)
+    except (BudgetExceeded, OfflineMiss) as e:
+        print(f"❌ {e}", file=sys.stderr)
+    except (OSError, http.client.HTTPException) as e:
+        print(f"❌ Connection error: {e}", file=sys.stderr)
     except Exception as e:
         print(f"❌ Unexpected error fetching posts: {e}", file=sys.stderr)
-        sys.exit(1)
+    return None
 
 
 def analyze_posts(posts, username):
@@ -254,9 +256,19 @@ def main():
     )
     parser.add_argument("--api-key", "-k", help="Moltbook API key (or set MOLTBOOK_API_KEY env var)")
     parser.add_argument("--username", "-u", help="Moltbook username to analyze")
-    parser.add_argument("--limit", "-l", type=int, default=50, help="Number of posts to fetch (default: 50)")
+    parser.add_argument("--limit", "-l", type=int, default=50, help="Number of posts to fetch (default: 50; 0 = all)")
+    parser.add_argument("--since", help="Only analyze posts created on or after this date (YYYY-MM-DD or ISO time)")
     parser.add_argument("--json", action="store_true", help="Output in JSON format")
     parser.add_argument("--output", "-o", help="Save report to file")
+    parser.add_argument("--rate-limit", type=int, default=RATE_LIMIT,
+                        help=f"Requests per minute to stay under (default: {RATE_LIMIT}; 0 = no limit)")
+    parser.add_argument("--budget", type=int,
+                        help="Most requests this run may send, retries included "
+                             "(default: MOLTBOOK_REQUEST_BUDGET env, else unlimited)")
+    parser.add_argument("--offline", action="store_true", help="Serve only cached responses; no network")
+    parser.add_argument("--no-cache", action="store_true", help="Bypass the on-disk response cache")
+    parser.add_argument("--debug", action="store_true",
+                        help="Print connection reuse, compression, retry and cache stats to stderr")
 
     args = parser.parse_args()
 
@@ -281,9 +293,26 @@ def main():
     if not username:
         print("⚠️  No username specified. Analyzing all fetched posts.", file=sys.stderr)
 
+    since = None
+    if args.since:
+        try:
+            since = datetime.fromisoformat(args.since.replace("Z", "+00:00"))
+        except ValueError:
+            print(f"❌ Invalid --since date: {args.since}", file=sys.stderr)
+            sys.exit(1)
+        if since.tzinfo is None:
+            since = since.replace(tzinfo=timezone.utc)
+        since = since.timestamp()
+
     # Fetch and analyze
+    configure_cache(not args.no_cache, args.offline)
+    configure_scheduler(args.rate_limit, args.budget)
     print(f"🔍 Fetching posts from Moltbook...", file=sys.stderr)
-    posts = fetch_posts(api_key, username, args.limit)
+    posts = fetch_posts(api_key, username, args.limit, since)
+    if args.debug:
+        print(get_client(api_key).summary(), file=sys.stderr)
+    if posts is None:
+        sys.exit(1)
 
     if not posts:
         print("📭 No posts found.", file=sys.stderr)
@@ -0,0 +1,791 @@
+#!/usr/bin/env python3
+"""
+Moltbook API Client — shared by the Moltbook skills.
+Keep-alive connections pooled per host, gzip responses, rate limiting with
+retries, paginated listings with read-ahead, an on-disk response cache, and
+a usage summary.
+
+The same file ships with moltbook-community-manager and moltbook-analytics;
+keep the copies identical.
+"""
+
+import gzip
+import hashlib
+import http.client
+import json
+import os
+import random
+import re
+import sqlite3
+import threading
+import time
+import zlib
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlencode, urlsplit
+
+API_BASE = "https://www.moltbook.com/api/v1"
+MAX_PER_HOST = 6   # open connections per API host, across all threads
+TIMEOUT = 30
+
+RATE_LIMIT = 100           # requests per RATE_PERIOD the API allows
+RATE_PERIOD = 60.0
+BURST = RATE_LIMIT // 2    # below the server's own allowance, so timing jitter never tips it over
+MAX_RETRIES = 4
+BACKOFF_BASE = 0.5         # seconds; doubled per attempt, full jitter
+BACKOFF_CAP = 30.0
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+BUDGET_ENV = "MOLTBOOK_REQUEST_BUDGET"
+PAGE_SIZE = 50
+
+CACHE_PATH = os.path.join(os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache"),
+                          "moltbook", "responses.db")
+CACHE_MAX_BYTES = 32 * 1024 * 1024
+LIMITS_PATH = os.path.join(os.path.dirname(CACHE_PATH), "limits.db")   # rate and budget shared by all processes
+CACHE_TTLS = [                              # first matching path pattern wins
+    (re.compile(r"^/posts/[^/?]+/comments"), 60),
+    (re.compile(r"^/posts(?:\?|$)"), 120),
+]
+CACHE_DEFAULT_TTL = 60
+CACHE_EVICT_EVERY = 50                      # check the size bound every N stores
+
+
+class APIError(Exception):
+    """The API answered with an HTTP error status."""
+
+    def __init__(self, status, reason, body=b"", headers=None):
+        super().__init__(f"HTTP {status} — {reason}")
+        self.status = status
+        self.reason = reason
+        self.body = body
+        self.headers = headers
+
+
+class BudgetExceeded(Exception):
+    """The run has used up its request budget."""
+
+
+class OfflineMiss(Exception):
+    """--offline was given and the response is not in the cache."""
+
+
+def retry_after(headers):
+    """Seconds to wait from a Retry-After header (delta-seconds or HTTP date), or None."""
+    value = headers.get("Retry-After") if headers is not None else None
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def item_time(item):
+    """created_at/timestamp of a post or comment as an epoch float, or None."""
+    ts = item.get("created_at", item.get("timestamp"))
+    if isinstance(ts, (int, float)):
+        return float(ts)
+    try:
+        return datetime.fromisoformat(ts.replace("Z", "+00:00")).timestamp()
+    except (AttributeError, ValueError):
+        return None
+
+
+def page_items(data, key):
+    """Item list from a listing response: a bare list, or under `key` or "data"."""
+    return data if isinstance(data, list) else data.get(key, data.get("data", []))
+
+
+def next_page(data, items, page_size, offset):
+    """Query parameters for the page after this one, or None at the end.
+
+    A cursor in the response (next_cursor, cursor, or pagination.next_cursor)
+    is followed when present; otherwise pages are walked by offset until one
+    comes back short.
+    """
+    if isinstance(data, dict):
+        if data.get("has_more") is False:
+            return None
+        cursor = (data.get("next_cursor") or data.get("cursor")
+                  or (data.get("pagination") or {}).get("next_cursor"))
+        if cursor:
+            return {"cursor": cursor}
+    if len(items) < page_size:
+        return None
+    return {"offset": offset + len(items)}
+
+
+class TokenBucket:
+    """Allows `capacity` requests at once, refilled at `rate` per second.
+
+    rate=None means unlimited. `pause()` holds every caller until a
+    deadline, which is how one 429's Retry-After throttles all threads.
+    """
+
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        self.lock = threading.Lock()
+
+    def _refill(self, now):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def acquire(self):
+        """Take one token, sleeping as needed; returns the seconds waited."""
+        with self.lock:
+            now = time.monotonic()
+            wait = max(0.0, self.paused_until - now)
+            if self.rate:
+                self._refill(now)
+                self.tokens -= 1   # reserve now; a negative balance is the queue ahead
+                if self.tokens < 0:
+                    wait = max(wait, -self.tokens / self.rate)
+        if wait:
+            time.sleep(wait)
+        return wait
+
+    def try_acquire(self):
+        """Take a token if one is available right now."""
+        with self.lock:
+            if not self.rate:
+                return True
+            self._refill(time.monotonic())
+            if self.tokens < 1:
+                return False
+            self.tokens -= 1
+            return True
+
+    def pause(self, seconds):
+        with self.lock:
+            self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+
+
+def process_alive(pid):
+    """Whether a process with this pid still exists (always assumed on platforms without signals)."""
+    if os.name != "posix":
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+class SharedLimits:
+    """Token bucket state and a request count shared by every Moltbook process on the machine.
+
+    One SQLite row next to the response cache, updated in short write
+    transactions, so the manager, analytics and any number of --watch loops
+    draw on one rate limit and one budget rather than one each. The request
+    count starts over once no process that used it is still running. Opened
+    on first use, and again after a fork.
+    """
+
+    SCHEMA = """
+    CREATE TABLE IF NOT EXISTS limits (
+        id           INTEGER PRIMARY KEY CHECK (id = 1),
+        tokens       REAL,
+        updated      REAL NOT NULL,
+        paused_until REAL NOT NULL,
+        sent         INTEGER NOT NULL
+    );
+    INSERT OR IGNORE INTO limits VALUES (1, NULL, 0, 0, 0);
+    CREATE TABLE IF NOT EXISTS users (pid INTEGER PRIMARY KEY);
+    """
+
+    def __init__(self, path=LIMITS_PATH):
+        self.path = path
+        self.conn = None
+        self.pid = None
+        self.lock = threading.Lock()
+
+    def _open(self):
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self.conn = sqlite3.connect(self.path, timeout=TIMEOUT, check_same_thread=False, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(self.SCHEMA)
+        self.pid = os.getpid()
+        self.conn.execute("BEGIN IMMEDIATE")
+        pids = [pid for (pid,) in self.conn.execute("SELECT pid FROM users")]
+        gone = [(pid,) for pid in pids if not process_alive(pid)]
+        self.conn.executemany("DELETE FROM users WHERE pid = ?", gone)
+        if len(gone) == len(pids):   # nobody else is running: a fresh budget
+            self.conn.execute("UPDATE limits SET sent = 0")
+        self.conn.execute("INSERT OR IGNORE INTO users VALUES (?)", (self.pid,))
+        self.conn.execute("COMMIT")
+
+    @contextmanager
+    def _transaction(self):
+        """One write transaction, serialised across threads and processes."""
+        with self.lock:
+            if self.conn is None or self.pid != os.getpid():
+                self._open()
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield self.conn
+            except BaseException:
+                self.conn.execute("ROLLBACK")
+                raise
+            self.conn.execute("COMMIT")
+
+    def close(self):
+        with self.lock:
+            if self.conn is not None and self.pid == os.getpid():
+                self.conn.close()
+            self.conn = None
+
+    def _tokens(self, conn, rate, capacity, now):
+        tokens, updated = conn.execute("SELECT tokens, updated FROM limits").fetchone()
+        if tokens is None:
+            return capacity
+        return min(capacity, tokens + max(0.0, now - updated) * rate)
+
+    def take(self, rate, capacity):
+        """Reserve one token; returns the seconds the caller must wait before sending."""
+        with self._transaction() as conn:
+            now = time.time()
+            (paused_until,) = conn.execute("SELECT paused_until FROM limits").fetchone()
+            wait = max(0.0, paused_until - now)
+            if rate:
+                tokens = self._tokens(conn, rate, capacity, now) - 1   # negative: the queue ahead
+                if tokens < 0:
+                    wait = max(wait, -tokens / rate)
+                conn.execute("UPDATE limits SET tokens = ?, updated = ?", (tokens, now))
+        return wait
+
+    def try_take(self, rate, capacity):
+        """Take a token if one is available right now."""
+        with self._transaction() as conn:
+            now = time.time()
+            tokens = self._tokens(conn, rate, capacity, now)
+            if tokens < 1:
+                return False
+            conn.execute("UPDATE limits SET tokens = ?, updated = ?", (tokens - 1, now))
+            return True
+
+    def pause(self, seconds):
+        with self._transaction() as conn:
+            conn.execute("UPDATE limits SET paused_until = MAX(paused_until, ?)", (time.time() + seconds,))
+
+    def spend(self, budget):
+        """Count one request unless `budget` (None = no cap) is used up; returns whether it was counted."""
+        with self._transaction() as conn:
+            (sent,) = conn.execute("SELECT sent FROM limits").fetchone()
+            if budget is not None and sent >= budget:
+                return False
+            conn.execute("UPDATE limits SET sent = sent + 1")
+            return True
+
+    def sent(self):
+        """Requests counted by every process since the count last started over."""
+        with self._transaction() as conn:
+            return conn.execute("SELECT sent FROM limits").fetchone()[0]
+
+
+class SharedTokenBucket(TokenBucket):
+    """A TokenBucket whose tokens and pause live in SharedLimits, so processes pace together."""
+
+    def __init__(self, limits, rate, capacity):
+        super().__init__(rate, capacity)
+        self.limits = limits
+
+    def acquire(self):
+        wait = self.limits.take(self.rate, self.capacity)
+        if wait:
+            time.sleep(wait)
+        return wait
+
+    def try_acquire(self):
+        if not self.rate:
+            return True
+        return self.limits.try_take(self.rate, self.capacity)
+
+    def pause(self, seconds):
+        self.limits.pause(seconds)
+
+
+class Scheduler:
+    """Paces requests with a token bucket and retries throttled or transient failures.
+
+    `budget` caps the requests (retries included) one run may send; when it
+    is None the MOLTBOOK_REQUEST_BUDGET environment variable is used, so
+    scripts launched together by one job can be given the same ceiling.
+    With `limits_path` (the default) the pacing and the budget are shared
+    through SharedLimits with every other Moltbook process running at the
+    same time; None keeps them to this process.
+    """
+
+    def __init__(self, rate=RATE_LIMIT / RATE_PERIOD, burst=BURST, budget=None,
+                 max_retries=MAX_RETRIES, backoff_base=BACKOFF_BASE, backoff_cap=BACKOFF_CAP,
+                 limits_path=LIMITS_PATH):
+        if budget is None and os.environ.get(BUDGET_ENV):
+            budget = int(os.environ[BUDGET_ENV])
+        # Nothing to coordinate without a rate or a budget, so unpaced runs never touch the file
+        self.limits = SharedLimits(limits_path) if limits_path and (rate or budget is not None) else None
+        self.bucket = SharedTokenBucket(self.limits, rate, burst) if self.limits else TokenBucket(rate, burst)
+        self.budget = budget
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        self.lock = threading.Lock()
+        self.sent = 0
+        self.retries = 0
+        self.throttled = 0
+        self.waited = 0.0
+
+    def _take(self):
+        with self.lock:
+            if self.limits:
+                allowed = self.limits.spend(self.budget)
+            else:
+                allowed = self.budget is None or self.sent < self.budget
+            if not allowed:
+                raise BudgetExceeded(f"request budget of {self.budget} used up")
+            self.sent += 1
+        waited = self.bucket.acquire()
+        with self.lock:
+            self.waited += waited
+
+    def exhausted(self):
+        """True once the budget is spent, by this process or by all that share it."""
+        if self.budget is None:
+            return False
+        return (self.limits.sent() if self.limits else self.sent) >= self.budget
+
+    def backoff(self, attempt):
+        """Full-jitter exponential backoff for the given retry attempt."""
+        return random.uniform(0, min(self.backoff_cap, self.backoff_base * 2 ** attempt))
+
+    def run(self, send):
+        """Call `send()` under the rate limit, retrying 429, 5xx and connection errors."""
+        for attempt in range(self.max_retries + 1):
+            self._take()
+            try:
+                return send()
+            except APIError as e:
+                if e.status not in RETRY_STATUSES or attempt == self.max_retries:
+                    raise
+                delay = retry_after(e.headers)
+                if delay is None:
+                    delay = self.backoff(attempt)
+                if e.status == 429:
+                    # The server is throttling this key: hold every thread, not just this one
+                    self.bucket.pause(delay)
+                    delay = 0.0
+                    with self.lock:
+                        self.throttled += 1
+            except (OSError, http.client.HTTPException):
+                if attempt == self.max_retries:
+                    raise
+                delay = self.backoff(attempt)
+            with self.lock:
+                self.retries += 1
+                self.waited += delay
+            if delay:
+                time.sleep(delay)
+
+
+class ConnectionPool:
+    """Idle keep-alive connections per (scheme, host, port), at most `size` open per host."""
+
+    def __init__(self, size=MAX_PER_HOST, timeout=TIMEOUT):
+        self.size = size
+        self.timeout = timeout
+        self.idle = {}    # key -> [connection]
+        self.slots = {}   # key -> BoundedSemaphore
+        self.lock = threading.Lock()
+        self.opened = 0
+
+    def acquire(self, scheme, host, port):
+        """Return (connection, reused) for the host, waiting for a free slot."""
+        key = (scheme, host, port)
+        with self.lock:
+            slot = self.slots.setdefault(key, threading.BoundedSemaphore(self.size))
+        slot.acquire()
+        with self.lock:
+            idle = self.idle.get(key)
+            if idle:
+                return idle.pop(), True
+            self.opened += 1
+        cls = http.client.HTTPSConnection if scheme == "https" else http.client.HTTPConnection
+        return cls(host, port, timeout=self.timeout), False
+
+    def release(self, scheme, host, port, conn, reusable=True):
+        """Return a connection to the pool (or close it) and free its slot."""
+        key = (scheme, host, port)
+        if reusable:
+            with self.lock:
+                self.idle.setdefault(key, []).append(conn)
+        else:
+            conn.close()
+        self.slots[key].release()
+
+    def close(self):
+        with self.lock:
+            for conns in self.idle.values():
+                for conn in conns:
+                    conn.close()
+            self.idle.clear()
+
+
+class ResponseCache:
+    """On-disk cache of GET responses, keyed by URL and by a hash of the API key.
+
+    Entries carry an expiry from CACHE_TTLS plus the response's ETag and
+    Last-Modified, so an expired entry can be revalidated with a conditional
+    request. Bodies are stored zlib-compressed; once the file passes
+    `max_bytes` the least recently used entries are evicted. Shared by every
+    Moltbook skill on the machine and safe across threads and processes.
+    """
+
+    SCHEMA = """
+    CREATE TABLE IF NOT EXISTS responses (
+        key           TEXT PRIMARY KEY,
+        url           TEXT NOT NULL,
+        etag          TEXT,
+        last_modified TEXT,
+        body          BLOB NOT NULL,
+        size          INTEGER NOT NULL,
+        stored        REAL NOT NULL,
+        expires       REAL NOT NULL,
+        last_used     REAL NOT NULL
+    );
+    CREATE INDEX IF NOT EXISTS responses_lru ON responses (last_used);
+    """
+
+    def __init__(self, path=CACHE_PATH, max_bytes=CACHE_MAX_BYTES):
+        self.path = path
+        self.max_bytes = max_bytes
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.conn = sqlite3.connect(path, timeout=TIMEOUT, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        with self.conn:
+            self.conn.executescript(self.SCHEMA)
+        self.lock = threading.Lock()
+        self.stores = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self.conn.close()
+
+    @staticmethod
+    def key(scope, url):
+        return hashlib.sha256(f"{scope}\n{url}".encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def ttl(path):
+        return next((ttl for pattern, ttl in CACHE_TTLS if pattern.match(path)), CACHE_DEFAULT_TTL)
+
+    def lookup(self, key):
+        """(body, etag, last_modified, stored, expires) for a key, or None."""
+        with self.lock, self.conn:
+            row = self.conn.execute(
+                "SELECT body, etag, last_modified, stored, expires FROM responses WHERE key = ?",
+                (key,)).fetchone()
+            if row is None:
+                return None
+            self.conn.execute("UPDATE responses SET last_used = ? WHERE key = ?", (time.time(), key))
+        return (zlib.decompress(row[0]),) + tuple(row[1:])
+
+    def store(self, key, url, body, etag, last_modified, ttl):
+        blob = zlib.compress(body, 1)
+        now = time.time()
+        with self.lock, self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO responses (key, url, etag, last_modified, body, size, stored, "
+                "expires, last_used) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, url, etag, last_modified, blob, len(blob), now, now + ttl, now))
+            self.stores += 1
+            if self.stores % CACHE_EVICT_EVERY == 0:
+                self._evict()
+
+    def refresh(self, key, ttl):
+        """Extend an entry after the server confirmed it unchanged (304)."""
+        now = time.time()
+        with self.lock, self.conn:
+            self.conn.execute("UPDATE responses SET stored = ?, expires = ?, last_used = ? WHERE key = ?",
+                              (now, now + ttl, now, key))
+
+    def _evict(self):
+        total = self.conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        target = self.max_bytes * 0.9   # some headroom so we don't evict on every store
+        for key, size in self.conn.execute(
+                "SELECT key, size FROM responses ORDER BY last_used").fetchall():
+            if total <= target:
+                break
+            self.conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+            total -= size
+
+    def clear(self):
+        with self.lock, self.conn:
+            self.conn.execute("DELETE FROM responses")
+
+
+class MoltbookClient:
+    """Authenticated JSON GETs against the Moltbook API over pooled connections.
+
+    Thread-safe: concurrent callers share the pool and never exceed
+    `max_per_host` connections to one host. With a `cache`, fresh responses
+    are served from disk, expired ones are revalidated, and `offline`
+    serves only what is cached.
+    """
+
+    def __init__(self, api_key, api_base=API_BASE, max_per_host=MAX_PER_HOST, timeout=TIMEOUT,
+                 scheduler=None, cache=None, offline=False):
+        self.api_key = api_key
+        self.api_base = api_base.rstrip("/")
+        self.pool = ConnectionPool(max_per_host, timeout)
+        self.scheduler = scheduler or Scheduler()
+        self.cache = cache
+        self.offline = offline
+        self.scope = hashlib.blake2b(api_key.encode("utf-8"), digest_size=16).hexdigest()
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.reused = 0
+        self.bytes_wire = 0
+        self.bytes_decoded = 0
+        self.cache_hits = 0
+        self.revalidated = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self.pool.close()
+        if self.cache:
+            self.cache.close()
+
+    def _headers(self):
+        return {
+            "Authorization": f"Bearer {self.api_key}",
+            "Accept": "application/json",
+            "Accept-Encoding": "gzip, deflate",
+            "Connection": "keep-alive",
+        }
+
+    def request(self, method, path, headers=None):
+        """Send one request; returns (status, reason, headers, decoded body bytes)."""
+        url = urlsplit(self.api_base + path)
+        scheme, host = url.scheme, url.hostname
+        port = url.port or (443 if scheme == "https" else 80)
+        target = url.path + (f"?{url.query}" if url.query else "")
+        all_headers = self._headers()
+        all_headers.update(headers or {})
+
+        for attempt in (1, 2):
+            conn, reused = self.pool.acquire(scheme, host, port)
+            try:
+                conn.request(method, target, headers=all_headers)
+                resp = conn.getresponse()
+                raw = resp.read()
+            except (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError):
+                self.pool.release(scheme, host, port, conn, reusable=False)
+                if reused and attempt == 1:
+                    continue  # the server closed an idle keep-alive connection; retry on a fresh one
+                raise
+            except BaseException:
+                self.pool.release(scheme, host, port, conn, reusable=False)
+                raise
+            self.pool.release(scheme, host, port, conn, reusable=not resp.will_close)
+            break
+
+        encoding = (resp.getheader("Content-Encoding") or "").lower()
+        if encoding == "gzip":
+            body = gzip.decompress(raw)
+        elif encoding == "deflate":
+            body = zlib.decompress(raw)
+        else:
+            body = raw
+        with self.lock:
+            self.requests += 1
+            self.reused += reused
+            self.bytes_wire += len(raw)
+            self.bytes_decoded += len(body)
+        return resp.status, resp.reason, resp.headers, body
+
+    def _get_once(self, path, headers=None):
+        status, reason, headers, body = self.request("GET", path, headers)
+        if status >= 400:
+            raise APIError(status, reason, body, headers)
+        return status, headers, body
+
+    def get(self, path, max_age=None):
+        """GET an API path and return the parsed JSON.
+
+        Throttled (429) and transient (5xx, connection) failures are retried
+        by the scheduler; raises APIError once retries are exhausted or for
+        any other HTTP error, and BudgetExceeded when the run's budget is spent.
+        A cached response is used while younger than its TTL (or `max_age`
+        seconds, when given); offline, any cached response is used and a
+        miss raises OfflineMiss.
+        """
+        if not self.cache:
+            return json.loads(self.scheduler.run(lambda: self._get_once(path))[2].decode())
+
+        key = ResponseCache.key(self.scope, self.api_base + path)
+        entry = self.cache.lookup(key)
+        now = time.time()
+        if entry is not None:
+            body, etag, last_modified, stored, expires = entry
+            fresh = now < expires if max_age is None else now - stored <= max_age
+            if fresh or self.offline:
+                with self.lock:
+                    self.cache_hits += 1
+                return json.loads(body.decode())
+        if self.offline:
+            raise OfflineMiss(f"not in the offline cache: {path}")
+
+        conditional = {}
+        if entry is not None:
+            if etag:
+                conditional["If-None-Match"] = etag
+            if last_modified:
+                conditional["If-Modified-Since"] = last_modified
+        status, headers, fetched = self.scheduler.run(lambda: self._get_once(path, conditional))
+
+        ttl = ResponseCache.ttl(path)
+        if status == 304 and entry is not None:
+            self.cache.refresh(key, ttl)
+            with self.lock:
+                self.revalidated += 1
+            return json.loads(entry[0].decode())
+        if "no-store" not in (headers.get("Cache-Control") or ""):
+            self.cache.store(key, self.api_base + path, fetched, headers.get("ETag"),
+                             headers.get("Last-Modified"), ttl)
+        return json.loads(fetched.decode())
+
+    def iter_pages(self, path, params=None, key="posts", page_size=PAGE_SIZE, max_items=None,
+                   since=None, prefetch=True, max_age=None):
+        """Yield successive pages (lists) of a listing endpoint.
+
+        Follows cursor or offset pagination. With `prefetch`, the next page is
+        requested in the background while the caller works on the current
+        one. Stops after `max_items` items, or at the first item created
+        before `since` (epoch seconds; listings are newest first). `max_age`
+        is passed to get(). Errors surface from the iteration that would
+        have returned the page.
+        """
+        params = dict(params or {})
+        seen = set()
+        served = 0
+        offset = 0
+
+        def fetch(extra):
+            query = dict(params, limit=page_size, **extra)
+            return self.get(f"{path}?{urlencode(query)}", max_age)
+
+        pool = ThreadPoolExecutor(max_workers=1) if prefetch else None
+        pending = None
+        try:
+            extra = {}
+            while extra is not None:
+                data = pending.result() if pending else fetch(extra)
+                pending = None
+                items = page_items(data, key)
+                ids = [str(i.get("id")) for i in items if i.get("id") is not None]
+                if ids and seen.issuperset(ids):
+                    break   # the server ignored our offset and repeated a page
+                seen.update(ids)
+
+                extra = next_page(data, items, page_size, offset)
+                offset += len(items)
+                if since is not None:
+                    cut = next((n for n, i in enumerate(items)
+                                if (item_time(i) or since) < since), None)
+                    if cut is not None:
+                        items, extra = items[:cut], None
+                if max_items is not None:
+                    items = items[:max_items - served]
+                    if served + len(items) >= max_items:
+                        extra = None
+                if extra is not None and pool:
+                    pending = pool.submit(fetch, extra)
+                if items:
+                    served += len(items)
+                    yield items
+        finally:
+            if pending:
+                pending.cancel()   # the consumer stopped early; drop the read-ahead
+            if pool:
+                pool.shutdown(wait=False)
+
+    def iter_posts(self, params=None, **kwargs):
+        """Yield posts one at a time across all pages; see iter_pages."""
+        for page in self.iter_pages("/posts", params, "posts", **kwargs):
+            yield from page
+
+    def metrics(self):
+        """Scheduler counters: requests sent, retries, 429s, seconds spent waiting."""
+        s = self.scheduler
+        return {"sent": s.sent, "retries": s.retries, "throttled": s.throttled,
+                "wait_seconds": round(s.waited, 3), "budget": s.budget}
+
+    def summary(self):
+        """Short account of connection reuse, compression savings, retries and cache use."""
+        saved = self.bytes_decoded - self.bytes_wire
+        m = self.metrics()
+        budget = f" of {m['budget']} budgeted" if m["budget"] is not None else ""
+        cache = (f"\n💾 {self.cache_hits} served from cache, {self.revalidated} revalidated unchanged (304)"
+                 if self.cache else "")
+        return (f"🔌 {self.requests} requests over {self.pool.opened} connections "
+                f"({self.reused} reused); {self.bytes_wire / 1024:.1f} KB on the wire, "
+                f"{self.bytes_decoded / 1024:.1f} KB decoded (compression saved {saved / 1024:.1f} KB)\n"
+                f"⏱️  {m['sent']} sent{budget}, {m['retries']} retries ({m['throttled']} throttled), "
+                f"{m['wait_seconds']:.2f}s waiting on rate limits and backoff{cache}")
+
+
+class ClientFactory:
+    """Run-wide client settings and the shared clients built from them.
+
+    One client (and so one connection pool) per API key; changing the rate
+    limit or cache settings drops the clients so the next `get` rebuilds them.
+    """
+
+    def __init__(self, api_base=API_BASE, cache_path=CACHE_PATH):
+        self.api_base = api_base
+        self.cache_path = cache_path
+        self.scheduler = Scheduler()
+        self.use_cache = True    # on-disk response cache (--no-cache turns it off)
+        self.offline = False     # serve only from the cache (--offline)
+        self.clients = {}
+
+    def configure_scheduler(self, rate_limit=RATE_LIMIT, budget=None):
+        """Rate limit (requests per RATE_PERIOD, 0 = none) and request budget for this run."""
+        self.scheduler = Scheduler(rate_limit / RATE_PERIOD if rate_limit else None, max(rate_limit // 2, 1), budget)
+        self.clients.clear()
+
+    def configure_cache(self, enabled=True, offline_only=False):
+        """Use the on-disk response cache, or serve only from it."""
+        self.use_cache, self.offline = enabled, offline_only
+        self.clients.clear()
+
+    def get(self, api_key):
+        """The run's shared client for `api_key`."""
+        if api_key not in self.clients:
+            cache = ResponseCache(self.cache_path) if self.use_cache or self.offline else None
+            self.clients[api_key] = MoltbookClient(api_key, self.api_base, scheduler=self.scheduler,
+                                                   cache=cache, offline=self.offline)
+        return self.clients[api_key]
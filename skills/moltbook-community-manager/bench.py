@@ -0,0 +1,535 @@
+#!/usr/bin/env python3
+"""
+Moltbook Community Manager — Benchmarks
+Runs the manager's fetch paths against a local mock Moltbook API with injected latency.
+"""
+
+import argparse
+import contextlib
+import gzip
+import hashlib
+import io
+import json
+import os
+import re
+import random
+import shutil
+import socket
+import sys
+import tempfile
+import time
+import threading
+import urllib.request
+import uuid
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qs
+
+import manager
+from moltbook_client import MoltbookClient, ResponseCache, Scheduler, TokenBucket
+from classifier import CommentClassifier, QUESTION_PATTERNS, SPAM_PATTERNS
+from state_store import StateStore
+
+
+class MockMoltbook(ThreadingHTTPServer):
+    """In-process stand-in for the Moltbook API.
+
+    Serves `posts` posts with `comments` comments each; every request sleeps
+    `latency` seconds, every new connection sleeps `connect_latency` seconds
+    (standing in for the TCP + TLS handshake), and posts whose index is a
+    multiple of `fail_every` answer /comments with HTTP 500. With a
+    `rate_limit` (requests/s, bursts of `burst`) excess requests get a 429
+    with Retry-After. Responses are gzipped when the client accepts it and
+    carry an ETag (a matching If-None-Match gets a 304), and /comments
+    honours `since`.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, posts=50, comments=20, latency=0.05, fail_every=0, connect_latency=0.0,
+                 rate_limit=None, burst=10):
+        super().__init__(("127.0.0.1", 0), MockHandler)
+        self.limiter = TokenBucket(rate_limit, burst)
+        self.throttled = 0
+        self.not_modified = 0
+        self.latency = latency
+        self.connect_latency = connect_latency
+        self.fail_every = fail_every
+        self.requests = 0
+        self.connections = 0
+        self.lock = threading.Lock()
+        newest = datetime(2026, 1, 31, 12, tzinfo=timezone.utc)
+        self.posts = [{"id": f"p{i}", "title": f"Post {i}", "comment_count": comments,
+                       "created_at": (newest - timedelta(hours=6 * i)).isoformat().replace("+00:00", "Z")}
+                      for i in range(posts)]
+        self.comments = {
+            p["id"]: [{"id": f"{p['id']}-c{j}", "author": {"username": f"user{j}"},
+                       "content": "Great post, thanks!" if j % 3 else "How does this work?",
+                       "created_at": f"2026-01-{1 + j % 28:02d}T13:00:00Z"} for j in range(comments)]
+            for p in self.posts
+        }
+
+    def add_comment(self, index, content="Thanks, this helped!"):
+        """Post a new comment (newer than any existing one) on post `index`."""
+        post = self.posts[index]
+        comments = self.comments[post["id"]]
+        created = datetime(2026, 2, 1, 9, tzinfo=timezone.utc) + timedelta(minutes=len(comments))
+        comments.append({"id": f"{post['id']}-c{len(comments)}", "author": {"username": "newcomer"},
+                         "content": content, "created_at": created.isoformat().replace("+00:00", "Z")})
+        post["comment_count"] = len(comments)
+
+    @property
+    def api_base(self):
+        return f"http://127.0.0.1:{self.server_address[1]}/api/v1"
+
+    def __enter__(self):
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc):
+        self.shutdown()
+        self.server_close()
+
+
+class MockHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def setup(self):
+        super().setup()
+        # Headers and body go out in separate writes; don't let Nagle hold the body back
+        self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        with self.server.lock:
+            self.server.connections += 1
+        time.sleep(self.server.connect_latency)
+
+    def send_json(self, status, payload):
+        body = json.dumps(payload).encode()
+        etag = f'"{hashlib.blake2b(body, digest_size=8).hexdigest()}"'
+        if status == 200 and self.headers.get("If-None-Match") == etag:
+            with self.server.lock:
+                self.server.not_modified += 1
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.send_header("Content-Length", "0")
+            return self.end_headers()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        if status == 200:
+            self.send_header("ETag", etag)
+        if "gzip" in self.headers.get("Accept-Encoding", ""):
+            body = gzip.compress(body)
+            self.send_header("Content-Encoding", "gzip")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        server = self.server
+        with server.lock:
+            server.requests += 1
+        if not server.limiter.try_acquire():
+            with server.lock:
+                server.throttled += 1
+            self.send_response(429)
+            self.send_header("Retry-After", "1")
+            self.send_header("Content-Length", "0")
+            return self.end_headers()
+        time.sleep(server.latency)
+        url = urlsplit(self.path)
+        parts = url.path.rstrip("/").split("/")[3:]  # after /api/v1
+        if parts == ["posts"]:
+            query = parse_qs(url.query)
+            limit = int(query.get("limit", ["50"])[0])
+            offset = int(query.get("offset", ["0"])[0])
+            return self.send_json(200, {"posts": server.posts[offset:offset + limit]})
+        if len(parts) == 3 and parts[0] == "posts" and parts[2] == "comments":
+            index = next((i for i, p in enumerate(server.posts) if p["id"] == parts[1]), None)
+            if index is None:
+                return self.send_json(404, {"error": "not found"})
+            if server.fail_every and index % server.fail_every == 0:
+                return self.send_json(500, {"error": "injected failure"})
+            comments = server.comments[parts[1]]
+            since = parse_qs(url.query).get("since")
+            if since:
+                comments = [c for c in comments if c["created_at"] > since[0]]
+            return self.send_json(200, {"comments": comments})
+        self.send_json(404, {"error": "not found"})
+
+
+def bench_concurrency(posts, comments, latency, levels, fail_every):
+    print(f"Comment fetch: {posts} posts, {latency * 1000:.0f} ms latency per request")
+    print(f"  {'Concurrency':>11} {'Time':>9} {'Posts/s':>9} {'Failed':>7}  Order")
+    with MockMoltbook(posts, comments, latency, fail_every) as server:
+        manager.clients.api_base = server.api_base
+        manager.clients.scheduler = Scheduler(None, max_retries=0)   # injected 500s are permanent here
+        manager.clients.clients.clear()
+        post_list = manager.fetch_my_posts("bench-key", "")
+        baseline = None
+        for level in levels:
+            start = time.perf_counter()
+            results = manager.fetch_comments_batch("bench-key", post_list, level)
+            elapsed = time.perf_counter() - start
+            order = [(p["id"], [c["id"] for c in cs]) for p, cs, _ in results]
+            baseline = baseline or order
+            failed = sum(1 for _, _, error in results if error)
+            print(f"  {level:>11} {elapsed * 1000:>7.0f}ms {len(results) / elapsed:>9.1f} {failed:>7}  "
+                  f"{'same' if order == baseline else 'DIFFERENT'}")
+
+
+def bench_incremental(posts, comments, latency, concurrency):
+    print(f"Incremental check: {posts} posts x {comments} comments, {latency * 1000:.0f} ms latency")
+    state_dir = tempfile.mkdtemp(prefix="manager-bench-")
+    manager.STATE_DB = os.path.join(state_dir, ".state.db")
+    manager.LEGACY_STATE_FILE = os.path.join(state_dir, ".last_check.json")
+    try:
+        with MockMoltbook(posts, comments, latency) as server:
+            manager.clients.api_base = server.api_base
+            manager.configure_scheduler(0)
+
+            def check(label):
+                server.requests = 0
+                out = io.StringIO()
+                start = time.perf_counter()
+                with contextlib.redirect_stdout(out):
+                    manager.cmd_check("bench-key", "", concurrency)
+                elapsed = time.perf_counter() - start
+                found = next((line for line in out.getvalue().splitlines()
+                              if "new comments found" in line or "No new comments" in line), "")
+                print(f"  {label:<22} {server.requests:>4} requests {elapsed * 1000:>7.0f}ms  "
+                      f"{found.strip('🆕✅ *')}")
+
+            check("First check")
+            check("Nothing changed")
+            server.add_comment(posts // 2)
+            check("One new comment")
+    finally:
+        shutil.rmtree(state_dir, ignore_errors=True)
+
+
+def bench_state(seen, new, repeat):
+    print(f"Check state: {seen:,} seen comment ids, {new} new per check")
+    state_dir = tempfile.mkdtemp(prefix="manager-bench-")
+    legacy = os.path.join(state_dir, ".last_check.json")
+    ids = [str(uuid.UUID(int=random.getrandbits(128), version=4)) for _ in range(seen)]
+    def new_ids(i):
+        return [f"{i:08x}-{j:04x}-4000-8000-000000000000" for j in range(new)]
+
+    try:
+        def json_check(i):
+            # What --check did with .last_check.json: load, extend, rewrite all of it
+            with open(legacy) as f:
+                state = json.load(f)
+            seen_ids = set(state["seen_comment_ids"])
+            fresh = [c for c in new_ids(i) if c not in seen_ids]
+            state["seen_comment_ids"] = list(seen_ids | set(fresh))
+            with open(legacy, "w") as f:
+                json.dump(state, f, indent=2)
+
+        def store_check(i):
+            with StateStore(os.path.join(state_dir, ".state.db"), None) as store:
+                fetched = new_ids(i)
+                known = store.seen(fetched)
+                store.record([(c, "p0") for c in fetched if c not in known], {}, ["p0"], "now")
+
+        with open(legacy, "w") as f:
+            json.dump({"last_check": None, "seen_comment_ids": ids}, f, indent=2)
+        json_size = os.path.getsize(legacy)
+        start = time.perf_counter()
+        with StateStore(os.path.join(state_dir, ".state.db"), legacy) as store:
+            migrated = time.perf_counter() - start
+            store_size = store.stats()["bytes"]
+        os.replace(legacy + ".migrated", legacy)
+        print(f"  Migration              {migrated * 1000:>8.1f}ms")
+
+        for label, fn, size in (("JSON rewrite", json_check, json_size), ("SQLite store", store_check, store_size)):
+            best = None
+            for i in range(repeat):
+                start = time.perf_counter()
+                fn(i)
+                elapsed = time.perf_counter() - start
+                best = elapsed if best is None else min(best, elapsed)
+            print(f"  {label:<22} {best * 1000:>8.1f}ms per check  {size / 1024:>9.1f} KB on disk")
+    finally:
+        shutil.rmtree(state_dir, ignore_errors=True)
+
+
+SAMPLE_COMMENTS = [
+    "Great post, thanks for sharing this with everyone here!",
+    "How does the Newton calculation work exactly?",
+    "Check out my channel for more lobster content",
+    "https://spam.xyz/win",
+    "I have been following the molting series for a while and this one finally made the physics "
+    "click for me. The diagrams in the second half were especially good.",
+    "Anyone know where the source data came from",
+    "Earn $500 daily from home, join our telegram group",
+    "Interesting take. I would love a follow-up on shell hardening.",
+]
+
+
+def legacy_categorize(comment):
+    """categorize_comment as it was: one uncompiled re.search per pattern."""
+    text = comment.get("content", "")
+    text_lower = text.lower()
+    for pattern in SPAM_PATTERNS:
+        if re.search(pattern, text_lower):
+            return "spam"
+    urls = re.findall(r'https?://\S+', text)
+    if urls and len(text.split()) < 10:
+        return "spam"
+    for pattern in QUESTION_PATTERNS:
+        if re.search(pattern, text_lower):
+            return "question"
+    return "genuine"
+
+
+def bench_classify(count, repeat):
+    print(f"Comment classification: {count:,} comments")
+    rnd = random.Random(42)
+    comments = [{"id": f"c{i}", "content": f"{rnd.choice(SAMPLE_COMMENTS)} #{i}"} for i in range(count)]
+    expected = [legacy_categorize(c) for c in comments]
+
+    def legacy():
+        # --check grouped with three passes, then format_comment classified again
+        for _ in range(4):
+            [legacy_categorize(c) for c in comments]
+
+    def compiled():
+        assert CommentClassifier().classify_batch(comments) == expected
+
+    warm = CommentClassifier()
+    warm.classify_batch(comments)
+
+    def cached():
+        warm.classify_batch(comments)
+
+    for label, fn, per_comment in (("Legacy (4 calls each)", legacy, 4), ("Compiled, cold cache", compiled, 1),
+                                   ("Compiled, warm cache", cached, 1)):
+        best = None
+        for _ in range(repeat):
+            start = time.perf_counter()
+            fn()
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        print(f"  {label:<22} {best * 1000:>8.1f}ms  {count / best:>12,.0f} comments/s")
+
+
+def bench_rate_limit(requests, server_rate, concurrency):
+    print(f"Rate limits: {requests} comment fetches, {concurrency} in flight, "
+          f"server allows {server_rate:.0f} req/s (bursts of 10), Retry-After: 1")
+    print(f"  {'Client':<28} {'Time':>8} {'Failed':>7} {'429s':>5} {'Retries':>8} {'Waiting':>8}")
+    runs = (("No retries, no pacing", Scheduler(None, max_retries=0)),
+            ("Retries, no pacing", Scheduler(None)),
+            ("Retries, paced to limit", Scheduler(server_rate, 5, limits_path=None)))
+    for label, scheduler in runs:
+        with MockMoltbook(requests, 5, 0.005, rate_limit=server_rate) as server:
+            manager.clients.api_base = server.api_base
+            manager.clients.scheduler = scheduler
+            manager.clients.clients.clear()
+            posts = [{"id": f"p{i}"} for i in range(requests)]
+            start = time.perf_counter()
+            results = manager.fetch_comments_batch("bench-key", posts, concurrency)
+            elapsed = time.perf_counter() - start
+            failed = sum(1 for _, _, error in results if error)
+            m = manager.get_client("bench-key").metrics()
+            print(f"  {label:<28} {elapsed * 1000:>6.0f}ms {failed:>7} {server.throttled:>5} "
+                  f"{m['retries']:>8} {m['wait_seconds']:>7.2f}s")
+
+
+def bench_pagination(posts, latency, work):
+    print(f"Post listing: {posts} posts in pages of 50, {latency * 1000:.0f} ms per page request, "
+          f"{work * 1000:.0f} ms of work per page")
+    with MockMoltbook(posts, 0, latency) as server:
+        for label, prefetch in (("Page by page", False), ("Read-ahead", True)):
+            with MoltbookClient("bench-key", server.api_base, scheduler=Scheduler(None)) as client:
+                server.requests = 0
+                count = 0
+                start = time.perf_counter()
+                for page in client.iter_pages("/posts", prefetch=prefetch):
+                    time.sleep(work)   # stands in for fetching and printing the page's comments
+                    count += len(page)
+                elapsed = time.perf_counter() - start
+                print(f"  {label:<22} {elapsed * 1000:>7.0f}ms  {count:>5} posts  {server.requests:>3} requests")
+
+        with MoltbookClient("bench-key", server.api_base, scheduler=Scheduler(None)) as client:
+            server.requests = 0
+            since = server.posts[posts // 3]["created_at"]
+            count = sum(1 for _ in client.iter_posts(since=manager.parse_since(since)))
+            print(f"  {'Since ' + since[:10]:<22} {'':>9}  {count:>5} posts  {server.requests:>3} requests")
+
+
+def bench_cache(posts, comments, latency):
+    print(f"Response cache: --history over {posts} posts x {comments} comments, {latency * 1000:.0f} ms latency")
+    cache_dir = tempfile.mkdtemp(prefix="manager-bench-")
+    cache_path = manager.clients.cache_path = os.path.join(cache_dir, "responses.db")
+    try:
+        with MockMoltbook(posts, comments, latency) as server:
+            manager.clients.api_base = server.api_base
+            manager.configure_scheduler(0)
+
+            def run(label, offline=False):
+                manager.configure_cache(True, offline)
+                client = manager.get_client("bench-key")
+                server.requests = server.not_modified = 0
+                start = time.perf_counter()
+                with contextlib.redirect_stdout(io.StringIO()):
+                    manager.cmd_history("bench-key", "", manager.DEFAULT_CONCURRENCY)
+                elapsed = time.perf_counter() - start
+                print(f"  {label:<28} {elapsed * 1000:>7.0f}ms {server.requests:>4} requests "
+                      f"{server.not_modified:>4} × 304  {client.bytes_wire / 1024:>7.1f} KB")
+                client.close()
+
+            run("Cold cache")
+            run("Within TTL")
+            with ResponseCache(cache_path) as cache:
+                with cache.conn:
+                    cache.conn.execute("UPDATE responses SET expires = 0")
+            run("Expired, revalidated")
+            server.add_comment(0)
+            with ResponseCache(cache_path) as cache:
+                with cache.conn:
+                    cache.conn.execute("UPDATE responses SET expires = 0")
+            run("Expired, one post changed")
+            run("Offline", offline=True)
+    finally:
+        manager.configure_cache(False)
+        shutil.rmtree(cache_dir, ignore_errors=True)
+
+
+def bench_watch(posts, comments, latency, duration):
+    """Requests and detection latency for --watch, adaptive vs fixed-interval polling.
+
+    One post gets a comment every 0.4 s for the first third of the run, a
+    quiet post gets one near the end, and nothing else changes.
+    """
+    fast, slow = 0.2, 3.2
+    print(f"Watch: {posts} posts, {duration:g}s run, {latency * 1000:.0f} ms latency; "
+          f"one hot post, one late comment on a quiet post")
+    print(f"  {'Polling':<26} {'Requests':>8} {'Found':>6} {'Hot post delay':>15} {'Quiet post delay':>17}")
+    state_dir = tempfile.mkdtemp(prefix="manager-bench-")
+    try:
+        for label, low, high in ((f"Fixed every {fast:g}s", fast, fast), (f"Fixed every {slow:g}s", slow, slow),
+                                 (f"Adaptive {fast:g}s..{slow:g}s", fast, slow)):
+            manager.STATE_DB = os.path.join(state_dir, f"{low}-{high}.db")
+            manager.LEGACY_STATE_FILE = os.path.join(state_dir, ".last_check.json")
+            with MockMoltbook(posts, comments, latency) as server:
+                manager.clients.api_base = server.api_base
+                manager.configure_scheduler(0)
+                with contextlib.redirect_stdout(io.StringIO()):
+                    manager.cmd_check("bench-key", "")   # start from up-to-date state
+
+                out, stop = io.StringIO(), threading.Event()
+                added = {}
+
+                def watch():
+                    with contextlib.redirect_stdout(out):
+                        manager.cmd_watch("bench-key", "", min_interval=low, max_interval=high, stop=stop)
+
+                server.requests = 0
+                watcher = threading.Thread(target=watch)
+                with contextlib.redirect_stderr(io.StringIO()):
+                    watcher.start()
+                    start = time.monotonic()
+                    events = [(0.4 * (i + 1), 1) for i in range(int(duration / 1.2))]
+                    events.append((duration - slow - 0.5, posts - 1))
+                    for at, index in sorted(events):
+                        time.sleep(max(start + at - time.monotonic(), 0))
+                        server.add_comment(index)
+                        added[server.comments[f"p{index}"][-1]["id"]] = time.time()
+                    time.sleep(max(start + duration - time.monotonic(), 0))
+                    stop.set()
+                    watcher.join()
+                requests = server.requests
+
+            delays = {}
+            for e in map(json.loads, out.getvalue().splitlines()):
+                if e["id"] in added:
+                    delays.setdefault(e["post_id"], []).append(datetime.fromisoformat(e["seen_at"]).timestamp() - added[e["id"]])
+            hot, quiet = delays.get("p1", []), delays.get(f"p{posts - 1}", [])
+            print(f"  {label:<26} {requests:>8} {len(hot) + len(quiet):>3}/{len(added):<2} "
+                  f"{sum(hot) / max(len(hot), 1) * 1000:>10.0f}ms avg "
+                  f"{sum(quiet) * 1000:>13.0f}ms")
+    finally:
+        shutil.rmtree(state_dir, ignore_errors=True)
+
+
+def urllib_get(api_base, path):
+    """A GET the way the manager did it before the shared client: new connection, no gzip."""
+    req = urllib.request.Request(f"{api_base}{path}")
+    req.add_header("Authorization", "Bearer bench-key")
+    req.add_header("Accept", "application/json")
+    with urllib.request.urlopen(req, timeout=30) as resp:
+        return len(resp.read())
+
+
+def bench_connection_reuse(posts, comments, requests, connect_latency):
+    print(f"Connection reuse: {requests} sequential requests, "
+          f"{connect_latency * 1000:.0f} ms simulated handshake per new connection")
+    with MockMoltbook(posts, comments, 0.0, 0, connect_latency) as server:
+        paths = [f"/posts/p{i % posts}/comments" for i in range(requests)]
+
+        start = time.perf_counter()
+        received = sum(urllib_get(server.api_base, path) for path in paths)
+        elapsed = time.perf_counter() - start
+        print(f"  urllib per request   {elapsed * 1000:>7.0f}ms  {server.connections:>3} connections  "
+              f"{received / 1024:>7.1f} KB")
+
+        server.connections = 0
+        with MoltbookClient("bench-key", server.api_base, scheduler=Scheduler(None)) as client:
+            start = time.perf_counter()
+            for path in paths:
+                client.get(path)
+            elapsed = time.perf_counter() - start
+            print(f"  pooled keep-alive    {elapsed * 1000:>7.0f}ms  {server.connections:>3} connections  "
+                  f"{client.bytes_wire / 1024:>7.1f} KB")
+            print(f"  {client.summary()}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Moltbook Community Manager benchmarks")
+    parser.add_argument("--posts", type=int, default=50, help="Posts served by the mock API")
+    parser.add_argument("--comments", type=int, default=20, help="Comments per post")
+    parser.add_argument("--latency", type=float, default=0.05, help="Injected latency per request (seconds)")
+    parser.add_argument("--concurrency", default="1,4,8,16", help="Comma-separated concurrency levels")
+    parser.add_argument("--fail-every", type=int, default=10,
+                        help="Fail /comments for every Nth post (0 = never)")
+    parser.add_argument("--requests", type=int, default=100, help="Requests for the connection reuse run")
+    parser.add_argument("--connect-latency", type=float, default=0.02,
+                        help="Simulated handshake per new connection (seconds)")
+    parser.add_argument("--seen", type=int, default=200000, help="Seen comment ids for the state run")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per measurement (best is reported)")
+    parser.add_argument("--classify", type=int, default=20000, help="Comments for the classifier run")
+    parser.add_argument("--server-rate", type=float, default=50, help="Mock API rate limit for the rate-limit run (req/s)")
+    parser.add_argument("--listing", type=int, default=1000, help="Posts for the pagination run")
+    parser.add_argument("--watch-seconds", type=float, default=12, help="Length of the watch run (seconds)")
+    parser.add_argument("--only", choices=["concurrency", "connections", "incremental", "state", "classify",
+                                           "ratelimit", "pagination", "cache", "watch"],
+                        help="Run a single benchmark")
+    args = parser.parse_args()
+
+    manager.configure_cache(False)   # benchmarks never touch the real response cache
+    levels = [int(c) for c in args.concurrency.split(",") if c]
+    if args.only in (None, "concurrency"):
+        bench_concurrency(args.posts, args.comments, args.latency, levels, args.fail_every)
+    if args.only in (None, "connections"):
+        bench_connection_reuse(args.posts, args.comments, args.requests, args.connect_latency)
+    if args.only in (None, "incremental"):
+        bench_incremental(args.posts, args.comments, args.latency, manager.DEFAULT_CONCURRENCY)
+    if args.only in (None, "state"):
+        bench_state(args.seen, args.comments, args.repeat)
+    if args.only in (None, "classify"):
+        bench_classify(args.classify, args.repeat)
+    if args.only in (None, "ratelimit"):
+        bench_rate_limit(args.requests, args.server_rate, manager.DEFAULT_CONCURRENCY)
+    if args.only in (None, "pagination"):
+        bench_pagination(args.listing, args.latency, args.latency)
+    if args.only in (None, "cache"):
+        bench_cache(args.posts, args.comments, args.latency)
+    if args.only in (None, "watch"):
+        bench_watch(args.posts, args.comments, args.latency, args.watch_seconds)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Moltbook Community Manager — Comment Classifier
+Sorts comments into spam, question, or genuine in a single pass.
+
+Each pattern set is compiled once into one alternation, so a comment costs
+at most three regex scans (spam, bare URLs, questions) on a single
+lowercased copy of its text. Results are memoized by comment id and a hash
+of the content, so an edited comment is classified again while repeat
+lookups (grouping, formatting, later watch cycles) are dictionary hits.
+"""
+
+import hashlib
+import re
+
+# URL patterns for spam detection
+SPAM_PATTERNS = [
+    r'https?://\S+\.(xyz|tk|ml|ga|cf|gq|click|buzz|top)',
+    r'(?:check\s+out|visit|click)\s+(?:my|this)\s+(?:link|site|page|channel)',
+    r'(?:follow\s+me|sub(?:scribe)?)\s+(?:at|on|@)',
+    r'(?:free\s+(?:money|crypto|tokens|nft))',
+    r'(?:earn\s+\$?\d+\s+(?:daily|per\s+day|per\s+hour))',
+    r'(?:join\s+(?:my|our)\s+(?:discord|telegram|group))',
+    r'(?:DM\s+me\s+for)',
+]
+
+QUESTION_PATTERNS = [
+    r'\?$',
+    r'^(?:how|what|why|when|where|who|which|can|could|would|should|is|are|do|does|did)\b',
+    r'(?:anyone\s+know|does\s+anyone|help\s+me)',
+    r'(?:explain|elaborate|clarify)',
+]
+
+URL_RE = re.compile(r'https?://\S+')
+CACHE_SIZE = 100000   # memoized classifications kept per process
+
+
+def compile_alternation(patterns):
+    """One regex matching wherever any of `patterns` would."""
+    return re.compile("|".join(f"(?:{p})" for p in patterns))
+
+
+def comment_text(comment):
+    return comment.get("content", comment.get("body", comment.get("text", "")))
+
+
+class CommentClassifier:
+    """Memoizing spam / question / genuine classifier."""
+
+    def __init__(self, spam_patterns=SPAM_PATTERNS, question_patterns=QUESTION_PATTERNS,
+                 cache_size=CACHE_SIZE):
+        self.spam_re = compile_alternation(spam_patterns)
+        self.question_re = compile_alternation(question_patterns)
+        self.cache_size = cache_size
+        self.cache = {}   # (comment id, content hash) -> category, oldest first
+        self.hits = 0
+        self.misses = 0
+
+    def categorize_text(self, text):
+        """Category of a comment body, without the cache."""
+        text_lower = text.lower()
+        if self.spam_re.search(text_lower):
+            return "spam"
+        # Mostly URLs
+        if len(text.split()) < 10 and URL_RE.search(text):
+            return "spam"
+        if self.question_re.search(text_lower):
+            return "question"
+        return "genuine"
+
+    def classify(self, comment):
+        """Category of one comment: "spam", "question", or "genuine"."""
+        text = comment_text(comment)
+        key = (comment.get("id"), hashlib.blake2b(text.encode("utf-8"), digest_size=8).digest())
+        category = self.cache.get(key)
+        if category is not None:
+            self.hits += 1
+            return category
+        self.misses += 1
+        category = self.categorize_text(text)
+        if len(self.cache) >= self.cache_size:
+            del self.cache[next(iter(self.cache))]
+        self.cache[key] = category
+        return category
+
+    def classify_batch(self, comments):
+        """Categories for many comments, in order."""
+        classify = self.classify
+        return [classify(c) for c in comments]
@@ -5,34 +5,36 @@ Tracks new comments, categorizes spam, and suggests replies.
 """
 
 import argparse
+import http.client
 import json
 import os
-import re
 import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
-import urllib.request
-import urllib.error
+from urllib.parse import urlencode
+
+from classifier import CommentClassifier, URL_RE, comment_text
+from moltbook_client import (APIError, BudgetExceeded, ClientFactory, OfflineMiss, MAX_PER_HOST, RATE_LIMIT,
+                             item_time)
+from state_store import StateStore, STATE_DB, LEGACY_STATE_FILE, RETENTION_DAYS
 
 API_BASE = "https://www.moltbook.com/api/v1"
-STATE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".last_check.json")
-
-# URL patterns for spam detection
-SPAM_PATTERNS = [
-    r'https?://\S+\.(xyz|tk|ml|ga|cf|gq|click|buzz|top)',
-    r'(?:check\s+out|visit|click)\s+(?:my|this)\s+(?:link|site|page|channel)',
-    r'(?:follow\s+me|sub(?:scribe)?)\s+(?:at|on|@)',
-    r'(?:free\s+(?:money|crypto|tokens|nft))',
-    r'(?:earn\s+\$?\d+\s+(?:daily|per\s+day|per\s+hour))',
-    r'(?:join\s+(?:my|our)\s+(?:discord|telegram|group))',
-    r'(?:DM\s+me\s+for)',
-]
-
-QUESTION_PATTERNS = [
-    r'\?$',
-    r'^(?:how|what|why|when|where|who|which|can|could|would|should|is|are|do|does|did)\b',
-    r'(?:anyone\s+know|does\s+anyone|help\s+me)',
-    r'(?:explain|elaborate|clarify)',
-]
+
+DEFAULT_CONCURRENCY = 8   # comment fetches in flight at once
+CHECK_POSTS = 50          # posts --check looks at unless --max-posts says otherwise
+SINCE_PARAM = "since"     # /comments query parameter for "only newer than"; ignored by servers without it
+WATCH_MIN_INTERVAL = 30   # --watch: seconds between polls of a post with fresh comments
+WATCH_MAX_INTERVAL = 900  # --watch: longest a quiet post goes unpolled
+
+
+def parse_since(value):
+    """Epoch seconds for a --since date or ISO timestamp (UTC unless it says otherwise)."""
+    dt = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return dt.timestamp()
 
 
 def get_api_key():
@@ -52,84 +54,129 @@ def get_api_key():
     return ""
 
 
-def api_get(path, api_key):
-    """Make authenticated GET request to Moltbook API."""
-    url = f"{API_BASE}{path}"
-    req = urllib.request.Request(url)
-    req.add_header("Authorization", f"Bearer {api_key}")
-    req.add_header("Accept", "application/json")
+clients = ClientFactory(API_BASE)   # shared clients, scheduler and cache settings for this run
+configure_scheduler = clients.configure_scheduler
+configure_cache = clients.configure_cache
+get_client = clients.get
+
+
+def api_request(path, api_key, max_age=None):
+    """Authenticated GET returning parsed JSON; raises on any failure."""
+    return get_client(api_key).get(path, max_age)
+
+
+def describe_error(e):
+    """One-line description of a failed request."""
+    if isinstance(e, (APIError, BudgetExceeded, OfflineMiss)):
+        return str(e)
+    if isinstance(e, (OSError, http.client.HTTPException)):
+        return f"Connection error: {e}"
+    return f"{type(e).__name__}: {e}"
+
+
+REQUEST_ERRORS = (APIError, BudgetExceeded, OfflineMiss, OSError, http.client.HTTPException)
+
 
+def iter_post_pages(api_key, username, max_posts=None, since=None, max_age=None):
+    """Pages of the user's posts, newest first, read ahead one page in the background."""
+    params = {"author": username} if username else {}
+    return get_client(api_key).iter_pages("/posts", params, "posts", max_items=max_posts, since=since,
+                                          max_age=max_age)
+
+
+def fetch_my_posts(api_key, username, limit=CHECK_POSTS, since=None, max_age=None):
+    """Fetch up to `limit` of the user's posts (None = all); None if the listing failed."""
     try:
-        with urllib.request.urlopen(req, timeout=30) as resp:
-            return json.loads(resp.read().decode())
-    except urllib.error.HTTPError as e:
-        print(f"❌ API error: HTTP {e.code} — {e.reason}", file=sys.stderr)
-        return None
-    except urllib.error.URLError as e:
-        print(f"❌ Connection error: {e.reason}", file=sys.stderr)
-        return None
-    except Exception as e:
-        print(f"❌ Error: {e}", file=sys.stderr)
+        return [p for page in iter_post_pages(api_key, username, limit, since, max_age) for p in page]
+    except REQUEST_ERRORS as e:
+        print(f"❌ Could not list posts: {describe_error(e)}", file=sys.stderr)
         return None
 
 
-def fetch_my_posts(api_key, username, limit=50):
-    """Fetch the user's posts."""
-    path = f"/posts?limit={limit}"
-    if username:
-        path += f"&author={username}"
-    data = api_get(path, api_key)
-    if data is None:
-        return []
-    return data if isinstance(data, list) else data.get("posts", data.get("data", []))
+def comments_from(data):
+    """Comment list from a /comments response body."""
+    return data if isinstance(data, list) else data.get("comments", data.get("data", []))
 
 
-def fetch_comments(api_key, post_id):
-    """Fetch comments for a specific post."""
-    data = api_get(f"/posts/{post_id}/comments", api_key)
-    if data is None:
-        return []
-    return data if isinstance(data, list) else data.get("comments", data.get("data", []))
+def fetch_comments_batch(api_key, posts, concurrency=DEFAULT_CONCURRENCY, since=None, max_age=None):
+    """Fetch comments for many posts with at most `concurrency` requests in flight.
 
+    Returns (post, comments, error) tuples in the same order as `posts`
+    (posts without an id are skipped); error is None or a message, so one
+    failing post never hides the others. `since` maps post ids to the newest
+    comment timestamp already seen; those posts ask only for newer comments.
+    `max_age` bounds how old a cached response may be (0 = revalidate).
+    """
+    since = since or {}
 
-def load_state():
-    """Load the last check state."""
-    if os.path.exists(STATE_FILE):
+    def fetch(post):
+        path = f"/posts/{post['id']}/comments"
+        if since.get(post["id"]) is not None:
+            path += "?" + urlencode({SINCE_PARAM: since[post["id"]]})
         try:
-            with open(STATE_FILE) as f:
-                return json.load(f)
-        except Exception:
-            pass
-    return {"last_check": None, "seen_comment_ids": []}
+            return post, comments_from(api_request(path, api_key, max_age)), None
+        except Exception as e:
+            return post, [], describe_error(e)
 
+    posts = [p for p in posts if p.get("id")]
+    if concurrency <= 1 or len(posts) <= 1:
+        return [fetch(p) for p in posts]
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        return list(pool.map(fetch, posts))
 
-def save_state(state):
-    """Save the check state."""
-    with open(STATE_FILE, "w") as f:
-        json.dump(state, f, indent=2)
 
+def report_failures(results):
+    """Summarize posts whose comments could not be fetched."""
+    failed = [(post, error) for post, _, error in results if error]
+    if not failed:
+        return
+    print(f"⚠️  Could not fetch comments for {len(failed)} post(s):", file=sys.stderr)
+    for post, error in failed:
+        print(f"   • {post.get('title', 'Untitled')} ({post.get('id')}): {error}", file=sys.stderr)
 
-def categorize_comment(comment):
-    """Categorize a comment as spam, question, or genuine."""
-    text = comment.get("content", comment.get("body", comment.get("text", "")))
-    text_lower = text.lower()
 
-    # Check spam patterns
-    for pattern in SPAM_PATTERNS:
-        if re.search(pattern, text_lower):
-            return "spam"
+def open_state():
+    """Open the check state, importing a legacy .last_check.json on first use."""
+    return StateStore(STATE_DB, LEGACY_STATE_FILE)
 
-    # Check if it contains mostly URLs
-    urls = re.findall(r'https?://\S+', text)
-    if urls and len(text.split()) < 10:
-        return "spam"
 
-    # Check question patterns
-    for pattern in QUESTION_PATTERNS:
-        if re.search(pattern, text_lower):
-            return "question"
+def comment_count(post):
+    """Comment count reported by the post listing, or None if it has none."""
+    count = post.get("comment_count", post.get("comments"))
+    return count if isinstance(count, int) else None
 
-    return "genuine"
+
+def latest_comment(comments, previous=None):
+    """Newest raw timestamp among `comments`, starting from `previous`."""
+    latest, latest_time = previous, item_time({"created_at": previous})
+    for c in comments:
+        t = item_time(c)
+        if t is not None and (latest_time is None or t > latest_time):
+            latest, latest_time = c.get("created_at", c.get("timestamp")), t
+    return latest
+
+
+def changed_posts(posts, snapshots):
+    """Posts whose comment count differs from the stored snapshot.
+
+    Posts never seen before, and posts whose listing carries no count,
+    always count as changed.
+    """
+    changed = []
+    for post in posts:
+        snapshot = snapshots.get(str(post.get("id")))
+        count = comment_count(post)
+        if snapshot is None or count is None or snapshot.get("comment_count") != count:
+            changed.append(post)
+    return changed
+
+
+classifier = CommentClassifier()
+
+
+def categorize_comment(comment):
+    """Categorize a comment as spam, question, or genuine."""
+    return classifier.classify(comment)
 
 
 def generate_reply_suggestion(comment):
@@ -154,7 +201,7 @@ def generate_reply_suggestion(comment):
         return f"Thanks for your comment @{author_name}! 🇵🇪"
 
 
-def format_comment(comment, post_title=""):
+def format_comment(comment, post_title="", category=None):
     """Format a comment for display."""
     author = comment.get("author", {})
     if isinstance(author, dict):
@@ -169,52 +216,65 @@ def format_comment(comment, post_title=""):
     if isinstance(ts, (int, float)):
         ts = datetime.fromtimestamp(ts, tz=timezone.utc).strftime("%Y-%m-%d %H:%M")
 
-    category = categorize_comment(comment)
+    category = category or categorize_comment(comment)
     cat_icon = {"spam": "🚫", "question": "❓", "genuine": "💬"}.get(category, "💬")
 
     post_info = f" (on: {post_title})" if post_title else ""
     return f"  {cat_icon} **@{author_name}** — {preview}\n     _{ts}{post_info}_"
 
 
-def cmd_check(api_key, username):
-    """Show new comments since last check."""
-    state = load_state()
-    last_check = state.get("last_check")
-    seen_ids = set(state.get("seen_comment_ids", []))
-
-    posts = fetch_my_posts(api_key, username)
-    if not posts:
-        print("📭 No posts found.")
-        return
-
-    new_comments = []
-    all_comment_ids = list(seen_ids)
+def sync_comments(store, api_key, posts, changed, snapshots, concurrency=DEFAULT_CONCURRENCY):
+    """Fetch comments for the `changed` posts and record them in the state store.
 
-    print(f"🔍 Checking comments on {len(posts)} posts...")
-    if last_check:
-        print(f"   Last check: {last_check}")
-    print()
+    Each post asks only for comments newer than the last one seen; anything
+    the API sends anyway is filtered against the seen ids. Returns
+    (new comments, fetch results); a post's snapshot only advances when its
+    fetch succeeded, so failed posts are retried next time.
+    """
+    since = {p["id"]: snapshots.get(str(p["id"]), {}).get("latest") for p in changed if p.get("id")}
+    # A changed count means any cached copy of these comments is stale: always revalidate
+    results = fetch_comments_batch(api_key, changed, concurrency, since, max_age=0)
 
-    for post in posts:
+    fetched, updated = [], {}
+    for post, comments, error in results:
         post_id = post.get("id")
-        post_title = post.get("title", "Untitled")
-        if not post_id:
-            continue
-
-        comments = fetch_comments(api_key, post_id)
+        if not error:
+            previous = snapshots.get(str(post_id), {}).get("latest")
+            updated[str(post_id)] = {"comment_count": comment_count(post),
+                                     "latest": latest_comment(comments, previous)}
         for c in comments:
-            cid = str(c.get("id", ""))
-            all_comment_ids.append(cid)
-
-            if cid and cid not in seen_ids:
-                c["_post_title"] = post_title
+            if c.get("id"):
+                c["_post_title"] = post.get("title", "Untitled")
                 c["_post_id"] = post_id
-                new_comments.append(c)
+                fetched.append(c)
+
+    seen = store.seen(c["id"] for c in fetched)
+    new_comments = [c for c in fetched if str(c["id"]) not in seen]
+    store.record([(c["id"], c["_post_id"]) for c in fetched], updated,
+                 [p.get("id") for p in posts if p.get("id")],
+                 datetime.now(timezone.utc).isoformat())
+    return new_comments, results
+
+
+def cmd_check(api_key, username, concurrency=DEFAULT_CONCURRENCY, max_posts=CHECK_POSTS, since=None):
+    """Show new comments since last check."""
+    posts = fetch_my_posts(api_key, username, max_posts, since)
+    if posts is None:
+        sys.exit(1)
+    if not posts:
+        print("📭 No posts found.")
+        return
 
-    # Update state
-    state["last_check"] = datetime.now(timezone.utc).isoformat()
-    state["seen_comment_ids"] = list(set(all_comment_ids))
-    save_state(state)
+    with open_state() as store:
+        # Only posts whose comment count moved need their comments fetched
+        snapshots = store.snapshots()
+        changed = changed_posts(posts, snapshots)
+        print(f"🔍 Checking comments on {len(posts)} posts ({len(changed)} changed)...")
+        if store.last_check:
+            print(f"   Last check: {store.last_check}")
+        print()
+        new_comments, results = sync_comments(store, api_key, posts, changed, snapshots, concurrency)
+    report_failures(results)
 
     if not new_comments:
         print("✅ No new comments since last check.")
@@ -222,49 +282,66 @@ def cmd_check(api_key, username):
 
     print(f"🆕 **{len(new_comments)} new comments found!**\n")
 
-    # Group by category
-    genuine = [c for c in new_comments if categorize_comment(c) == "genuine"]
-    questions = [c for c in new_comments if categorize_comment(c) == "question"]
-    spam = [c for c in new_comments if categorize_comment(c) == "spam"]
+    # Group by category, classifying each comment once
+    groups = {"genuine": [], "question": [], "spam": []}
+    for c, category in zip(new_comments, classifier.classify_batch(new_comments)):
+        groups[category].append(c)
+    genuine, questions, spam = groups["genuine"], groups["question"], groups["spam"]
 
     if genuine:
         print(f"💬 Genuine Engagement ({len(genuine)}):")
         for c in genuine:
-            print(format_comment(c, c.get("_post_title", "")))
+            print(format_comment(c, c.get("_post_title", ""), "genuine"))
             print(f"     💡 Suggested reply: {generate_reply_suggestion(c)}")
             print()
 
     if questions:
         print(f"❓ Questions ({len(questions)}):")
         for c in questions:
-            print(format_comment(c, c.get("_post_title", "")))
+            print(format_comment(c, c.get("_post_title", ""), "question"))
             print(f"     💡 Suggested reply: {generate_reply_suggestion(c)}")
             print()
 
     if spam:
         print(f"🚫 Suspected Spam ({len(spam)}):")
         for c in spam:
-            print(format_comment(c, c.get("_post_title", "")))
+            print(format_comment(c, c.get("_post_title", ""), "spam"))
             print()
 
 
-def cmd_history(api_key, username):
-    """Show all comments across all posts."""
-    posts = fetch_my_posts(api_key, username)
-    if not posts:
-        print("📭 No posts found.")
-        return
+def stream_comments(api_key, username, concurrency, max_posts=None, since=None, listing_errors=None):
+    """Yield (post, comments, error) across the whole post listing, a page at a time.
+
+    Comments for one page are fetched while the next page of posts is read
+    ahead. If the listing itself breaks off, the stream ends and the error
+    message is appended to `listing_errors`.
+    """
+    try:
+        for page in iter_post_pages(api_key, username, max_posts, since):
+            yield from fetch_comments_batch(api_key, page, concurrency)
+    except REQUEST_ERRORS as e:
+        if listing_errors is not None:
+            listing_errors.append(describe_error(e))
+
+
+def report_listing_errors(listing_errors, posts_seen):
+    """Report a listing that broke off; exit if it produced nothing."""
+    for error in listing_errors:
+        print(f"❌ Listing posts stopped early: {error}", file=sys.stderr)
+    if listing_errors and not posts_seen:
+        sys.exit(1)
 
-    print(f"📜 Comment History — {len(posts)} posts\n")
+
+def cmd_history(api_key, username, concurrency=DEFAULT_CONCURRENCY, max_posts=None, since=None):
+    """Show all comments across all posts."""
+    print("📜 Comment History\n")
 
     total_comments = 0
-    for post in posts:
-        post_id = post.get("id")
+    results, listing_errors = [], []
+    for post, comments, error in stream_comments(api_key, username, concurrency, max_posts, since,
+                                                 listing_errors):
+        results.append((post, comments, error))
         post_title = post.get("title", "Untitled")
-        if not post_id:
-            continue
-
-        comments = fetch_comments(api_key, post_id)
         if comments:
             print(f"### {post_title}")
             print(f"    ({len(comments)} comments)\n")
@@ -273,40 +350,175 @@ def cmd_history(api_key, username):
                 print()
             total_comments += len(comments)
 
-    print(f"---\n📊 Total: {total_comments} comments across {len(posts)} posts")
-
-
-def cmd_spam(api_key, username):
-    """List suspected spam comments."""
-    posts = fetch_my_posts(api_key, username)
-    if not posts:
+    report_listing_errors(listing_errors, results)
+    total_posts = len(results)
+    if not total_posts:
         print("📭 No posts found.")
         return
+    print(f"---\n📊 Total: {total_comments} comments across {total_posts} posts")
+    report_failures(results)
 
+
+def cmd_spam(api_key, username, concurrency=DEFAULT_CONCURRENCY, max_posts=None, since=None):
+    """List suspected spam comments."""
     print("🚫 Suspected Spam Comments\n")
 
     spam_count = 0
-    for post in posts:
-        post_id = post.get("id")
+    results, listing_errors = [], []
+    for post, comments, error in stream_comments(api_key, username, concurrency, max_posts, since,
+                                                 listing_errors):
+        results.append((post, comments, error))
         post_title = post.get("title", "Untitled")
-        if not post_id:
-            continue
-
-        comments = fetch_comments(api_key, post_id)
-        for c in comments:
-            if categorize_comment(c) == "spam":
-                print(format_comment(c, post_title))
-                text = c.get("content", c.get("body", c.get("text", "")))
-                urls = re.findall(r'https?://\S+', text)
+        for c, category in zip(comments, classifier.classify_batch(comments)):
+            if category == "spam":
+                print(format_comment(c, post_title, category))
+                urls = URL_RE.findall(comment_text(c))
                 if urls:
                     print(f"     🔗 URLs: {', '.join(urls)}")
                 print()
                 spam_count += 1
 
+    report_listing_errors(listing_errors, results)
+    if not results:
+        print("📭 No posts found.")
+        return
     if spam_count == 0:
         print("✅ No spam detected! Your community is clean. 🦞")
     else:
         print(f"---\n⚠️  Found {spam_count} suspected spam comments.")
+    report_failures(results)
+
+
+class PollSchedule:
+    """When each watched post is next due, backing off while it stays quiet.
+
+    A post starts (and, whenever it gets new comments, restarts) at
+    `min_interval`; each poll that finds nothing doubles its interval, up
+    to `max_interval`. Times are time.monotonic() seconds.
+    """
+
+    def __init__(self, min_interval=WATCH_MIN_INTERVAL, max_interval=WATCH_MAX_INTERVAL):
+        self.min_interval = min_interval
+        self.max_interval = max(max_interval, min_interval)
+        self.interval = {}   # post id -> seconds between polls
+        self.due = {}        # post id -> when it is next polled
+
+    def track(self, post_ids, now):
+        """Watch exactly `post_ids`: new posts are due at once, vanished ones are dropped."""
+        post_ids = set(post_ids)
+        for post_id in set(self.due) - post_ids:
+            del self.due[post_id], self.interval[post_id]
+        for post_id in post_ids - set(self.due):
+            self.interval[post_id] = self.min_interval
+            self.due[post_id] = now
+
+    def due_posts(self, now):
+        return {post_id for post_id, due in self.due.items() if due <= now}
+
+    def next_due(self, default=None):
+        return min(self.due.values(), default=default)
+
+    def update(self, post_id, active, now):
+        """Reschedule a polled post: back to the fastest rate if `active`, else back off."""
+        if active:
+            interval = self.min_interval
+        else:
+            interval = min(self.interval.get(post_id, self.min_interval) * 2, self.max_interval)
+        self.interval[post_id] = interval
+        self.due[post_id] = now + interval
+
+
+def comment_event(comment, category):
+    """One NDJSON line describing a new comment."""
+    author = comment.get("author", {})
+    if isinstance(author, dict):
+        author = author.get("username", author.get("name", "unknown"))
+    return json.dumps({
+        "type": "comment",
+        "post_id": comment.get("_post_id"),
+        "post_title": comment.get("_post_title", ""),
+        "id": comment.get("id"),
+        "author": str(author),
+        "content": comment_text(comment),
+        "created_at": comment.get("created_at", comment.get("timestamp")),
+        "category": category,
+        "suggested_reply": None if category == "spam" else generate_reply_suggestion(comment),
+        "seen_at": datetime.now(timezone.utc).isoformat(),
+    }, ensure_ascii=False)
+
+
+def cmd_watch(api_key, username, concurrency=DEFAULT_CONCURRENCY, max_posts=CHECK_POSTS,
+              min_interval=WATCH_MIN_INTERVAL, max_interval=WATCH_MAX_INTERVAL, stop=None):
+    """Poll for new comments until `stop` is set, printing each as an NDJSON line.
+
+    Every cycle shares one client (and so one connection pool) and one
+    state store, and follows the same state as --check. The post listing
+    carries comment counts, so it is re-read whenever a post that has one
+    falls due (and at least every `max_interval`, to pick up new posts), and
+    only posts whose count moved are fetched; posts whose listing has no
+    count are fetched directly when due. Status goes to stderr so stdout
+    stays machine-readable.
+    """
+    stop = stop or threading.Event()
+    schedule = PollSchedule(min_interval, max_interval)
+    posts, counted, listed_at = [], set(), None
+    print(f"👀 Watching for new comments (every {min_interval:g}s on active posts, "
+          f"backing off to {schedule.max_interval:g}s)...", file=sys.stderr)
+
+    with open_state() as store:
+        while not stop.is_set():
+            now = time.monotonic()
+            due = schedule.due_posts(now)
+            relisted = (listed_at is None or now - listed_at >= schedule.max_interval
+                        or not due.isdisjoint(counted))
+            if relisted:
+                try:
+                    posts = [p for page in iter_post_pages(api_key, username, max_posts, max_age=0)
+                             for p in page if p.get("id")]
+                except BudgetExceeded as e:
+                    print(f"❌ {e}", file=sys.stderr)
+                    return
+                except REQUEST_ERRORS as e:
+                    print(f"❌ Listing posts failed: {describe_error(e)}", file=sys.stderr)
+                    stop.wait(min_interval)
+                    continue
+                listed_at = now
+                counted = {p["id"] for p in posts if comment_count(p) is not None}
+                schedule.track((p["id"] for p in posts), now)
+                due = schedule.due_posts(now)
+
+            # Count-less posts look changed on every listing; poll those only when due
+            snapshots = store.snapshots()
+            changed = [p for p in changed_posts(posts, snapshots) if p["id"] in counted or p["id"] in due]
+            new_comments, results = sync_comments(store, api_key, posts if relisted else [], changed,
+                                                  snapshots, concurrency)
+            report_failures(results)
+
+            for c, category in zip(new_comments, classifier.classify_batch(new_comments)):
+                print(comment_event(c, category))
+            sys.stdout.flush()
+
+            active = {c["_post_id"] for c in new_comments}
+            for post_id in due | active:
+                schedule.update(post_id, post_id in active, now)
+
+            if clients.scheduler.exhausted():
+                print(f"❌ Request budget of {clients.scheduler.budget} used up; stopping.", file=sys.stderr)
+                return
+            wake = min(schedule.next_due(now + schedule.max_interval), listed_at + schedule.max_interval)
+            stop.wait(max(wake - time.monotonic(), 0))
+
+
+def cmd_compact(retention_days=None):
+    """Prune state older than the retention window and vacuum the store."""
+    with open_state() as store:
+        before = store.stats()
+        posts, comments = store.prune(retention_days)
+        store.compact(force=True)
+        after = store.stats()
+    print(f"🧹 Removed {posts} posts and {comments} comment ids past retention")
+    print(f"   {before['seen_comments']} → {after['seen_comments']} seen comments, "
+          f"{before['bytes'] / 1024:.1f} KB → {after['bytes'] / 1024:.1f} KB")
 
 
 def main():
@@ -316,27 +528,74 @@ def main():
     )
     parser.add_argument("--api-key", "-k", help="Moltbook API key (or MOLTBOOK_API_KEY env)")
     parser.add_argument("--username", "-u", help="Your Moltbook username")
+    parser.add_argument("--concurrency", "-c", type=int, default=DEFAULT_CONCURRENCY,
+                        help=f"Comment requests in flight at once (default: {DEFAULT_CONCURRENCY}; "
+                             f"at most {MAX_PER_HOST} connections per host)")
+    parser.add_argument("--rate-limit", type=int, default=RATE_LIMIT,
+                        help=f"Requests per minute to stay under (default: {RATE_LIMIT}; 0 = no limit)")
+    parser.add_argument("--max-posts", type=int,
+                        help=f"Posts to scan, newest first (default: {CHECK_POSTS} for --check, all otherwise)")
+    parser.add_argument("--since", help="Only scan posts created on or after this date (YYYY-MM-DD or ISO time)")
+    parser.add_argument("--budget", type=int,
+                        help="Most requests this run may send, retries included "
+                             "(default: MOLTBOOK_REQUEST_BUDGET env, else unlimited)")
+    parser.add_argument("--offline", action="store_true", help="Serve only cached responses; no network")
+    parser.add_argument("--no-cache", action="store_true", help="Bypass the on-disk response cache")
+    parser.add_argument("--debug", action="store_true",
+                        help="Print connection reuse, compression, retry and cache stats to stderr")
 
     group = parser.add_mutually_exclusive_group(required=True)
     group.add_argument("--check", action="store_true", help="Show new comments since last check")
     group.add_argument("--history", action="store_true", help="Show all comments across all posts")
     group.add_argument("--spam", action="store_true", help="List suspected spam comments")
+    group.add_argument("--watch", action="store_true",
+                       help="Keep polling and print each new comment as a JSON line (Ctrl-C to stop)")
+    group.add_argument("--compact", action="store_true",
+                       help="Prune old check state and compact the state store")
+    parser.add_argument("--retention-days", type=int,
+                        help=f"With --compact: forget posts unlisted for this many days (default: {RETENTION_DAYS})")
+    parser.add_argument("--min-interval", type=float, default=WATCH_MIN_INTERVAL,
+                        help=f"With --watch: seconds between polls of an active post (default: {WATCH_MIN_INTERVAL})")
+    parser.add_argument("--max-interval", type=float, default=WATCH_MAX_INTERVAL,
+                        help=f"With --watch: longest a quiet post waits between polls (default: {WATCH_MAX_INTERVAL})")
 
     args = parser.parse_args()
 
+    if args.compact:
+        cmd_compact(args.retention_days)
+        return
+
     api_key = args.api_key or get_api_key()
     if not api_key:
         print("❌ No API key. Use --api-key, MOLTBOOK_API_KEY, or ~/.config/moltbook/credentials.json", file=sys.stderr)
         sys.exit(1)
 
     username = args.username or os.environ.get("MOLTBOOK_USERNAME", "")
+    configure_cache(not args.no_cache, args.offline)
+    configure_scheduler(args.rate_limit, args.budget)
+    since = None
+    if args.since:
+        try:
+            since = parse_since(args.since)
+        except ValueError:
+            print(f"❌ Invalid --since date: {args.since}", file=sys.stderr)
+            sys.exit(1)
 
     if args.check:
-        cmd_check(api_key, username)
+        cmd_check(api_key, username, args.concurrency, args.max_posts or CHECK_POSTS, since)
     elif args.history:
-        cmd_history(api_key, username)
+        cmd_history(api_key, username, args.concurrency, args.max_posts, since)
     elif args.spam:
-        cmd_spam(api_key, username)
+        cmd_spam(api_key, username, args.concurrency, args.max_posts, since)
+    elif args.watch:
+        try:
+            cmd_watch(api_key, username, args.concurrency, args.max_posts or CHECK_POSTS,
+                      args.min_interval, args.max_interval)
+        except KeyboardInterrupt:
+            print("\n👋 Stopped watching.", file=sys.stderr)
+
+    if args.debug:
+        print(get_client(api_key).summary(), file=sys.stderr)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+"""
+Moltbook Community Manager — State Store
+What --check has already seen, in SQLite instead of an ever-growing JSON list.
+
+Seen comment ids are stored as 64-bit hashes in the table's integer primary
+key, so each id costs a few bytes and a check looks up only the ids it just
+fetched and writes only the new ones, in one transaction. (A false "seen"
+needs a hash collision; across a million comments the odds of any are
+about 3 in 10^8.) Post snapshots (comment count, newest comment) sit
+alongside.
+Posts that have not appeared in the post listing for RETENTION_DAYS are
+forgotten together with their comment ids, and the file is vacuumed once
+enough of it is free pages. An existing .last_check.json is imported on
+first use and renamed to .last_check.json.migrated.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import time
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+STATE_DB = os.path.join(SCRIPT_DIR, ".state.db")
+LEGACY_STATE_FILE = os.path.join(SCRIPT_DIR, ".last_check.json")
+
+RETENTION_DAYS = 180       # forget posts (and their comment ids) unlisted for this long
+PRUNE_EVERY = 86400        # seconds between automatic prunes
+VACUUM_FREE_RATIO = 0.25   # vacuum once this share of the file is free pages
+BUSY_TIMEOUT = 30
+CHUNK = 500                # ids per IN (...) query
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS seen (
+    id         INTEGER PRIMARY KEY,   -- id_key(comment id)
+    post       INTEGER NOT NULL,      -- id_key(post id), 0 if unknown
+    first_seen INTEGER NOT NULL       -- day number
+);
+CREATE TABLE IF NOT EXISTS posts (
+    key           INTEGER PRIMARY KEY,
+    post_id       TEXT NOT NULL,
+    comment_count INTEGER,
+    latest        TEXT,
+    last_listed   REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS meta (
+    key   TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+
+def id_key(value):
+    """Signed 64-bit hash of an id, as stored in the integer keys."""
+    digest = hashlib.blake2b(str(value).encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "big", signed=True) or 1   # 0 means "no post"
+
+
+def today(now=None):
+    return int((time.time() if now is None else now) // 86400)
+
+
+def chunks(items, size=CHUNK):
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+
+class StateStore:
+    """Seen comment ids and per-post snapshots for incremental checks."""
+
+    def __init__(self, path=STATE_DB, legacy_path=LEGACY_STATE_FILE, retention_days=RETENTION_DAYS):
+        self.path = path
+        self.retention_days = retention_days
+        self.conn = sqlite3.connect(path, timeout=BUSY_TIMEOUT)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        with self.conn:
+            self.conn.executescript(SCHEMA)
+        if legacy_path and os.path.exists(legacy_path):
+            self.migrate(legacy_path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self.conn.close()
+
+    def _meta(self, key):
+        row = self.conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def _set_meta(self, key, value):
+        self.conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, value))
+
+    @property
+    def last_check(self):
+        """ISO timestamp of the last completed check, or None."""
+        return self._meta("last_check")
+
+    def snapshots(self):
+        """post id -> {"comment_count", "latest"} as of the last check."""
+        return {post_id: {"comment_count": count, "latest": latest}
+                for post_id, count, latest in self.conn.execute(
+                    "SELECT post_id, comment_count, latest FROM posts")}
+
+    def seen(self, comment_ids):
+        """The subset of `comment_ids` already recorded."""
+        keys = {id_key(c): str(c) for c in comment_ids if c}
+        found = set()
+        for part in chunks(list(keys)):
+            found.update(keys[row[0]] for row in self.conn.execute(
+                f"SELECT id FROM seen WHERE id IN ({','.join('?' * len(part))})", part))
+        return found
+
+    def record(self, comments, snapshots, listed, checked_at):
+        """Commit one check atomically.
+
+        `comments` are (comment id, post id) pairs to mark seen (ids migrated
+        without a post are claimed by it), `snapshots` maps post ids to their
+        new snapshot, and `listed` holds every post id the listing returned.
+        """
+        now = time.time()
+        day = today(now)
+        with self.conn:
+            self.conn.executemany(
+                "INSERT INTO seen (id, post, first_seen) VALUES (?, ?, ?) "
+                "ON CONFLICT (id) DO UPDATE SET post = excluded.post WHERE seen.post = 0",
+                ((id_key(cid), id_key(pid), day) for cid, pid in comments if cid))
+            self.conn.executemany(
+                "INSERT INTO posts (key, post_id, comment_count, latest, last_listed) VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT (key) DO UPDATE SET comment_count = excluded.comment_count, "
+                "latest = excluded.latest, last_listed = excluded.last_listed",
+                ((id_key(pid), str(pid), snap.get("comment_count"), snap.get("latest"), now)
+                 for pid, snap in snapshots.items()))
+            self.conn.executemany("UPDATE posts SET last_listed = ? WHERE key = ?",
+                                  ((now, id_key(pid)) for pid in listed))
+            self._set_meta("last_check", checked_at)
+
+        last_prune = float(self._meta("last_prune") or 0)
+        if now - last_prune >= PRUNE_EVERY:
+            self.prune()
+            self.compact()
+
+    def prune(self, retention_days=None):
+        """Forget posts unlisted for `retention_days` and comment ids no post claims.
+
+        Returns (posts removed, comment ids removed).
+        """
+        days = self.retention_days if retention_days is None else retention_days
+        now = time.time()
+        cutoff = now - days * 86400
+        with self.conn:
+            posts = self.conn.execute("DELETE FROM posts WHERE last_listed < ?", (cutoff,)).rowcount
+            comments = self.conn.execute(
+                "DELETE FROM seen WHERE first_seen < ? "
+                "AND post NOT IN (SELECT key FROM posts)", (today(cutoff),)).rowcount
+            self._set_meta("last_prune", str(now))
+        return posts, comments
+
+    def compact(self, force=False):
+        """VACUUM once free pages pass VACUUM_FREE_RATIO (or always, with force)."""
+        pages = self.conn.execute("PRAGMA page_count").fetchone()[0]
+        free = self.conn.execute("PRAGMA freelist_count").fetchone()[0]
+        if force or (pages and free / pages >= VACUUM_FREE_RATIO):
+            self.conn.execute("VACUUM")
+            self.conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+            return True
+        return False
+
+    def stats(self):
+        """Row counts and on-disk size."""
+        seen = self.conn.execute("SELECT COUNT(*) FROM seen").fetchone()[0]
+        posts = self.conn.execute("SELECT COUNT(*) FROM posts").fetchone()[0]
+        size = sum(os.path.getsize(self.path + suffix) for suffix in ("", "-wal")
+                   if os.path.exists(self.path + suffix))
+        return {"seen_comments": seen, "posts": posts, "bytes": size, "last_check": self.last_check}
+
+    def migrate(self, legacy_path):
+        """Import a .last_check.json state file, then rename it out of the way."""
+        try:
+            with open(legacy_path) as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            state = {}
+        now = time.time()
+        day = today(now)
+        with self.conn:
+            # The JSON list never recorded which post an id belongs to; those
+            # ids are claimed by their post when it is next fetched, and age
+            # out under the retention policy otherwise.
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO seen (id, post, first_seen) VALUES (?, 0, ?)",
+                ((id_key(cid), day) for cid in state.get("seen_comment_ids", []) if cid))
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO posts (key, post_id, comment_count, latest, last_listed) "
+                "VALUES (?, ?, ?, ?, ?)",
+                ((id_key(pid), str(pid), snap.get("comment_count"), snap.get("latest"), now)
+                 for pid, snap in state.get("posts", {}).items()))
+            if state.get("last_check") and self.last_check is None:
+                self._set_meta("last_check", state["last_check"])
+        self.conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        os.replace(legacy_path, legacy_path + ".migrated")
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Moltbook API Client — Tests
+Run with: python3 -m unittest test_moltbook_client   (or pytest)
+"""
+
+import multiprocessing
+import os
+import shutil
+import tempfile
+import time
+import unittest
+
+from moltbook_client import BudgetExceeded, Scheduler
+
+
+def send_until_refused(limits_path, budget, start, results):
+    """One process: send through its own Scheduler until the budget refuses."""
+    scheduler = Scheduler(None, budget=budget, max_retries=0, limits_path=limits_path)
+    start.wait()
+    sent = 0
+    try:
+        while True:
+            scheduler.run(lambda: None)
+            sent += 1
+    except BudgetExceeded:
+        results.put(sent)
+
+
+def send_paced(limits_path, rate, count, start, results):
+    """One process: send `count` requests paced by its own Scheduler."""
+    scheduler = Scheduler(rate, 1, max_retries=0, limits_path=limits_path)
+    start.wait()
+    began = time.monotonic()
+    for _ in range(count):
+        scheduler.run(lambda: None)
+    results.put((began, time.monotonic()))
+
+
+class SharedLimitsTest(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.mkdtemp(prefix="moltbook-test-")
+        self.limits_path = os.path.join(self.dir, "limits.db")
+
+    def tearDown(self):
+        shutil.rmtree(self.dir, ignore_errors=True)
+
+    def run_together(self, target, *args):
+        """Run `target` in two processes released at the same moment; returns their results."""
+        start, results = multiprocessing.Event(), multiprocessing.Queue()
+        workers = [multiprocessing.Process(target=target, args=(self.limits_path, *args, start, results))
+                   for _ in range(2)]
+        for p in workers:
+            p.start()
+        start.set()
+        reports = [results.get(timeout=60) for _ in workers]
+        for p in workers:
+            p.join(timeout=60)
+        return reports
+
+    def test_concurrent_schedulers_share_one_budget(self):
+        sent = self.run_together(send_until_refused, 30)
+        self.assertEqual(sum(sent), 30)
+
+    def test_concurrent_schedulers_share_one_rate(self):
+        # 2 x 10 requests at 40/s with a burst of 1: about 0.5s shared, 0.25s if each paced alone
+        spans = self.run_together(send_paced, 40.0, 10)
+        elapsed = max(end for _, end in spans) - min(began for began, _ in spans)
+        self.assertGreaterEqual(elapsed, 0.4)
+
+    def test_budget_starts_over_for_the_next_run(self):
+        self.run_together(send_until_refused, 5)
+        scheduler = Scheduler(None, budget=5, limits_path=self.limits_path)
+        self.assertFalse(scheduler.exhausted())
+        scheduler.run(lambda: None)
+        self.assertEqual(scheduler.sent, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+"""
+Translator Pro - Benchmarks
+Times glossary hot paths on synthetic data in a throwaway glossary directory:
+concurrent writers, layered domain stacks and fuzzy lookups.
+Author: Peru 🇵🇪
+"""
+
+import os
+import sys
+import time
+import random
+import shutil
+import argparse
+import tempfile
+import multiprocessing
+from bisect import bisect_left, bisect_right
+from collections import Counter
+from pathlib import Path
+
+import glossary
+from glossary import GlossaryStore, VersionConflict, compile_matcher
+from fuzzy_index import FuzzyIndex, edit_distance, normalize, trigram_keys
+
+
+def use_glossary_dir(path):
+    """Point glossary.py at a scratch directory so real glossaries are untouched.
+
+    Also exported through the environment, so a child process that
+    re-imports glossary (spawn / forkserver start methods) starts there too.
+    """
+    os.environ[glossary.GLOSSARY_DIR_ENV] = str(path)
+    glossary.GLOSSARY_DIR = Path(path)
+    glossary.MANIFEST_PATH = glossary.GLOSSARY_DIR / ".manifest.db"
+
+
+def add_terms(directory, worker, terms, results):
+    """One writer process: add `terms` unique terms, one transaction each."""
+    use_glossary_dir(directory)
+    with GlossaryStore("stress") as store:
+        for i in range(terms):
+            store.upsert(f"w{worker} term {i}", f"t{worker}-{i}", "en", "es")
+    results.put(("added", terms, 0))
+
+
+def increment_counter(directory, worker, increments, results):
+    """One writer process: read-modify-write a shared term with optimistic retries."""
+    use_glossary_dir(directory)
+    conflicts = 0
+    with GlossaryStore("stress") as store:
+        for _ in range(increments):
+            while True:
+                version = store.version()
+                current = store.lookup("counter", "en", "es")
+                value = int(current["target"]) if current else 0
+                try:
+                    store.upsert("counter", str(value + 1), "en", "es", expected_version=version)
+                    break
+                except VersionConflict:
+                    conflicts += 1
+    results.put(("incremented", increments, conflicts))
+
+
+def run_processes(target, processes, count):
+    results = multiprocessing.Queue()
+    # Workers get the scratch directory explicitly rather than inheriting module state
+    workers = [multiprocessing.Process(target=target, args=(str(glossary.GLOSSARY_DIR), w, count, results))
+               for w in range(processes)]
+    start = time.perf_counter()
+    for p in workers:
+        p.start()
+    for p in workers:
+        p.join()
+    elapsed = time.perf_counter() - start
+    reports = [results.get() for _ in workers]
+    return elapsed, sum(r[2] for r in reports)
+
+
+def bench_concurrency(processes, terms, increments):
+    print(f"Concurrent glossary writes: {processes} processes")
+
+    with GlossaryStore("stress") as store:
+        store.upsert("counter", "0", "en", "es")
+
+    elapsed, _ = run_processes(add_terms, processes, terms)
+    expected = processes * terms
+    with GlossaryStore("stress") as store:
+        actual = store.count() - 1
+    print(f"  Independent adds:   {expected} writes in {elapsed:.2f}s ({expected / elapsed:,.0f}/s), "
+          f"lost updates: {expected - actual}")
+
+    elapsed, conflicts = run_processes(increment_counter, processes, increments)
+    expected = processes * increments
+    with GlossaryStore("stress") as store:
+        actual = int(store.lookup("counter", "en", "es")["target"])
+    print(f"  Read-modify-write:  {expected} increments in {elapsed:.2f}s ({expected / elapsed:,.0f}/s), "
+          f"{conflicts} version conflicts retried, lost updates: {expected - actual}")
+    return expected - actual
+
+
+def make_stack(domains, terms, seed=42):
+    """Fill `domains` glossaries whose terms overlap, as real layered stacks do."""
+    rnd = random.Random(seed)
+    vocabulary = [f"word{i}" for i in range(terms)]
+    names = [f"layer{i}" for i in range(domains)]
+    for name in names:
+        chosen = rnd.sample(vocabulary, terms // 2)
+        rows = ((" ".join(rnd.sample(vocabulary, rnd.randint(1, 2))) if i % 3 else word,
+                 f"{name}:{word}", "en", "es") for i, word in enumerate(chosen))
+        with GlossaryStore(name) as store:
+            store.bulk_upsert(rows)
+    text = " ".join(rnd.choices(vocabulary, k=20000))
+    return names, text
+
+
+def bench_stack(domains, terms, repeat):
+    print(f"Layered glossary stack: {domains} domains x {terms // 2} terms, 20k-word text")
+    names, text = make_stack(domains, terms)
+    layers = [compile_matcher(name, "en", "es") for name in names]
+    merged = compile_matcher(",".join(names), "en", "es")
+
+    def sequential():
+        out = text
+        for matcher in layers:
+            out = matcher.apply(out)[0]
+        return out
+
+    def single():
+        return merged.apply(text)[0]
+
+    for label, fn in (("Sequential per-domain", sequential), ("Merged stack index", single)):
+        best = None
+        for _ in range(repeat):
+            start = time.perf_counter()
+            fn()
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        print(f"  {label:<22} {best * 1000:>8.1f}ms")
+
+    start = time.perf_counter()
+    compile_matcher(",".join(names), "en", "es")
+    print(f"  {'Cached stack load':<22} {(time.perf_counter() - start) * 1000:>8.1f}ms")
+
+
+def full_scan_search(index, term, top=5, max_distance=2):
+    """FuzzyIndex.search as it was before rarest-first scanning: every posting list counted in full."""
+    key = normalize(term)
+    max_distance = min(max_distance, len(key) // 3)
+    grams = trigram_keys(key)
+    need = max(1, len(grams) - 3 * max_distance)
+    lo_id = bisect_left(index.lengths, len(key) - max_distance)
+    hi_id = bisect_right(index.lengths, len(key) + max_distance)
+    shared = Counter()
+    for gram in grams:
+        start, end = index._postings(gram)
+        a = bisect_left(index.postings, lo_id, start, end)
+        shared.update(index.postings[a:bisect_left(index.postings, hi_id, a, end)])
+    results = []
+    for term_id, count in shared.items():
+        if count >= need:
+            candidate = index.keys[term_id]
+            distance = edit_distance(key, candidate, max_distance)
+            if distance <= max_distance:
+                results.append((distance, abs(len(candidate) - len(key)), candidate, term_id))
+    results.sort()
+    return [(d, index.sources[t], index.targets[t]) for d, _, _, t in results[:top]]
+
+
+def bench_fuzzy(terms, repeat):
+    print(f"Fuzzy lookups: {terms} terms sharing a common prefix (numbered settings, SKUs)")
+    index = FuzzyIndex.from_pairs((f"config setting {i:06d}", f"ajuste {i}") for i in range(terms))
+    queries = ["config setting 01234x", "config seting 123456", "confg setting 299999", "kubernetes deployment"]
+
+    mismatches = sum(full_scan_search(index, q) != index.search(q) for q in queries)
+    for label, fn in (("Every posting list", lambda q: full_scan_search(index, q)),
+                      ("Rarest lists first", index.search)):
+        best = None
+        for _ in range(repeat):
+            start = time.perf_counter()
+            for q in queries:
+                fn(q)
+            elapsed = (time.perf_counter() - start) / len(queries)
+            best = elapsed if best is None else min(best, elapsed)
+        print(f"  {label:<22} {best * 1000:>8.1f}ms per lookup")
+    print(f"  Results differ on {mismatches} of {len(queries)} queries")
+    return mismatches
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Translator Pro benchmarks")
+    parser.add_argument("--processes", type=int, default=16, help="Concurrent writer processes")
+    parser.add_argument("--terms", type=int, default=200, help="Terms added per process")
+    parser.add_argument("--increments", type=int, default=50, help="Counter increments per process")
+    parser.add_argument("--domains", type=int, default=5, help="Domains in the layered stack")
+    parser.add_argument("--stack-terms", type=int, default=40000, help="Vocabulary size for the stack")
+    parser.add_argument("--fuzzy-terms", type=int, default=300000, help="Terms in the fuzzy index")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per measurement (best is reported)")
+    parser.add_argument("--only", choices=["concurrency", "stack", "fuzzy"], help="Run a single benchmark")
+    args = parser.parse_args()
+
+    scratch = tempfile.mkdtemp(prefix="glossary-bench-")
+    use_glossary_dir(scratch)
+    lost = mismatches = 0
+    try:
+        if args.only in (None, "concurrency"):
+            lost = bench_concurrency(args.processes, args.terms, args.increments)
+        if args.only in (None, "stack"):
+            bench_stack(args.domains, args.stack_terms, args.repeat)
+        if args.only in (None, "fuzzy"):
+            mismatches = bench_fuzzy(args.fuzzy_terms, args.repeat)
+    finally:
+        shutil.rmtree(scratch, ignore_errors=True)
+    return 1 if lost or mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
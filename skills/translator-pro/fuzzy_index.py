@@ -0,0 +1,260 @@
+#!/usr/bin/env python3
+"""
+Fuzzy Term Index for Translator Pro v1.0.0
+Trigram index over normalized glossary source terms for "did you mean" lookups.
+Author: Peru 🇵🇪
+
+Terms are normalized (accents stripped, case-folded, whitespace collapsed)
+and indexed by their padded character trigrams. Terms are numbered in order
+of length, so the terms within edit distance k of a query's length form one
+contiguous id range, and each posting list is cut to that range by bisection
+before shared trigrams are counted. A term within edit distance k keeps all
+but at most 3k of its trigrams, on either side, so only candidates sharing
+enough trigrams reach the exact edit-distance check. Only the 3k + 1 rarest
+of the query's posting lists can hold every such candidate, so those are
+scanned and the common ones (say, a prefix every term shares) are probed per
+candidate by bisection instead of read in full. Like the term matcher, the
+index is a handful of flat arrays that are saved once and memory-mapped on
+later runs.
+"""
+
+import os
+import mmap
+import struct
+import tempfile
+import unicodedata
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import Counter
+
+from matcher import StringTable
+
+CHAR_BITS = 21
+PAD_START = '\x02\x02'
+PAD_END = '\x03\x03'
+
+CACHE_MAGIC = b'GLFZ'
+CACHE_FORMAT = 2
+CACHE_HEADER = struct.Struct('<4sIQQQQQ')  # magic, format, stamp, grams, terms, postings, blob bytes
+
+
+def normalize(term: str) -> str:
+    """Accent-free, case-folded, whitespace-collapsed form of a term."""
+    decomposed = unicodedata.normalize('NFKD', term)
+    stripped = ''.join(ch for ch in decomposed if not unicodedata.combining(ch))
+    return ' '.join(stripped.casefold().split())
+
+
+def trigram_keys(key: str) -> set:
+    """Distinct padded trigrams of a normalized term, packed into ints."""
+    padded = PAD_START + key + PAD_END
+    return {(ord(padded[i]) << (2 * CHAR_BITS)) | (ord(padded[i + 1]) << CHAR_BITS) | ord(padded[i + 2])
+            for i in range(len(padded) - 2)}
+
+
+def edit_distance(a: str, b: str, limit: int) -> int:
+    """Levenshtein distance, or limit + 1 as soon as it must exceed limit.
+
+    A shared prefix and suffix cost nothing and are skipped, and only the
+    band of cells within `limit` of the diagonal is filled in, since any
+    path leaving it already costs more.
+    """
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    if len(a) < len(b):
+        a, b = b, a
+    start = 0
+    while start < len(b) and a[start] == b[start]:
+        start += 1
+    end_a, end_b = len(a), len(b)
+    while end_b > start and a[end_a - 1] == b[end_b - 1]:
+        end_a -= 1
+        end_b -= 1
+    a, b = a[start:end_a], b[start:end_b]
+    if not b:
+        return len(a)
+    over = limit + 1
+    previous = [j if j <= limit else over for j in range(len(b) + 1)]
+    for i, ca in enumerate(a, 1):
+        current = [over] * (len(b) + 1)
+        if i <= limit:
+            current[0] = i
+        for j in range(max(1, i - limit), min(len(b), i + limit) + 1):
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ca != b[j - 1]))
+        if min(current) > limit:
+            return over
+        previous = current
+    return min(previous[-1], over)
+
+
+class FuzzyIndex:
+    """Trigram index for one glossary language pair."""
+
+    def __init__(self, gram_keys, gram_offsets, postings, lengths, gram_counts, keys, sources, targets):
+        self.gram_keys = gram_keys        # sorted packed trigrams
+        self.gram_offsets = gram_offsets  # postings slice per trigram
+        self.postings = postings          # term ids, ascending within each slice
+        self.lengths = lengths            # normalized term length per term (nondecreasing)
+        self.gram_counts = gram_counts    # distinct trigrams per term
+        self.keys = keys                  # normalized source terms
+        self.sources = sources            # original source terms
+        self.targets = targets            # target terms
+
+    def __len__(self):
+        return len(self.sources)
+
+    @classmethod
+    def from_pairs(cls, pairs):
+        """Build an index from (source, target) pairs."""
+        terms = sorted(((normalize(source), source, target) for source, target in pairs),
+                       key=lambda t: len(t[0]))
+        keys, sources, targets = [], [], []
+        gram_counts = array('i')
+        index = {}
+        for key, source, target in terms:
+            if not key:
+                continue
+            term_id = len(keys)
+            keys.append(key)
+            sources.append(source)
+            targets.append(target)
+            grams = trigram_keys(key)
+            gram_counts.append(len(grams))
+            for gram in grams:
+                index.setdefault(gram, []).append(term_id)
+
+        gram_keys = array('q', sorted(index))
+        gram_offsets = array('q', [0])
+        postings = array('i')
+        for gram in gram_keys:
+            postings.extend(index[gram])
+            gram_offsets.append(len(postings))
+        return cls(gram_keys, gram_offsets, postings, array('i', map(len, keys)), gram_counts,
+                   keys, sources, targets)
+
+    def _postings(self, gram):
+        j = bisect_left(self.gram_keys, gram)
+        if j < len(self.gram_keys) and self.gram_keys[j] == gram:
+            return self.gram_offsets[j], self.gram_offsets[j + 1]
+        return 0, 0
+
+    def search(self, term: str, top: int = 5, max_distance: int = 2):
+        """Return up to `top` (distance, source, target) tuples, closest first.
+
+        The allowed distance shrinks for short terms (one edit per three
+        characters), so "cat" never suggests every three-letter word.
+        """
+        key = normalize(term)
+        if not key:
+            return []
+        max_distance = min(max_distance, len(key) // 3)
+        grams = trigram_keys(key)
+        need = max(1, len(grams) - 3 * max_distance)  # trigrams any match must share
+        postings = self.postings
+        lo_id = bisect_left(self.lengths, len(key) - max_distance)
+        hi_id = bisect_right(self.lengths, len(key) + max_distance)
+
+        spans = []
+        for gram in grams:
+            start, end = self._postings(gram)
+            a = bisect_left(postings, lo_id, start, end)
+            spans.append((bisect_left(postings, hi_id, a, end) - a, a))
+        spans.sort()
+
+        # A term sharing `need` of the query's trigrams is in at least one of
+        # the len(grams) - need + 1 rarest lists, so only those are scanned;
+        # the common lists are probed per candidate instead of counted.
+        scan = len(spans) - need + 1
+        shared = Counter()
+        for size, a in spans[:scan]:
+            shared.update(postings[a:a + size])
+        probes = spans[scan:]
+
+        results = []
+        gram_counts = self.gram_counts
+        for term_id, count in shared.items():
+            # The bound holds from the candidate's side too: it keeps all but 3k of its own trigrams
+            least = max(need, gram_counts[term_id] - 3 * max_distance)
+            left = len(probes)
+            for size, a in probes:
+                if count >= least or count + left < least:
+                    break
+                j = bisect_left(postings, term_id, a, a + size)
+                count += j < a + size and postings[j] == term_id
+                left -= 1
+            if count < least:
+                continue
+            candidate = self.keys[term_id]
+            distance = edit_distance(key, candidate, max_distance)
+            if distance <= max_distance:
+                results.append((distance, abs(len(candidate) - len(key)), candidate, term_id))
+
+        results.sort()
+        return [(d, self.sources[t], self.targets[t]) for d, _, _, t in results[:top]]
+
+    def save(self, path, stamp: int):
+        """Write the index to `path` atomically, tagged with `stamp`."""
+        strings = [s.encode('utf-8') for s in list(self.keys) + list(self.sources) + list(self.targets)]
+        offsets = array('q', [0])
+        for b in strings:
+            offsets.append(offsets[-1] + len(b))
+        header = CACHE_HEADER.pack(CACHE_MAGIC, CACHE_FORMAT, stamp, len(self.gram_keys),
+                                   len(self.sources), len(self.postings), offsets[-1])
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(header)
+                # 8-byte arrays first so every array starts aligned
+                for arr in (array('q', self.gram_keys), array('q', self.gram_offsets), offsets,
+                            array('i', self.postings), array('i', self.lengths), array('i', self.gram_counts)):
+                    arr.tofile(f)
+                for b in strings:
+                    f.write(b)
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+
+    @staticmethod
+    def read_stamp(path):
+        """Return the stamp of a saved index, or None if unusable."""
+        try:
+            with open(path, 'rb') as f:
+                header = f.read(CACHE_HEADER.size)
+            magic, fmt, stamp = CACHE_HEADER.unpack(header)[:3]
+        except (OSError, struct.error):
+            return None
+        return stamp if magic == CACHE_MAGIC and fmt == CACHE_FORMAT else None
+
+    @classmethod
+    def load(cls, path):
+        """Memory-map a saved index; arrays are used in place without parsing."""
+        with open(path, 'rb') as f:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        view = memoryview(mm)
+        _, _, _, ngrams, nterms, npostings, _ = CACHE_HEADER.unpack_from(view)
+        pos = CACHE_HEADER.size
+
+        def take(typecode, count):
+            nonlocal pos
+            size = count * (8 if typecode == 'q' else 4)
+            arr = view[pos:pos + size].cast(typecode)
+            pos += size
+            return arr
+
+        gram_keys = take('q', ngrams)
+        gram_offsets = take('q', ngrams + 1)
+        offsets = take('q', 3 * nterms + 1)
+        postings = take('i', npostings)
+        lengths = take('i', nterms)
+        gram_counts = take('i', nterms)
+        blob = view[pos:]
+        index = cls(gram_keys, gram_offsets, postings, lengths, gram_counts,
+                    StringTable(blob, offsets, 0, nterms),
+                    StringTable(blob, offsets, nterms, nterms),
+                    StringTable(blob, offsets, 2 * nterms, nterms))
+        index._mmap = mm  # keep the mapping alive
+        return index
@@ -4,19 +4,106 @@ Glossary Manager for Translator Pro v1.0.0
 Manages domain-specific glossaries for translation term mapping.
 Author: Peru 🇵🇪
 
-Glossaries are stored as JSON in .glossaries/ subdirectory.
+Glossaries are stored as SQLite databases in the .glossaries/ subdirectory
+(one <domain>.db per domain). Legacy <domain>.json files are imported on first use.
+A manifest (.glossaries/.manifest.db) holds per-domain counts, language pairs,
+timestamps and sizes so listing and stats never open the glossaries themselves.
 """
 
 import os
 import sys
+import io
+import csv
 import json
+import time
+import sqlite3
+import hashlib
 import argparse
+import signal
+import tempfile
+import threading
+import itertools
+import socketserver
+import urllib.parse
 from pathlib import Path
 from datetime import datetime
+from contextlib import contextmanager, ExitStack
+
+try:
+    import fcntl  # POSIX advisory locks; unavailable on Windows
+except ImportError:
+    fcntl = None
+
+try:
+    import resource
+except ImportError:  # not available on Windows
+    resource = None
+
+from matcher import TermMatcher
+from fuzzy_index import FuzzyIndex
 
 VERSION = "1.0.0"
 SCRIPT_DIR = Path(__file__).parent.resolve()
-GLOSSARY_DIR = SCRIPT_DIR / ".glossaries"
+GLOSSARY_DIR_ENV = "TRANSLATOR_PRO_GLOSSARY_DIR"  # overrides the glossary directory (tests, benchmarks)
+GLOSSARY_DIR = Path(os.environ.get(GLOSSARY_DIR_ENV) or SCRIPT_DIR / ".glossaries")
+MANIFEST_PATH = GLOSSARY_DIR / ".manifest.db"
+BUSY_TIMEOUT = 60  # seconds a writer waits for SQLite locks held by other processes
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key   TEXT PRIMARY KEY,
+    value TEXT
+);
+CREATE TABLE IF NOT EXISTS entries (
+    id         INTEGER PRIMARY KEY,
+    source     TEXT NOT NULL,
+    source_key TEXT NOT NULL,
+    target     TEXT NOT NULL,
+    from_lang  TEXT NOT NULL,
+    to_lang    TEXT NOT NULL,
+    added      TEXT,
+    updated    TEXT
+);
+CREATE UNIQUE INDEX IF NOT EXISTS entries_key ON entries (source_key, from_lang, to_lang);
+CREATE INDEX IF NOT EXISTS entries_pair ON entries (from_lang, to_lang);
+"""
+
+MANIFEST_SCHEMA = """
+CREATE TABLE IF NOT EXISTS manifest.domains (
+    domain  TEXT PRIMARY KEY,
+    entries INTEGER NOT NULL,
+    pairs   TEXT NOT NULL,
+    created TEXT,
+    updated TEXT,
+    size    INTEGER NOT NULL,
+    version INTEGER NOT NULL
+);
+"""
+
+BULK_BATCH_SIZE = 10000
+BULK_FORMATS = {".csv": "csv", ".tsv": "tsv", ".ndjson": "ndjson", ".jsonl": "ndjson"}
+IMPORT_CHUNK_SIZE = 1 << 20
+CONFLICT_POLICIES = {
+    # existing entry wins
+    "keep": "DO NOTHING",
+    # imported entry wins
+    "overwrite": "DO UPDATE SET target = excluded.target, updated = excluded.updated "
+                 "WHERE entries.target != excluded.target",
+    # whichever was modified last wins (updated, falling back to added);
+    # merge() applies "keep" to undated imports, which count as oldest
+    "newest": "DO UPDATE SET target = excluded.target, updated = excluded.updated "
+              "WHERE entries.target != excluded.target "
+              "AND COALESCE(excluded.updated, excluded.added, '') "
+              "> COALESCE(entries.updated, entries.added, '')",
+}
+
+
+class VersionConflict(Exception):
+    """A write expected a glossary version that another writer has moved past."""
+
+
+def now_iso() -> str:
+    return datetime.utcnow().isoformat()
 
 
 def ensure_glossary_dir():
@@ -25,77 +112,485 @@ def ensure_glossary_dir():
 
 
 def get_glossary_path(domain: str) -> Path:
-    """Get path to a glossary file."""
+    """Get path to a glossary database."""
+    return GLOSSARY_DIR / f"{domain}.db"
+
+
+def get_cache_path(domain: str, from_lang: str, to_lang: str) -> Path:
+    """Get path to a compiled matcher for one domain and language pair."""
+    return GLOSSARY_DIR / ".cache" / f"{domain}@{from_lang}-{to_lang}.match"
+
+
+def get_fuzzy_path(domain: str, from_lang: str, to_lang: str) -> Path:
+    """Get path to a fuzzy lookup index for one domain and language pair."""
+    return GLOSSARY_DIR / ".cache" / f"{domain}@{from_lang}-{to_lang}.fuzzy"
+
+
+def get_lock_path(domain: str) -> Path:
+    """Get path to the advisory lock file serializing writers of a domain."""
+    return GLOSSARY_DIR / f"{domain}.lock"
+
+
+def get_legacy_path(domain: str) -> Path:
+    """Get path to a pre-SQLite JSON glossary."""
     return GLOSSARY_DIR / f"{domain}.json"
 
 
-def load_glossary(domain: str) -> dict:
-    """Load a glossary from file, or create empty one."""
-    path = get_glossary_path(domain)
-    if path.exists():
-        with open(path, 'r', encoding='utf-8') as f:
-            return json.load(f)
-    return {
-        "domain": domain,
-        "created": datetime.utcnow().isoformat(),
-        "updated": datetime.utcnow().isoformat(),
-        "entries": []
-    }
+def glossary_exists(domain: str) -> bool:
+    return get_glossary_path(domain).exists() or get_legacy_path(domain).exists()
 
 
-def save_glossary(domain: str, glossary: dict):
-    """Save a glossary to file."""
+def list_domains() -> list:
+    """All glossary domains, including JSON glossaries not yet migrated."""
     ensure_glossary_dir()
-    glossary["updated"] = datetime.utcnow().isoformat()
-    path = get_glossary_path(domain)
-    with open(path, 'w', encoding='utf-8') as f:
-        json.dump(glossary, f, indent=2, ensure_ascii=False)
-    print(f"✓ Glossary '{domain}' saved to {path}")
+    domains = {p.stem for p in GLOSSARY_DIR.glob("*.db")}
+    domains.update(p.stem for p in GLOSSARY_DIR.glob("*.json"))
+    return sorted(d for d in domains if not d.startswith("."))
 
 
-def cmd_add(args):
-    """Add a term to a glossary."""
-    glossary = load_glossary(args.domain)
+class GlossaryStore:
+    """SQLite-backed glossary for one domain.
+
+    Entries are unique on (lower(source), from_lang, to_lang), so add, remove
+    and lookup are index operations and writes only touch the changed rows.
+    A legacy .glossaries/<domain>.json is imported on first open and left in
+    place (it may be a tracked seed file); it is imported again, without
+    overwriting existing entries, only if its size or mtime changes.
+
+    The manifest is attached to the same connection and this domain's row is
+    rewritten inside every mutating transaction. A row whose version differs
+    from the store's (a crash between the two files, or an edit made by an
+    older release) is refreshed the next time the store is opened.
+
+    Writers of a domain are serialized by an advisory lock on
+    .glossaries/<domain>.lock and run as BEGIN IMMEDIATE transactions, so
+    concurrent processes queue instead of failing or losing updates. Readers
+    take no lock: WAL lets them read the last commit while a write runs. Passing
+    expected_version to a write turns it into an optimistic check: it raises
+    VersionConflict if anyone else wrote since that version was read.
+    """
+
+    def __init__(self, domain: str, shared: bool = False):
+        self.domain = domain
+        self.path = get_glossary_path(domain)
+        ensure_glossary_dir()
+        # shared: usable from any thread; the caller must serialize access
+        self.conn = sqlite3.connect(str(self.path), timeout=BUSY_TIMEOUT, check_same_thread=not shared)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("ATTACH DATABASE ? AS manifest", (str(MANIFEST_PATH),))
+        # Readers take no lock and rely on WAL; only schema creation is serialized
+        if not self._initialized():
+            with self._lock():
+                self.conn.execute("PRAGMA journal_mode=WAL")
+                with self.conn:
+                    self.conn.executescript(SCHEMA + MANIFEST_SCHEMA)
+                    if self.get_meta("domain") is None:
+                        ts = now_iso()
+                        self.set_meta("domain", domain)
+                        self.set_meta("created", ts)
+                        self.set_meta("updated", ts)
+        self._migrate_json()
+        row = self.conn.execute("SELECT version FROM manifest.domains WHERE domain = ?", (domain,)).fetchone()
+        if row is None or row[0] != self.version():
+            with self.write():
+                self.sync_manifest()
 
-    # Check for duplicate
-    for entry in glossary["entries"]:
-        if (entry["source"].lower() == args.source.lower() and
-                entry["from_lang"] == args.from_lang and
-                entry["to_lang"] == args.to_lang):
-            # Update existing
-            entry["target"] = args.target
-            entry["updated"] = datetime.utcnow().isoformat()
-            save_glossary(args.domain, glossary)
-            print(f"📝 Updated: '{args.source}' ({args.from_lang}) → '{args.target}' ({args.to_lang})")
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self.conn.close()
+
+    def _initialized(self) -> bool:
+        """Whether the glossary and manifest schemas already exist."""
+        try:
+            self.conn.execute("SELECT 1 FROM manifest.domains LIMIT 1").fetchall()
+            return self.get_meta("domain") is not None
+        except sqlite3.OperationalError:
+            return False
+
+    @contextmanager
+    def _lock(self):
+        """Hold the domain's exclusive advisory lock (not re-entrant)."""
+        if fcntl is None:
+            yield
             return
+        with open(get_lock_path(self.domain), 'a') as lock:
+            fcntl.flock(lock.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock.fileno(), fcntl.LOCK_UN)
 
-    # Add new entry
-    entry = {
-        "source": args.source,
-        "target": args.target,
-        "from_lang": args.from_lang,
-        "to_lang": args.to_lang,
-        "added": datetime.utcnow().isoformat()
-    }
-    glossary["entries"].append(entry)
-    save_glossary(args.domain, glossary)
-    print(f"✅ Added: '{args.source}' ({args.from_lang}) → '{args.target}' ({args.to_lang})")
+    @contextmanager
+    def write(self, expected_version: int = None):
+        """Locked BEGIN IMMEDIATE transaction; commits on success, rolls back on error."""
+        with self._lock():
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                if expected_version is not None and self.version() != expected_version:
+                    raise VersionConflict(
+                        f"glossary '{self.domain}' is at version {self.version()}, "
+                        f"expected {expected_version}")
+                yield
+            except BaseException:
+                self.conn.rollback()
+                raise
+            self.conn.commit()
+
+    def _migrate_json(self):
+        legacy = get_legacy_path(self.domain)
+        if not legacy.exists():
+            return
+        st = legacy.stat()
+        stamp = f"{st.st_size}:{st.st_mtime_ns}"
+        if self.get_meta("json_imported") == stamp:
+            return
+        with self._lock():
+            imported = self.get_meta("json_imported")
+            if imported == stamp:
+                return  # another process imported it while we waited
+            with open(legacy, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            with self.conn:
+                if imported is None:
+                    for key in ("created", "updated"):
+                        if data.get(key):
+                            self.set_meta(key, data[key])
+                cur = self.conn.executemany(
+                    "INSERT OR IGNORE INTO entries (source, source_key, target, from_lang, to_lang, added, updated) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    ((e["source"], e["source"].lower(), e["target"], e["from_lang"], e["to_lang"],
+                      e.get("added"), e.get("updated")) for e in data.get("entries", [])))
+                self.set_meta("json_imported", stamp)
+                if imported is None or cur.rowcount:
+                    self.bump_version()
+
+    def get_meta(self, key: str):
+        row = self.conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def set_meta(self, key: str, value):
+        self.conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, value))
+
+    def version(self) -> int:
+        """Modification counter, bumped by every write; keys the matcher cache."""
+        return int(self.get_meta("version") or 0)
+
+    def bump_version(self):
+        """Invalidate compiled matchers and fuzzy indexes and refresh the manifest
+        (call inside a transaction)."""
+        self.set_meta("version", self.version() + 1)
+        self.sync_manifest()
+        for cached in (GLOSSARY_DIR / ".cache").glob("*@*"):
+            if self.domain not in cached.name.split("@")[0].split("+"):
+                continue  # another domain's cache (stacks are "a+b+c@pair")
+            try:
+                cached.unlink()
+            except OSError:
+                pass
+
+    def sync_manifest(self):
+        """Rewrite this domain's manifest row (call inside a transaction)."""
+        pairs = {f"{fl}-{tl}": n for fl, tl, n in self.conn.execute(
+            "SELECT from_lang, to_lang, COUNT(*) FROM entries GROUP BY from_lang, to_lang")}
+        size = (self.conn.execute("PRAGMA main.page_count").fetchone()[0]
+                * self.conn.execute("PRAGMA main.page_size").fetchone()[0])
+        self.conn.execute(
+            "INSERT OR REPLACE INTO manifest.domains "
+            "(domain, entries, pairs, created, updated, size, version) VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (self.domain, sum(pairs.values()), json.dumps(pairs), self.get_meta("created"),
+             self.get_meta("updated"), size, self.version()))
+
+    def touch(self):
+        """Record a modification (call inside a transaction)."""
+        self.set_meta("updated", now_iso())
+        self.bump_version()
+
+    def lookup(self, source: str, from_lang: str, to_lang: str):
+        row = self.conn.execute(
+            "SELECT source, target, from_lang, to_lang, added, updated FROM entries "
+            "WHERE source_key = ? AND from_lang = ? AND to_lang = ?",
+            (source.lower(), from_lang, to_lang)).fetchone()
+        return dict(row) if row else None
+
+    def upsert(self, source: str, target: str, from_lang: str, to_lang: str,
+               expected_version: int = None) -> str:
+        """Insert or update one term; returns 'inserted' or 'updated'."""
+        ts = now_iso()
+        with self.write(expected_version):
+            cur = self.conn.execute(
+                "UPDATE entries SET target = ?, updated = ? "
+                "WHERE source_key = ? AND from_lang = ? AND to_lang = ?",
+                (target, ts, source.lower(), from_lang, to_lang))
+            status = "updated"
+            if cur.rowcount == 0:
+                self.conn.execute(
+                    "INSERT INTO entries (source, source_key, target, from_lang, to_lang, added) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (source, source.lower(), target, from_lang, to_lang, ts))
+                status = "inserted"
+            self.touch()
+        return status
+
+    def bulk_upsert(self, rows, batch_size: int = BULK_BATCH_SIZE, expected_version: int = None):
+        """Upsert (source, target, from_lang, to_lang) rows in one transaction.
+
+        Rows are consumed in batches, so memory stays constant regardless of
+        input size. Returns (inserted, updated, skipped); rows whose target is
+        unchanged count as skipped.
+        """
+        ts = now_iso()
+        sql = ("INSERT INTO entries (source, source_key, target, from_lang, to_lang, added) "
+               "VALUES (?, ?, ?, ?, ?, ?) "
+               "ON CONFLICT (source_key, from_lang, to_lang) DO UPDATE "
+               "SET target = excluded.target, updated = excluded.added "
+               "WHERE entries.target != excluded.target")
+        rows = iter(rows)
+        seen = 0
+        with self.write(expected_version):
+            before_count = self.count()
+            before_changes = self.conn.total_changes
+            while True:
+                batch = [(src, src.lower(), tgt, fl, tl, ts)
+                         for src, tgt, fl, tl in itertools.islice(rows, batch_size)]
+                if not batch:
+                    break
+                seen += len(batch)
+                self.conn.executemany(sql, batch)
+            changed = self.conn.total_changes - before_changes
+            inserted = self.count() - before_count
+            if changed:
+                self.touch()
+        return inserted, changed - inserted, seen - changed
+
+    def merge(self, entries, policy: str = "keep", batch_size: int = BULK_BATCH_SIZE,
+              expected_version: int = None):
+        """Merge exported entry dicts in one transaction under a conflict policy.
+
+        Conflicts are resolved by the unique (source_key, from_lang, to_lang)
+        index on disk, so nothing but the current batch is held in memory.
+        Entries without "added" or "updated" are stamped with the import time
+        when inserted, but under "newest" they count as older than any
+        existing entry. Returns (inserted, updated, skipped).
+        """
+        insert = ("INSERT INTO entries (source, source_key, target, from_lang, to_lang, added, updated) "
+                  "VALUES (?, ?, ?, ?, ?, ?, ?) "
+                  "ON CONFLICT (source_key, from_lang, to_lang) ")
+        sql = insert + CONFLICT_POLICIES[policy]
+        undated_sql = insert + CONFLICT_POLICIES["keep"] if policy == "newest" else sql
+        ts = now_iso()
+        entries = iter(entries)
+        seen = 0
+        with self.write(expected_version):
+            before_count = self.count()
+            before_changes = self.conn.total_changes
+            while True:
+                dated, undated = [], []
+                for e in itertools.islice(entries, batch_size):
+                    (dated if e.get("added") or e.get("updated") else undated).append(
+                        (e["source"], e["source"].lower(), e["target"], e["from_lang"], e["to_lang"],
+                         e.get("added") or ts, e.get("updated")))
+                if not dated and not undated:
+                    break
+                seen += len(dated) + len(undated)
+                self.conn.executemany(sql, dated)
+                self.conn.executemany(undated_sql, undated)
+            changed = self.conn.total_changes - before_changes
+            inserted = self.count() - before_count
+            if changed:
+                self.touch()
+        return inserted, changed - inserted, seen - changed
+
+    def remove(self, source: str, from_lang: str, to_lang: str, expected_version: int = None) -> bool:
+        with self.write(expected_version):
+            cur = self.conn.execute(
+                "DELETE FROM entries WHERE source_key = ? AND from_lang = ? AND to_lang = ?",
+                (source.lower(), from_lang, to_lang))
+            if cur.rowcount:
+                self.touch()
+        return cur.rowcount > 0
+
+    def clear(self, expected_version: int = None) -> int:
+        with self.write(expected_version):
+            count = self.conn.execute("DELETE FROM entries").rowcount
+            self.touch()
+        return count
+
+    def count(self) -> int:
+        return self.conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+
+    def entries(self, from_lang: str = None, to_lang: str = None):
+        """Iterate entries as dicts, optionally for one language pair."""
+        sql = "SELECT source, target, from_lang, to_lang, added, updated FROM entries"
+        params = ()
+        if from_lang is not None and to_lang is not None:
+            sql += " WHERE from_lang = ? AND to_lang = ?"
+            params = (from_lang, to_lang)
+        for row in self.conn.execute(sql + " ORDER BY id", params):
+            entry = {k: row[k] for k in row.keys() if row[k] is not None}
+            yield entry
+
+    def to_dict(self) -> dict:
+        """The glossary in the JSON export format."""
+        return {
+            "domain": self.domain,
+            "created": self.get_meta("created"),
+            "updated": self.get_meta("updated"),
+            "entries": list(self.entries()),
+        }
+
+
+def read_manifest(rebuild: bool = False) -> list:
+    """Per-domain summaries from the manifest, sorted by domain.
+
+    Only the manifest is read unless it is stale: domains present on disk
+    but missing from it are indexed (opening a store syncs its row), and
+    rows for glossaries that no longer exist are dropped. `rebuild` re-indexes
+    every domain.
+    """
+    ensure_glossary_dir()
+    conn = sqlite3.connect(":memory:")
+    conn.row_factory = sqlite3.Row
+    try:
+        conn.execute("ATTACH DATABASE ? AS manifest", (str(MANIFEST_PATH),))
+        with conn:
+            conn.executescript(MANIFEST_SCHEMA)
+        on_disk = set(list_domains())
+        indexed = {r[0] for r in conn.execute("SELECT domain FROM manifest.domains")}
+        for domain in sorted(on_disk if rebuild else on_disk - indexed):
+            with GlossaryStore(domain) as store:
+                if rebuild:
+                    with store.write():
+                        store.sync_manifest()
+        if indexed - on_disk:
+            with conn:
+                conn.executemany("DELETE FROM manifest.domains WHERE domain = ?",
+                                 ((d,) for d in indexed - on_disk))
+        rows = conn.execute("SELECT * FROM manifest.domains ORDER BY domain").fetchall()
+    finally:
+        conn.close()
+    return [dict(r, pairs=json.loads(r["pairs"])) for r in rows]
+
+
+def load_glossary(domain: str) -> dict:
+    """Load a glossary as a dict (JSON export format), or an empty one."""
+    if not glossary_exists(domain):
+        return {
+            "domain": domain,
+            "created": now_iso(),
+            "updated": now_iso(),
+            "entries": []
+        }
+    with GlossaryStore(domain) as store:
+        return store.to_dict()
+
+
+def split_stack(spec: str) -> list:
+    """Domains of a glossary stack like "company,legal,general", highest priority first."""
+    return [d.strip() for d in spec.split(",") if d.strip()]
+
+
+def stack_stamp(versions) -> int:
+    """Cache stamp for (domain, version) pairs: the version itself for a single
+    domain, otherwise a 63-bit hash that changes whenever any member changes."""
+    versions = list(versions)
+    if not versions:
+        return 0
+    if len(versions) == 1:
+        return versions[0][1]
+    signature = ",".join(f"{domain}:{version}" for domain, version in versions)
+    return int.from_bytes(hashlib.blake2b(signature.encode("utf-8"), digest_size=8).digest(), "little") >> 1
+
+
+def stack_version(spec: str) -> int:
+    """Current cache stamp of a domain or stack (0 if none of it exists)."""
+    versions = []
+    for domain in split_stack(spec):
+        if glossary_exists(domain):
+            with GlossaryStore(domain) as store:
+                versions.append((domain, store.version()))
+    return stack_stamp(versions)
+
+
+def _load_compiled(cls, spec: str, from_lang: str, to_lang: str, path_for, use_cache: bool):
+    """Load or build a TermMatcher/FuzzyIndex over a domain or domain stack.
+
+    A stack is merged into one structure: each source term resolves to the
+    highest-priority domain defining it, so applying five domains costs one
+    pass. Results are cached per stack signature (member names in order) and
+    stamped with stack_stamp(), so a write to any member invalidates them.
+    """
+    domains = [d for d in split_stack(spec) if glossary_exists(d)]
+    if not domains:
+        return cls.from_pairs([])
+    path = path_for("+".join(domains), from_lang, to_lang)
+    with ExitStack() as stack:
+        stores = [stack.enter_context(GlossaryStore(d)) for d in domains]
+        stamp = stack_stamp((store.domain, store.version()) for store in stores)
+        if use_cache and cls.read_stamp(path) == stamp:
+            return cls.load(path)
+        merged = {}
+        for store in reversed(stores):  # lowest priority first, so higher ones overwrite
+            for e in store.entries(from_lang, to_lang):
+                merged[e["source"].lower()] = (e["source"], e["target"])
+        compiled = cls.from_pairs(merged.values())
+    if use_cache:
+        try:
+            compiled.save(path, stamp)
+        except OSError:
+            pass  # read-only install: just skip caching
+    return compiled
+
+
+def compile_matcher(domain: str, from_lang: str, to_lang: str, use_cache: bool = True) -> TermMatcher:
+    """Get the Aho-Corasick matcher for a domain (or "a,b,c" stack) and language pair.
+
+    Compiled matchers are cached in .glossaries/.cache/ and memory-mapped on
+    later calls. A cache file is only used if its stamp matches the store's
+    current version, so any write to the glossary invalidates it.
+    """
+    return _load_compiled(TermMatcher, domain, from_lang, to_lang, get_cache_path, use_cache)
+
+
+def load_fuzzy_index(domain: str, from_lang: str, to_lang: str, use_cache: bool = True) -> FuzzyIndex:
+    """Get the trigram fuzzy index for a domain (or stack) and language pair.
+
+    Cached and invalidated exactly like compiled matchers.
+    """
+    return _load_compiled(FuzzyIndex, domain, from_lang, to_lang, get_fuzzy_path, use_cache)
+
+
+def cmd_add(args):
+    """Add a term to a glossary."""
+    with GlossaryStore(args.domain) as store:
+        status = store.upsert(args.source, args.target, args.from_lang, args.to_lang,
+                              expected_version=args.expect_version)
+        print(f"✓ Glossary '{args.domain}' saved to {store.path}")
+
+    if status == "updated":
+        print(f"📝 Updated: '{args.source}' ({args.from_lang}) → '{args.target}' ({args.to_lang})")
+    else:
+        print(f"✅ Added: '{args.source}' ({args.from_lang}) → '{args.target}' ({args.to_lang})")
 
 
 def cmd_remove(args):
     """Remove a term from a glossary."""
-    glossary = load_glossary(args.domain)
-    original_count = len(glossary["entries"])
+    if not glossary_exists(args.domain):
+        print(f"⚠️  Entry not found: '{args.source}' ({args.from_lang} → {args.to_lang})")
+        return
 
-    glossary["entries"] = [
-        e for e in glossary["entries"]
-        if not (e["source"].lower() == args.source.lower() and
-                e["from_lang"] == args.from_lang and
-                e["to_lang"] == args.to_lang)
-    ]
+    with GlossaryStore(args.domain) as store:
+        removed = store.remove(args.source, args.from_lang, args.to_lang,
+                               expected_version=args.expect_version)
+        if removed:
+            print(f"✓ Glossary '{args.domain}' saved to {store.path}")
 
-    if len(glossary["entries"]) < original_count:
-        save_glossary(args.domain, glossary)
+    if removed:
         print(f"🗑️  Removed: '{args.source}' ({args.from_lang} → {args.to_lang})")
     else:
         print(f"⚠️  Entry not found: '{args.source}' ({args.from_lang} → {args.to_lang})")
@@ -105,97 +600,516 @@ def cmd_list(args):
     """List entries in a glossary."""
     if args.domain:
         # List entries in a specific glossary
-        glossary = load_glossary(args.domain)
-        entries = glossary.get("entries", [])
-
-        if not entries:
+        if not glossary_exists(args.domain):
             print(f"📚 Glossary '{args.domain}' is empty.")
             return
 
-        print(f"\n📚 Glossary: {args.domain}")
-        print(f"   Created: {glossary.get('created', 'unknown')}")
-        print(f"   Updated: {glossary.get('updated', 'unknown')}")
-        print(f"   Entries: {len(entries)}")
-        print("─" * 60)
-        print(f"  {'Source':<25} {'From':<6} {'Target':<25} {'To':<6}")
-        print("─" * 60)
+        with GlossaryStore(args.domain) as store:
+            count = store.count()
+            if not count:
+                print(f"📚 Glossary '{args.domain}' is empty.")
+                return
+
+            print(f"\n📚 Glossary: {args.domain}")
+            print(f"   Created: {store.get_meta('created') or 'unknown'}")
+            print(f"   Updated: {store.get_meta('updated') or 'unknown'}")
+            print(f"   Version: {store.version()}")
+            print(f"   Entries: {count}")
+            print("─" * 60)
+            print(f"  {'Source':<25} {'From':<6} {'Target':<25} {'To':<6}")
+            print("─" * 60)
 
-        for entry in entries:
-            print(f"  {entry['source']:<25} {entry['from_lang']:<6} {entry['target']:<25} {entry['to_lang']:<6}")
+            for entry in store.entries():
+                print(f"  {entry['source']:<25} {entry['from_lang']:<6} {entry['target']:<25} {entry['to_lang']:<6}")
 
-        print("─" * 60)
+            print("─" * 60)
     else:
         # List all available glossaries
-        ensure_glossary_dir()
-        glossaries = list(GLOSSARY_DIR.glob("*.json"))
+        domains = read_manifest()
 
-        if not glossaries:
+        if not domains:
             print("📚 No glossaries found. Create one with: glossary.py add --domain <name> ...")
             return
 
         print("\n📚 Available Glossaries")
         print("─" * 50)
 
-        for gpath in sorted(glossaries):
-            with open(gpath, 'r', encoding='utf-8') as f:
-                g = json.load(f)
-            domain = gpath.stem
-            count = len(g.get("entries", []))
-            updated = g.get("updated", "unknown")
-            print(f"  {domain:<20} {count:>4} entries   (updated: {updated[:10]})")
+        for row in domains:
+            updated = row["updated"] or "unknown"
+            print(f"  {row['domain']:<20} {row['entries']:>4} entries   (updated: {updated[:10]})")
 
         print("─" * 50)
 
 
+def cmd_stats(args):
+    """Summarize every glossary from the manifest alone."""
+    domains = read_manifest(rebuild=args.rebuild)
+
+    if args.json:
+        print(json.dumps(domains, indent=2, ensure_ascii=False))
+        return
+
+    if not domains:
+        print("📚 No glossaries found. Create one with: glossary.py add --domain <name> ...")
+        return
+
+    print("\n📊 Glossary Stats")
+    print("─" * 72)
+    print(f"  {'Domain':<20} {'Entries':>8} {'Size':>10}  {'Updated':<10}  Pairs")
+    print("─" * 72)
+    for row in domains:
+        pairs = ", ".join(f"{pair} ({n})" for pair, n in sorted(row["pairs"].items()))
+        print(f"  {row['domain']:<20} {row['entries']:>8} {row['size'] / 1024:>8.1f}KB  "
+              f"{(row['updated'] or 'unknown')[:10]:<10}  {pairs}")
+    print("─" * 72)
+    total_entries = sum(r["entries"] for r in domains)
+    total_size = sum(r["size"] for r in domains)
+    print(f"  {len(domains)} glossaries, {total_entries} entries, {total_size / 1024 / 1024:.1f} MB")
+
+
+def cmd_lookup(args):
+    """Look up a term exactly, or its closest matches with --fuzzy."""
+    start = time.perf_counter()
+    if args.fuzzy:
+        index = load_fuzzy_index(args.domain, args.from_lang, args.to_lang)
+        loaded = time.perf_counter()
+        matches = index.search(args.term, top=args.top, max_distance=args.max_distance)
+        elapsed = time.perf_counter() - loaded
+    else:
+        entry = None
+        for domain in split_stack(args.domain):  # first domain defining the term wins
+            if entry is None and glossary_exists(domain):
+                with GlossaryStore(domain) as store:
+                    entry = store.lookup(args.term, args.from_lang, args.to_lang)
+        matches = [(0, entry["source"], entry["target"])] if entry else []
+        elapsed = time.perf_counter() - start
+
+    if args.json:
+        print(json.dumps([{"source": src, "target": tgt, "distance": d} for d, src, tgt in matches],
+                         indent=2, ensure_ascii=False))
+        return
+
+    if not matches:
+        print(f"🔍 No match for '{args.term}' in glossary '{args.domain}' ({args.from_lang} → {args.to_lang})")
+        return
+
+    print(f"\n🔍 {'Closest terms' if args.fuzzy else 'Match'} for '{args.term}' "
+          f"({args.from_lang} → {args.to_lang}, {elapsed * 1000:.2f} ms)")
+    print("─" * 60)
+    for distance, source, target in matches:
+        print(f"  {distance:>2}  {source:<25} → {target}")
+    print("─" * 60)
+
+
 def cmd_export(args):
     """Export a glossary to a JSON file."""
     glossary = load_glossary(args.domain)
     output = args.output or f"{args.domain}_glossary.json"
 
-    with open(output, 'w', encoding='utf-8') as f:
-        json.dump(glossary, f, indent=2, ensure_ascii=False)
+    # Write beside the target and rename, so readers never see a partial file
+    directory = os.path.dirname(os.path.abspath(output))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(glossary, f, indent=2, ensure_ascii=False)
+        os.replace(tmp_path, output)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
 
     count = len(glossary.get("entries", []))
     print(f"📤 Exported glossary '{args.domain}' ({count} entries) to {output}")
 
 
+class JsonEntryReader:
+    """Incrementally iterate glossary entries from a JSON or NDJSON file.
+
+    Accepts the export format ({"domain": ..., "entries": [...]}), a bare
+    array of entries, or NDJSON with one entry per line. Only one chunk of
+    input plus the entry being decoded is held in memory; other top-level
+    keys are collected in `header` as they are reached, so keys after
+    "entries" appear only once iteration is done.
+    """
+
+    REQUIRED = ("source", "target", "from_lang", "to_lang")
+
+    def __init__(self, f, ndjson: bool = False, chunk_size: int = IMPORT_CHUNK_SIZE):
+        self.f = f
+        self.ndjson = ndjson
+        self.chunk_size = chunk_size
+        self.decoder = json.JSONDecoder()
+        self.buf = ""
+        self.pos = 0
+        self.eof = False
+        self.header = {}
+        self.invalid = 0
+
+    def _fill(self) -> bool:
+        if self.eof:
+            return False
+        chunk = self.f.read(self.chunk_size)
+        if not chunk:
+            self.eof = True
+            return False
+        self.buf = self.buf[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def _peek(self) -> str:
+        """Next non-whitespace character, without consuming it ("" at EOF)."""
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos] in " \t\r\n":
+                self.pos += 1
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self._fill():
+                return ""
+
+    def _expect(self, chars: str) -> str:
+        ch = self._peek()
+        if not ch or ch not in chars:
+            raise ValueError(f"expected one of {chars!r}, found {ch or 'end of file'!r}")
+        self.pos += 1
+        return ch
+
+    def _value(self):
+        """Decode one JSON value, reading more input until it is complete."""
+        self._peek()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError:
+                if not self._fill():
+                    raise
+                continue
+            # A number may continue past the end of the buffer
+            if end == len(self.buf) and self._fill():
+                continue
+            self.pos = end
+            return value
+
+    def _array(self):
+        self._expect("[")
+        if self._peek() == "]":
+            self.pos += 1
+            return
+        while True:
+            yield self._value()
+            if self._expect(",]") == "]":
+                return
+
+    def _records(self):
+        if self.ndjson:
+            for line in self.f:
+                if line.strip():
+                    yield json.loads(line)
+            return
+        if self._peek() == "[":
+            yield from self._array()
+            return
+        self._expect("{")
+        if self._peek() == "}":
+            return
+        while True:
+            key = self._value()
+            self._expect(":")
+            if key == "entries":
+                yield from self._array()
+            else:
+                self.header[key] = self._value()
+            if self._expect(",}") == "}":
+                return
+
+    def __iter__(self):
+        for record in self._records():
+            if isinstance(record, dict) and all(record.get(k) for k in self.REQUIRED):
+                yield record
+            else:
+                self.invalid += 1
+
+
+def peak_memory_mb() -> float:
+    """Peak resident set size of this process in MB (0 if unknown)."""
+    if resource is None:
+        return 0.0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 1024 / 1024 if sys.platform == "darwin" else peak / 1024
+
+
 def cmd_import(args):
-    """Import a glossary from a JSON file."""
+    """Stream-merge a glossary from a JSON export, JSON array or NDJSON file."""
     if not os.path.exists(args.file):
         print(f"✗ File not found: {args.file}", file=sys.stderr)
         sys.exit(1)
 
+    ndjson = (args.format or BULK_FORMATS.get(Path(args.file).suffix.lower())) == "ndjson"
+    start = time.perf_counter()
     with open(args.file, 'r', encoding='utf-8') as f:
-        imported = json.load(f)
+        reader = JsonEntryReader(f, ndjson=ndjson)
+        entries = iter(reader)
+        # Read up to the first entry so a leading "domain" key is known
+        first = next(entries, None)
+        domain = (args.domain or reader.header.get("domain")
+                  or Path(args.file).stem.replace("_glossary", ""))
+        if first is not None:
+            entries = itertools.chain([first], entries)
 
-    domain = imported.get("domain", Path(args.file).stem.replace("_glossary", ""))
+        def checked(entries):
+            # A "domain" key after "entries" is only seen once they are all read;
+            # fail (rolling the merge back) rather than fill the wrong glossary
+            yield from entries
+            late = reader.header.get("domain")
+            if not args.domain and late and late != domain:
+                raise ValueError(f'"domain" ({late}) follows "entries" in {args.file}; '
+                                 f'pass --domain {late} to import it')
 
-    # Merge with existing or create new
-    existing = load_glossary(domain)
-    existing_keys = {
-        (e["source"].lower(), e["from_lang"], e["to_lang"])
-        for e in existing["entries"]
-    }
+        existed = glossary_exists(domain)
+        try:
+            with GlossaryStore(domain) as store:
+                inserted, updated, skipped = store.merge(checked(entries), args.on_conflict, args.batch_size)
+                total = store.count()
+                print(f"✓ Glossary '{domain}' saved to {store.path}")
+        except ValueError as e:
+            if not existed:
+                for path in (get_glossary_path(domain), get_lock_path(domain)):
+                    for suffix in ("", "-wal", "-shm"):
+                        Path(f"{path}{suffix}").unlink(missing_ok=True)
+            print(f"✗ Import failed, nothing was written: {e}", file=sys.stderr)
+            sys.exit(1)
+    elapsed = time.perf_counter() - start
+
+    rows = inserted + updated + skipped + reader.invalid
+    rate = rows / elapsed if elapsed > 0 else 0
+    print(f"📥 Imported {inserted} new entries into glossary '{domain}' "
+          f"(total: {total})")
+    print(f"   {updated} updated, {skipped} skipped (--on-conflict {args.on_conflict}), {reader.invalid} invalid "
+          f"— {rows} rows in {elapsed:.2f}s ({rate:,.0f} rows/s), peak memory {peak_memory_mb():.1f} MB")
+
+
+def iter_bulk_rows(path: str, fmt: str, from_lang: str, to_lang: str, invalid: list):
+    """Stream (source, target, from_lang, to_lang) tuples from a CSV/TSV/NDJSON file.
+
+    CSV/TSV rows are `source, target[, from_lang, to_lang]`, with an optional
+    header row naming those columns. NDJSON lines are objects with the same
+    keys ("from"/"to" are accepted too). Rows without a source, target or
+    language pair are counted in invalid[0] and skipped.
+    """
+    f = sys.stdin if path == "-" else open(path, 'r', encoding='utf-8', newline='')
+    try:
+        if fmt == "ndjson":
+            records = (json.loads(line) for line in f if line.strip())
+            records = ((r.get("source"), r.get("target"),
+                        r.get("from_lang", r.get("from", from_lang)),
+                        r.get("to_lang", r.get("to", to_lang))) for r in records)
+        else:
+            reader = csv.reader(f, delimiter="\t" if fmt == "tsv" else ",")
+            first = next(reader, None)
+            columns = ["source", "target", "from_lang", "to_lang"]
+            if first is not None and {"source", "target"} <= {c.strip().lower() for c in first}:
+                columns = [c.strip().lower() for c in first]
+                columns = ["from_lang" if c == "from" else "to_lang" if c == "to" else c for c in columns]
+                first = None
+            pos = {c: columns.index(c) if c in columns else None
+                   for c in ("source", "target", "from_lang", "to_lang")}
+
+            def field(row, name, default=None):
+                i = pos[name]
+                return row[i].strip() if i is not None and i < len(row) and row[i].strip() else default
+
+            rows = reader if first is None else itertools.chain([first], reader)
+            records = ((field(r, "source"), field(r, "target"),
+                        field(r, "from_lang", from_lang), field(r, "to_lang", to_lang))
+                       for r in rows if r)
+        for record in records:
+            if all(record):
+                yield record
+            else:
+                invalid[0] += 1
+    finally:
+        if f is not sys.stdin:
+            f.close()
+
+
+def cmd_bulk_add(args):
+    """Bulk upsert terms from a CSV, TSV or NDJSON file."""
+    if args.file != "-" and not os.path.exists(args.file):
+        print(f"✗ File not found: {args.file}", file=sys.stderr)
+        sys.exit(1)
+
+    fmt = args.format or BULK_FORMATS.get(Path(args.file).suffix.lower())
+    if not fmt:
+        print(f"✗ Cannot detect format of {args.file}; use --format csv|tsv|ndjson", file=sys.stderr)
+        sys.exit(1)
+
+    invalid = [0]
+    start = time.perf_counter()
+    with GlossaryStore(args.domain) as store:
+        rows = iter_bulk_rows(args.file, fmt, args.from_lang, args.to_lang, invalid)
+        inserted, updated, skipped = store.bulk_upsert(rows, args.batch_size)
+        print(f"✓ Glossary '{args.domain}' saved to {store.path}")
+    elapsed = time.perf_counter() - start
+
+    total = inserted + updated + skipped + invalid[0]
+    rate = total / elapsed if elapsed > 0 else 0
+    print(f"📥 Bulk add into '{args.domain}': {inserted} inserted, {updated} updated, "
+          f"{skipped + invalid[0]} skipped ({invalid[0]} invalid) "
+          f"— {total} rows in {elapsed:.2f}s ({rate:,.0f} rows/s)")
+
+
+def cmd_apply(args):
+    """Apply a glossary's terms to text in a single pass."""
+    text = args.text if args.text is not None else sys.stdin.read().rstrip("\n")
+    matcher = compile_matcher(args.domain, args.from_lang, args.to_lang)
+    result, hits = matcher.apply(text)
+
+    if args.json:
+        print(json.dumps({
+            "text": result,
+            "glossary_applied": [f"{src} -> {tgt}" for src, tgt in hits],
+        }, ensure_ascii=False))
+        return
+
+    print(result)
+    if hits:
+        print("GLOSSARY_APPLIED:" + "|||".join(f"{src} -> {tgt}" for src, tgt in hits))
 
-    added = 0
-    for entry in imported.get("entries", []):
-        key = (entry["source"].lower(), entry["from_lang"], entry["to_lang"])
-        if key not in existing_keys:
-            existing["entries"].append(entry)
-            existing_keys.add(key)
-            added += 1
 
-    save_glossary(domain, existing)
-    print(f"📥 Imported {added} new entries into glossary '{domain}' "
-          f"(total: {len(existing['entries'])})")
+class GlossaryWorker:
+    """Keeps glossary stores and compiled matchers warm for the serve command.
+
+    Each request re-checks the store's version (one indexed SELECT), so edits
+    made by other processes are picked up without restarting the worker.
+    With serve --socket every connection gets its own handler thread; they
+    share the warm stores, so each request runs under `lock`.
+    """
+
+    def __init__(self):
+        self.stores = {}    # domain -> GlossaryStore
+        self.matchers = {}  # (domain or stack, from_lang, to_lang) -> (stamp, TermMatcher)
+        self.memory = None  # TranslationMemory, opened on first tm_* request
+        self.lock = threading.Lock()
+
+    def store(self, domain: str):
+        store = self.stores.get(domain)
+        if store is None and domain and glossary_exists(domain):
+            store = self.stores[domain] = GlossaryStore(domain, shared=True)
+        return store
+
+    def version(self, spec: str) -> int:
+        """stack_stamp() of a domain or stack, from the warm stores."""
+        stores = [self.store(d) for d in split_stack(spec)]
+        return stack_stamp((store.domain, store.version()) for store in stores if store is not None)
+
+    def matcher(self, domain: str, from_lang: str, to_lang: str) -> TermMatcher:
+        version = self.version(domain)
+        key = (domain, from_lang, to_lang)
+        cached = self.matchers.get(key)
+        if cached is None or cached[0] != version:
+            cached = self.matchers[key] = (version, compile_matcher(domain, from_lang, to_lang))
+        return cached[1]
+
+    def translation_memory(self):
+        if self.memory is None:
+            from translation_memory import TranslationMemory
+            self.memory = TranslationMemory()
+        return self.memory
+
+    def handle(self, request: dict) -> dict:
+        """Answer one request. Ops: apply, urlencode, percent, format, tm_lookup, tm_store, ping."""
+        op = request.get("op", "apply")
+        if op == "apply":
+            matcher = self.matcher(request["domain"], request["from"], request["to"])
+            text, hits = matcher.apply(request["text"])
+            return {"text": text, "glossary_applied": [f"{src} -> {tgt}" for src, tgt in hits]}
+        if op == "urlencode":
+            return {"text": urllib.parse.quote(request["text"])}
+        if op == "percent":
+            try:
+                return {"text": str(int(float(request["value"]) * 100))}
+            except (TypeError, ValueError):
+                return {"text": "0"}
+        if op == "format":
+            # translate.sh --json result; list fields arrive |||-joined
+            split = lambda v: v.split("|||") if v else []
+            result = {
+                "source_text": request["source_text"],
+                "translated_text": request["translated_text"],
+                "source_lang": request["source_lang"],
+                "target_lang": request["target_lang"],
+                "confidence": float(request.get("confidence") or 0) / 100,
+                "api_used": request["api_used"],
+                "alternatives": split(request.get("alternatives")),
+                "glossary_applied": split(request.get("glossary_applied")),
+            }
+            if request.get("mode"):
+                result["mode"] = request["mode"]
+            return {"text": json.dumps(result, indent=2, ensure_ascii=False)}
+        if op in ("tm_lookup", "tm_store"):
+            from translation_memory import format_result, parse_result
+            domain = request.get("domain") or ""
+            key = dict(from_lang=request["from"], to_lang=request["to"], mode=request.get("mode") or "",
+                       domain=domain, version=self.version(domain))
+            if op == "tm_store":
+                self.translation_memory().store(request["text"], **key, **parse_result(request["result"]))
+                return {"text": ""}
+            entry = self.translation_memory().lookup(request["text"], **key)
+            return {"text": format_result(entry) if entry else ""}
+        if op == "ping":
+            return {"text": "pong"}
+        raise ValueError(f"unknown op: {op}")
+
+    def serve_lines(self, rfile, wfile):
+        """Read NDJSON requests from rfile and write one NDJSON reply per line."""
+        for line in rfile:
+            if isinstance(line, bytes):
+                line = line.decode("utf-8")
+            if not line.strip():
+                continue
+            request = {}
+            try:
+                request = json.loads(line)
+                with self.lock:
+                    reply = self.handle(request)
+            except Exception as e:
+                reply = {"error": f"{type(e).__name__}: {e}"}
+            if "id" in request:
+                reply["id"] = request["id"]
+            data = json.dumps(reply, ensure_ascii=False) + "\n"
+            wfile.write(data if isinstance(wfile, io.TextIOBase) else data.encode("utf-8"))
+            wfile.flush()
+
+
+def cmd_serve(args):
+    """Run a long-lived NDJSON worker on stdin/stdout or a Unix socket."""
+    worker = GlossaryWorker()
+    if not args.socket:
+        worker.serve_lines(sys.stdin, sys.stdout)
+        return
+
+    class Handler(socketserver.StreamRequestHandler):
+        def handle(self):
+            worker.serve_lines(self.rfile, self.wfile)
+
+    if os.path.exists(args.socket):
+        os.unlink(args.socket)
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+    with socketserver.ThreadingUnixStreamServer(args.socket, Handler) as server:
+        print(f"📡 Glossary worker listening on {args.socket}", file=sys.stderr)
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            if os.path.exists(args.socket):
+                os.unlink(args.socket)
 
 
 def cmd_clear(args):
     """Clear all entries from a glossary."""
-    glossary = load_glossary(args.domain)
-    count = len(glossary.get("entries", []))
-    glossary["entries"] = []
-    save_glossary(args.domain, glossary)
+    with GlossaryStore(args.domain) as store:
+        count = store.clear(expected_version=args.expect_version)
+        print(f"✓ Glossary '{args.domain}' saved to {store.path}")
     print(f"🗑️  Cleared {count} entries from glossary '{args.domain}'")
 
 
@@ -207,10 +1121,17 @@ def main():
 Examples:
   %(prog)s add --domain tech --from en --to es "API" "API"
   %(prog)s add --domain tech --from en --to es "machine learning" "aprendizaje automático"
+  %(prog)s bulk-add --domain legal --from en --to es --file terms.csv
   %(prog)s list --domain tech
+  %(prog)s apply --domain tech --from en --to es "The API uses machine learning"
+  %(prog)s apply --domain company,legal,general --from en --to es "..."   # layered stack
+  %(prog)s lookup --domain tech --from en --to es --fuzzy "machin lerning"
   %(prog)s list                          # list all glossaries
+  %(prog)s stats                         # counts, pairs and sizes from the manifest
+  %(prog)s serve                         # NDJSON worker on stdin/stdout
   %(prog)s export --domain tech --output tech_glossary.json
   %(prog)s import --file tech_glossary.json
+  %(prog)s import --file tmx_terms.ndjson --domain legal --on-conflict newest
   %(prog)s remove --domain tech --from en --to es "API"
   %(prog)s clear --domain tech
         """
@@ -225,6 +1146,21 @@ Examples:
     add_parser.add_argument("--to", dest="to_lang", required=True, help="Target language code")
     add_parser.add_argument("source", help="Source term")
     add_parser.add_argument("target", help="Target term (translation)")
+    add_parser.add_argument("--expect-version", type=int, default=None,
+                            help="Fail unless the glossary is still at this version (see list --domain)")
+
+    # Bulk add command
+    bulk_parser = subparsers.add_parser("bulk-add", help="Upsert many terms from a CSV/TSV/NDJSON file")
+    bulk_parser.add_argument("--domain", required=True, help="Glossary domain name")
+    bulk_parser.add_argument("--file", required=True, help="Input file (- for stdin)")
+    bulk_parser.add_argument("--format", choices=["csv", "tsv", "ndjson"],
+                             help="Input format (default: from file extension)")
+    bulk_parser.add_argument("--from", dest="from_lang", default=None,
+                             help="Source language for rows that do not name one")
+    bulk_parser.add_argument("--to", dest="to_lang", default=None,
+                             help="Target language for rows that do not name one")
+    bulk_parser.add_argument("--batch-size", type=int, default=BULK_BATCH_SIZE,
+                             help=f"Rows per insert batch (default: {BULK_BATCH_SIZE})")
 
     # Remove command
     rm_parser = subparsers.add_parser("remove", help="Remove a term from a glossary")
@@ -232,23 +1168,65 @@ Examples:
     rm_parser.add_argument("--from", dest="from_lang", required=True, help="Source language code")
     rm_parser.add_argument("--to", dest="to_lang", required=True, help="Target language code")
     rm_parser.add_argument("source", help="Source term to remove")
+    rm_parser.add_argument("--expect-version", type=int, default=None,
+                           help="Fail unless the glossary is still at this version")
 
     # List command
     list_parser = subparsers.add_parser("list", help="List glossary entries")
     list_parser.add_argument("--domain", default=None, help="Glossary domain (omit to list all)")
 
+    # Stats command
+    stats_parser = subparsers.add_parser("stats", help="Summarize all glossaries from the manifest")
+    stats_parser.add_argument("--json", action="store_true", help="Output as JSON")
+    stats_parser.add_argument("--rebuild", action="store_true", help="Re-index every glossary first")
+
+    # Lookup command
+    lookup_parser = subparsers.add_parser("lookup", help="Look up a term (exact, or --fuzzy)")
+    lookup_parser.add_argument("--domain", required=True, help="Glossary domain, or a stack like company,legal,general (first wins)")
+    lookup_parser.add_argument("--from", dest="from_lang", required=True, help="Source language code")
+    lookup_parser.add_argument("--to", dest="to_lang", required=True, help="Target language code")
+    lookup_parser.add_argument("--fuzzy", action="store_true",
+                               help="Closest terms, ignoring case, accents and small typos")
+    lookup_parser.add_argument("--top", type=int, default=5, help="Maximum fuzzy candidates (default: 5)")
+    lookup_parser.add_argument("--max-distance", type=int, default=2,
+                               help="Maximum edit distance for fuzzy candidates (default: 2)")
+    lookup_parser.add_argument("--json", action="store_true", help="Output as JSON")
+    lookup_parser.add_argument("term", help="Source term")
+
+    # Apply command
+    apply_parser = subparsers.add_parser("apply", help="Substitute glossary terms in text")
+    apply_parser.add_argument("--domain", required=True, help="Glossary domain, or a stack like company,legal,general (first wins)")
+    apply_parser.add_argument("--from", dest="from_lang", required=True, help="Source language code")
+    apply_parser.add_argument("--to", dest="to_lang", required=True, help="Target language code")
+    apply_parser.add_argument("--json", action="store_true", help="Output as JSON")
+    apply_parser.add_argument("text", nargs="?", default=None, help="Text (default: read stdin)")
+
+    # Serve command
+    serve_parser = subparsers.add_parser("serve", help="Run a resident NDJSON glossary worker")
+    serve_parser.add_argument("--socket", help="Listen on this Unix socket instead of stdin/stdout")
+
     # Export command
     export_parser = subparsers.add_parser("export", help="Export glossary to JSON file")
     export_parser.add_argument("--domain", required=True, help="Glossary domain name")
     export_parser.add_argument("--output", help="Output file path")
 
     # Import command
-    import_parser = subparsers.add_parser("import", help="Import glossary from JSON file")
-    import_parser.add_argument("--file", required=True, help="JSON file to import")
+    import_parser = subparsers.add_parser("import", help="Import glossary from JSON/NDJSON file (streamed)")
+    import_parser.add_argument("--file", required=True, help="JSON export, JSON array or NDJSON file")
+    import_parser.add_argument("--domain", default=None, help="Target domain (default: from file)")
+    import_parser.add_argument("--format", choices=["json", "ndjson"],
+                               help="Input format (default: from file extension)")
+    import_parser.add_argument("--on-conflict", choices=sorted(CONFLICT_POLICIES), default="keep",
+                               help="Existing terms: keep them, overwrite them, or keep the newest "
+                                    "by 'updated' (default: keep)")
+    import_parser.add_argument("--batch-size", type=int, default=BULK_BATCH_SIZE,
+                               help=f"Entries per insert batch (default: {BULK_BATCH_SIZE})")
 
     # Clear command
     clear_parser = subparsers.add_parser("clear", help="Clear all entries from a glossary")
     clear_parser.add_argument("--domain", required=True, help="Glossary domain name")
+    clear_parser.add_argument("--expect-version", type=int, default=None,
+                              help="Fail unless the glossary is still at this version")
 
     args = parser.parse_args()
 
@@ -258,14 +1236,23 @@ Examples:
 
     commands = {
         "add": cmd_add,
+        "bulk-add": cmd_bulk_add,
         "remove": cmd_remove,
         "list": cmd_list,
+        "stats": cmd_stats,
+        "lookup": cmd_lookup,
+        "apply": cmd_apply,
+        "serve": cmd_serve,
         "export": cmd_export,
         "import": cmd_import,
         "clear": cmd_clear,
     }
 
-    commands[args.command](args)
+    try:
+        commands[args.command](args)
+    except VersionConflict as e:
+        print(f"✗ Version conflict: {e}. Re-read the glossary and retry.", file=sys.stderr)
+        sys.exit(2)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,254 @@
+#!/usr/bin/env python3
+"""
+Glossary Term Matcher for Translator Pro v1.0.0
+Aho-Corasick automaton that finds every glossary term in a text in one pass.
+Author: Peru 🇵🇪
+
+Matching is case-insensitive and word-boundary aware, and overlapping hits
+are resolved leftmost-longest ("machine learning model" beats "machine
+learning" beats "machine"). The automaton is stored as flat arrays:
+transitions are sorted (state << 21 | codepoint) keys searched with bisect,
+so a compiled matcher is a handful of arrays that can be saved and loaded
+without rebuilding anything.
+"""
+
+import os
+import mmap
+import struct
+import tempfile
+from array import array
+from bisect import bisect_left
+from collections import deque
+
+CHAR_BITS = 21  # enough for any Unicode code point
+
+# Compiled-matcher file: header, then the flat arrays back to back
+CACHE_MAGIC = b'GLMC'
+CACHE_FORMAT = 1
+CACHE_HEADER = struct.Struct('<4sIQQQQQ')  # magic, format, stamp, keys, states, terms, blob bytes
+
+
+def fold(text: str) -> str:
+    """Lowercase text without changing its length, so offsets stay aligned."""
+    lowered = text.lower()
+    if len(lowered) == len(text):
+        return lowered
+    return ''.join(ch if len(ch.lower()) != 1 else ch.lower() for ch in text)
+
+
+def is_word_char(ch: str) -> bool:
+    return ch.isalnum() or ch == '_'
+
+
+class StringTable:
+    """Read-only list of `count` strings decoded lazily from a UTF-8 blob + offsets."""
+
+    def __init__(self, blob, offsets, start, count):
+        self.blob = blob
+        self.offsets = offsets
+        self.start = start
+        self.count = count
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, i):
+        if not 0 <= i < self.count:
+            raise IndexError(i)
+        i += self.start
+        return bytes(self.blob[self.offsets[i]:self.offsets[i + 1]]).decode('utf-8')
+
+
+class TermMatcher:
+    """Compiled multi-term matcher for one glossary language pair."""
+
+    def __init__(self, keys, targets, fail, out, depth, term, sources, replacements):
+        self.keys = keys                  # sorted transition keys: state << CHAR_BITS | ord(ch)
+        self.targets = targets            # next state for each key
+        self.fail = fail                  # failure link per state
+        self.out = out                    # nearest terminal state on the fail chain (0 = none)
+        self.depth = depth                # term length for terminal states
+        self.term = term                  # term index per state (-1 = not terminal)
+        self.sources = sources            # original source terms
+        self.replacements = replacements  # target terms
+
+    def __len__(self):
+        return len(self.sources)
+
+    @classmethod
+    def from_pairs(cls, pairs):
+        """Build a matcher from (source, target) pairs; later duplicates win."""
+        terms = {}
+        for source, target in pairs:
+            key = fold(source.strip())
+            if key:
+                terms[key] = (source, target)
+
+        children = [{}]
+        term = [-1]
+        depth = [0]
+        sources, replacements = [], []
+        for index, (key, (source, target)) in enumerate(terms.items()):
+            state = 0
+            for ch in key:
+                nxt = children[state].get(ch)
+                if nxt is None:
+                    nxt = len(children)
+                    children[state][ch] = nxt
+                    children.append({})
+                    term.append(-1)
+                    depth.append(depth[state] + 1)
+                state = nxt
+            term[state] = index
+            sources.append(source)
+            replacements.append(target)
+
+        # Breadth-first failure links, plus an output link to the nearest terminal state
+        n = len(children)
+        fail = array('i', bytes(4 * n))
+        out = array('i', bytes(4 * n))
+        queue = deque(children[0].values())
+        while queue:
+            state = queue.popleft()
+            out[state] = state if term[state] >= 0 else out[fail[state]]
+            for ch, nxt in children[state].items():
+                f = fail[state]
+                while f and ch not in children[f]:
+                    f = fail[f]
+                fail[nxt] = children[f].get(ch, 0) if children[f].get(ch, 0) != nxt else 0
+                queue.append(nxt)
+
+        transitions = sorted(
+            ((state << CHAR_BITS) | ord(ch), nxt)
+            for state, kids in enumerate(children) for ch, nxt in kids.items())
+        keys = array('q', (k for k, _ in transitions))
+        targets = array('i', (t for _, t in transitions))
+        return cls(keys, targets, fail, out, array('i', depth), array('i', term),
+                   sources, replacements)
+
+    def save(self, path, stamp: int):
+        """Write the compiled matcher to `path` atomically, tagged with `stamp`."""
+        strings = [s.encode('utf-8') for s in list(self.sources) + list(self.replacements)]
+        offsets = array('q', [0])
+        for b in strings:
+            offsets.append(offsets[-1] + len(b))
+        header = CACHE_HEADER.pack(CACHE_MAGIC, CACHE_FORMAT, stamp, len(self.keys),
+                                   len(self.fail), len(self.sources), offsets[-1])
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(header)
+                # 8-byte arrays first so every array starts aligned
+                for arr in (array('q', self.keys), offsets, array('i', self.targets), array('i', self.fail),
+                            array('i', self.out), array('i', self.depth), array('i', self.term)):
+                    arr.tofile(f)
+                for b in strings:
+                    f.write(b)
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+
+    @staticmethod
+    def read_stamp(path):
+        """Return the stamp of a cached matcher file, or None if unusable."""
+        try:
+            with open(path, 'rb') as f:
+                header = f.read(CACHE_HEADER.size)
+            magic, fmt, stamp = CACHE_HEADER.unpack(header)[:3]
+        except (OSError, struct.error):
+            return None
+        return stamp if magic == CACHE_MAGIC and fmt == CACHE_FORMAT else None
+
+    @classmethod
+    def load(cls, path):
+        """Memory-map a cached matcher; arrays are used in place without parsing."""
+        with open(path, 'rb') as f:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        view = memoryview(mm)
+        _, _, _, nkeys, nstates, nterms, _ = CACHE_HEADER.unpack_from(view)
+        pos = CACHE_HEADER.size
+
+        def take(typecode, count):
+            nonlocal pos
+            size = count * (8 if typecode == 'q' else 4)
+            arr = view[pos:pos + size].cast(typecode)
+            pos += size
+            return arr
+
+        keys = take('q', nkeys)
+        offsets = take('q', 2 * nterms + 1)
+        targets, fail, out, depth, term = (take('i', n) for n in (nkeys,) + (nstates,) * 4)
+        blob = view[pos:]
+        matcher = cls(keys, targets, fail, out, depth, term,
+                      StringTable(blob, offsets, 0, nterms), StringTable(blob, offsets, nterms, nterms))
+        matcher._mmap = mm  # keep the mapping alive
+        return matcher
+
+    def find(self, text: str):
+        """Return leftmost-longest, non-overlapping (start, end, term_index) matches."""
+        keys, targets, fail, out = self.keys, self.targets, self.fail, self.out
+        depth, term = self.depth, self.term
+        nkeys = len(keys)
+        folded = fold(text)
+        length = len(text)
+
+        best = {}  # start -> (length, term index)
+        state = 0
+        for i, ch in enumerate(folded):
+            c = ord(ch)
+            while True:
+                key = (state << CHAR_BITS) | c
+                j = bisect_left(keys, key)
+                if j < nkeys and keys[j] == key:
+                    state = targets[j]
+                    break
+                if state == 0:
+                    break
+                state = fail[state]
+
+            t = out[state]
+            if not t:
+                continue
+            end = i + 1
+            right_ok = end >= length or not is_word_char(text[end])
+            while t:
+                size = depth[t]
+                start = end - size
+                if ((right_ok or not is_word_char(ch))
+                        and (start == 0 or not is_word_char(text[start - 1])
+                             or not is_word_char(folded[start]))):
+                    if size > best.get(start, (0, 0))[0]:
+                        best[start] = (size, term[t])
+                t = out[fail[t]]
+
+        matches = []
+        pos = 0
+        for start in sorted(best):
+            if start < pos:
+                continue
+            size, index = best[start]
+            matches.append((start, start + size, index))
+            pos = start + size
+        return matches
+
+    def apply(self, text: str):
+        """Substitute every matched term in one pass.
+
+        Returns (new_text, hits) where hits lists (source, target) pairs in
+        order of first occurrence.
+        """
+        pieces = []
+        hits = {}
+        pos = 0
+        for start, end, index in self.find(text):
+            pieces.append(text[pos:start])
+            pieces.append(self.replacements[index])
+            hits.setdefault(index, None)
+            pos = end
+        pieces.append(text[pos:])
+        return ''.join(pieces), [(self.sources[i], self.replacements[i]) for i in hits]
+
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Translator Pro - Tests
+Run with: python3 -m unittest test_glossary   (or pytest)
+Every test works in a throwaway glossary directory.
+Author: Peru 🇵🇪
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import socket
+import tempfile
+import unittest
+import subprocess
+from pathlib import Path
+
+import glossary
+from bench import full_scan_search
+from fuzzy_index import FuzzyIndex, edit_distance
+
+SCRIPT = Path(__file__).parent.resolve() / "glossary.py"
+
+
+class ServeSocketTest(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.mkdtemp(prefix="glossary-test-")
+        self.env = dict(os.environ, **{glossary.GLOSSARY_DIR_ENV: self.dir})
+        self.socket = os.path.join(self.dir, "worker.sock")
+        subprocess.run([sys.executable, str(SCRIPT), "add", "--domain", "tech", "--from", "en", "--to", "es",
+                        "server", "servidor"], env=self.env, check=True, capture_output=True)
+        self.server = subprocess.Popen([sys.executable, str(SCRIPT), "serve", "--socket", self.socket],
+                                       env=self.env, stderr=subprocess.DEVNULL)
+        deadline = time.monotonic() + 10
+        while not os.path.exists(self.socket):
+            if time.monotonic() > deadline or self.server.poll() is not None:
+                self.fail("serve --socket did not start")
+            time.sleep(0.05)
+
+    def tearDown(self):
+        self.server.terminate()
+        self.server.wait(timeout=10)
+        shutil.rmtree(self.dir, ignore_errors=True)
+
+    def request(self, payload):
+        """One request on a fresh connection."""
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as conn:
+            conn.connect(self.socket)
+            conn.sendall((json.dumps(payload) + "\n").encode("utf-8"))
+            with conn.makefile("r", encoding="utf-8") as reply:
+                return json.loads(reply.readline())
+
+    def test_separate_connections_share_warm_stores(self):
+        payload = {"op": "apply", "domain": "tech", "from": "en", "to": "es", "text": "restart the server"}
+        for _ in range(3):
+            reply = self.request(payload)
+            self.assertNotIn("error", reply)
+            self.assertEqual(reply["text"], "restart the servidor")
+
+
+class FuzzyIndexTest(unittest.TestCase):
+    TERMS = [(f"config setting {i:04d}", f"ajuste {i}") for i in range(3000)] + [("deployment", "despliegue")]
+    QUERIES = ["config setting 01x3", "confg setting 2999", "config seting 1234", "deploymnt", "cfg"]
+
+    def test_rarest_first_matches_full_scan(self):
+        index = FuzzyIndex.from_pairs(self.TERMS)
+        for query in self.QUERIES:
+            self.assertEqual(index.search(query, top=1000), full_scan_search(index, query, top=1000))
+
+    def test_saved_index_searches_the_same(self):
+        index = FuzzyIndex.from_pairs(self.TERMS)
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "fuzzy.idx")
+            index.save(path, 7)
+            loaded = FuzzyIndex.load(path)
+            for query in self.QUERIES:
+                self.assertEqual(loaded.search(query), index.search(query))
+            del loaded
+
+    def test_edit_distance_is_capped_at_limit(self):
+        self.assertEqual(edit_distance("kitten", "sitting", 3), 3)
+        self.assertEqual(edit_distance("kitten", "sitting", 2), 3)
+        self.assertEqual(edit_distance("abcabc", "abcxabc", 1), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -15,6 +15,7 @@ JSON_OUTPUT=false
 GLOSSARY_DOMAIN=""
 API_CHOICE="auto"
 OUTPUT_FILE=""
+USE_MEMORY=true
 SCRIPT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)"
 
 # Colors
@@ -47,10 +48,12 @@ Options:
   --informal     Use informal register
   --file FILE    Translate file contents (line by line)
   --batch        Translate multiple arguments
-  --glossary DOM Use domain glossary for term mapping
+  --glossary DOM Use domain glossary for term mapping; a comma-separated
+                 stack (company,legal,general) layers domains, first wins
   --json         Output as JSON
   --api API      Force API: mymemory or libre (default: auto)
   --output FILE  Save output to file
+  --no-memory    Skip the local translation memory
   --help         Show this help message
 
 Supported Languages:
@@ -75,6 +78,59 @@ urlencode() {
         || printf '%s' "$string" | curl -Gso /dev/null -w '%{url_effective}' --data-urlencode @- '' 2>/dev/null | sed 's/^./?/;s/^.//;'
 }
 
+# Resident glossary.py worker: --file/--batch start one warm python3 for the
+# whole run instead of spawning several per line (see `glossary.py serve`)
+WORKER_IN=""
+WORKER_OUT=""
+
+start_worker() {
+    coproc GLOSSARY_WORKER { python3 "${SCRIPT_DIR}/glossary.py" serve 2>/dev/null; }
+    WORKER_IN="${GLOSSARY_WORKER[1]}"
+    WORKER_OUT="${GLOSSARY_WORKER[0]}"
+    trap stop_worker EXIT
+}
+
+stop_worker() {
+    if [[ -n "$WORKER_IN" ]]; then
+        exec {WORKER_IN}>&- 2>/dev/null || true
+        WORKER_IN=""
+    fi
+}
+
+worker_running() {
+    [[ -n "$WORKER_IN" ]]
+}
+
+# Quote a string as JSON without spawning a process
+json_str() {
+    local s="$1"
+    s=${s//\\/\\\\}
+    s=${s//\"/\\\"}
+    s=${s//$'\t'/\\t}
+    s=${s//$'\r'/\\r}
+    s=${s//$'\n'/\\n}
+    if [[ $s == *[[:cntrl:]]* ]]; then
+        # Any other control character must be \u00XX in JSON
+        local n hex ch
+        for (( n = 1; n < 32; n++ )); do
+            printf -v hex '%02x' "$n"
+            printf -v ch "\\x$hex"
+            s=${s//"$ch"/\\u00$hex}
+        done
+    fi
+    printf '"%s"' "$s"
+}
+
+# Send one NDJSON request to the worker; print the reply through a jq filter
+worker_call() {
+    local request="$1"
+    local filter="${2:-.text // empty}"
+    local reply
+    printf '%s\n' "$request" >&"$WORKER_IN"
+    IFS= read -r reply <&"$WORKER_OUT" || return 1
+    printf '%s' "$reply" | jq -r "$filter"
+}
+
 # Translate using MyMemory API
 translate_mymemory() {
     local text="$1"
@@ -90,7 +146,11 @@ translate_mymemory() {
     fi
 
     local encoded_text
-    encoded_text=$(python3 -c "import urllib.parse, sys; print(urllib.parse.quote(sys.argv[1]))" "$text" 2>/dev/null)
+    if worker_running; then
+        encoded_text=$(worker_call "{\"op\":\"urlencode\",\"text\":$(json_str "$text")}")
+    else
+        encoded_text=$(python3 -c "import urllib.parse, sys; print(urllib.parse.quote(sys.argv[1]))" "$text" 2>/dev/null)
+    fi
 
     local response
     response=$(curl -s --max-time 15 \
@@ -114,7 +174,9 @@ translate_mymemory() {
 
         # Get confidence as percentage
         local conf_pct
-        if [[ -n "$confidence" && "$confidence" != "null" ]]; then
+        if [[ -n "$confidence" && "$confidence" != "null" ]] && worker_running; then
+            conf_pct=$(worker_call "{\"op\":\"percent\",\"value\":$(json_str "$confidence")}" || echo "0")
+        elif [[ -n "$confidence" && "$confidence" != "null" ]]; then
             conf_pct=$(python3 -c "print(int(float('$confidence') * 100))" 2>/dev/null || echo "0")
         else
             conf_pct="0"
@@ -177,41 +239,51 @@ apply_glossary() {
     local from_lang="$3"
     local to_lang="$4"
 
-    local glossary_file="${SCRIPT_DIR}/.glossaries/${domain}.json"
-    if [[ ! -f "$glossary_file" ]]; then
+    # A stack ("company,legal,general") applies if any of its domains exists
+    local d found=false
+    local -a stack_domains
+    IFS=',' read -ra stack_domains <<< "$domain"
+    for d in "${stack_domains[@]}"; do
+        if [[ -f "${SCRIPT_DIR}/.glossaries/${d}.db" || -f "${SCRIPT_DIR}/.glossaries/${d}.json" ]]; then
+            found=true
+        fi
+    done
+    if [[ "$found" != true ]]; then
         echo "$text"
         return 0
     fi
 
-    # Use Python to apply glossary
-    python3 -c "
-import json, sys, re
-
-text = sys.argv[1]
-domain = sys.argv[2]
-from_lang = sys.argv[3]
-to_lang = sys.argv[4]
-glossary_file = sys.argv[5]
-
-with open(glossary_file, 'r') as f:
-    glossary = json.load(f)
-
-applied = []
-entries = glossary.get('entries', [])
-for entry in entries:
-    if entry.get('from_lang') == from_lang and entry.get('to_lang') == to_lang:
-        source_term = entry['source']
-        target_term = entry['target']
-        pattern = re.compile(re.escape(source_term), re.IGNORECASE)
-        if pattern.search(text):
-            text = pattern.sub(target_term, text)
-            applied.append(f'{source_term} -> {target_term}')
-
-# Print result and applied terms
-print(text)
-if applied:
-    print('GLOSSARY_APPLIED:' + '|||'.join(applied))
-" "$text" "$domain" "$from_lang" "$to_lang" "$glossary_file" 2>/dev/null || echo "$text"
+    # Single-pass Aho-Corasick substitution (see glossary.py apply)
+    if worker_running; then
+        worker_call "{\"op\":\"apply\",\"domain\":$(json_str "$domain"),\"from\":$(json_str "$from_lang"),\"to\":$(json_str "$to_lang"),\"text\":$(json_str "$text")}" \
+            '.text, (.glossary_applied // [] | if length > 0 then "GLOSSARY_APPLIED:" + join("|||") else empty end)' \
+            || echo "$text"
+        return 0
+    fi
+    python3 "${SCRIPT_DIR}/glossary.py" apply --domain "$domain" --from "$from_lang" --to "$to_lang" \
+        -- "$text" 2>/dev/null || echo "$text"
+}
+
+# Translation memory: exact-match lookup before any API call (see translation_memory.py)
+tm_lookup() {
+    local text="$1"
+    if worker_running; then
+        worker_call "{\"op\":\"tm_lookup\",\"domain\":$(json_str "$GLOSSARY_DOMAIN"),\"from\":$(json_str "$FROM_LANG"),\"to\":$(json_str "$TO_LANG"),\"mode\":$(json_str "$MODE"),\"text\":$(json_str "$text")}" || true
+        return 0
+    fi
+    python3 "${SCRIPT_DIR}/translation_memory.py" lookup --from "$FROM_LANG" --to "$TO_LANG" \
+        --mode "$MODE" --glossary "$GLOSSARY_DOMAIN" -- "$text" 2>/dev/null || true
+}
+
+tm_store() {
+    local text="$1"
+    local result="$2"
+    if worker_running; then
+        worker_call "{\"op\":\"tm_store\",\"domain\":$(json_str "$GLOSSARY_DOMAIN"),\"from\":$(json_str "$FROM_LANG"),\"to\":$(json_str "$TO_LANG"),\"mode\":$(json_str "$MODE"),\"text\":$(json_str "$text"),\"result\":$(json_str "$result")}" >/dev/null || true
+        return 0
+    fi
+    python3 "${SCRIPT_DIR}/translation_memory.py" store --from "$FROM_LANG" --to "$TO_LANG" \
+        --mode "$MODE" --glossary "$GLOSSARY_DOMAIN" --result "$result" -- "$text" 2>/dev/null || true
 }
 
 # Adjust register (formal/informal) - post-processing hint
@@ -251,6 +323,7 @@ adjust_register() {
 # Main translate function
 do_translate() {
     local text="$1"
+    local source_text="$1"
     local glossary_applied=""
 
     # Apply glossary pre-processing if requested
@@ -268,14 +341,25 @@ do_translate() {
 
     local result=""
 
+    # Served from translation memory when this exact request was seen before
+    if [[ "$USE_MEMORY" == true ]]; then
+        result=$(tm_lookup "$source_text")
+    fi
+
     # Try MyMemory first (or forced API)
-    if [[ "$API_CHOICE" == "auto" || "$API_CHOICE" == "mymemory" ]]; then
+    if [[ -z "$result" && ("$API_CHOICE" == "auto" || "$API_CHOICE" == "mymemory") ]]; then
         result=$(translate_mymemory "$text" "$FROM_LANG" "$TO_LANG" 2>/dev/null || true)
+        if [[ -n "$result" && "$USE_MEMORY" == true ]]; then
+            tm_store "$source_text" "$result"
+        fi
     fi
 
     # Fallback to LibreTranslate
     if [[ -z "$result" && ("$API_CHOICE" == "auto" || "$API_CHOICE" == "libre") ]]; then
         result=$(translate_libre "$text" "$FROM_LANG" "$TO_LANG" 2>/dev/null || true)
+        if [[ -n "$result" && "$USE_MEMORY" == true ]]; then
+            tm_store "$source_text" "$result"
+        fi
     fi
 
     if [[ -z "$result" ]]; then
@@ -310,7 +394,9 @@ do_translate() {
     fi
 
     # Output
-    if [[ "$JSON_OUTPUT" == true ]]; then
+    if [[ "$JSON_OUTPUT" == true ]] && worker_running; then
+        output_text "$(worker_call "{\"op\":\"format\",\"source_text\":$(json_str "$text"),\"translated_text\":$(json_str "$translated"),\"source_lang\":$(json_str "$source_lang"),\"target_lang\":$(json_str "$TO_LANG"),\"confidence\":$(json_str "$confidence"),\"api_used\":$(json_str "$api_used"),\"alternatives\":$(json_str "$alternatives"),\"glossary_applied\":$(json_str "$glossary_list"),\"mode\":$(json_str "$MODE")}")"
+    elif [[ "$JSON_OUTPUT" == true ]]; then
         local alt_json="[]"
         if [[ -n "$alternatives" ]]; then
             alt_json=$(echo "$alternatives" | python3 -c "import sys,json; print(json.dumps(sys.stdin.read().strip().split('|||')))" 2>/dev/null || echo "[]")
@@ -348,7 +434,7 @@ print(json.dumps(result, indent=2, ensure_ascii=False))
         display+="Source (${source_lang}): ${text}\n"
         display+="Target (${TO_LANG}): ${translated}\n"
         display+="Confidence: ${confidence}%\n"
-        display+="API: $(echo "$api_used" | sed 's/mymemory/MyMemory/;s/libretranslate/LibreTranslate/')\n"
+        display+="API: $(echo "$api_used" | sed 's/mymemory/MyMemory/;s/libretranslate/LibreTranslate/;s/^memory$/Translation memory/')\n"
         if [[ -n "$MODE" ]]; then
             display+="Mode: $(echo "$MODE" | sed 's/^./\U&/')\n"
         fi
@@ -415,6 +501,10 @@ while [[ $# -gt 0 ]]; do
             OUTPUT_FILE="$2"
             shift 2
             ;;
+        --no-memory)
+            USE_MEMORY=false
+            shift
+            ;;
         --help|-h)
             usage
             ;;
@@ -441,6 +531,7 @@ if [[ -n "$FILE_INPUT" ]]; then
         exit 1
     fi
     echo -e "${BLUE}📄 Translating file: ${FILE_INPUT}${NC}" >&2
+    start_worker
     line_num=0
     total_lines=$(wc -l < "$FILE_INPUT")
     while IFS= read -r line || [[ -n "$line" ]]; do
@@ -464,6 +555,7 @@ if [[ "$BATCH_MODE" == true ]]; then
         echo -e "${RED}✗ No text provided for batch translation.${NC}" >&2
         exit 1
     fi
+    start_worker
     if [[ "$JSON_OUTPUT" == true ]]; then
         output_text "["
     fi
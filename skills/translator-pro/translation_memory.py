@@ -0,0 +1,304 @@
+#!/usr/bin/env python3
+"""
+Translation Memory for Translator Pro v1.0.0
+Local cache of completed translations, consulted before any API call.
+Author: Peru 🇵🇪
+
+Entries are stored in SQLite (.translation-memory.db next to .glossaries/)
+keyed by (normalized source, from_lang, to_lang, mode, glossary domain,
+glossary version), so editing a glossary never serves stale output. The
+store is bounded by size and age with least-recently-used eviction, keeps
+hit/miss counters, and has a character-trigram index for fuzzy lookups.
+"""
+
+import re
+import sys
+import time
+import argparse
+import sqlite3
+from pathlib import Path
+
+from glossary import SCRIPT_DIR, stack_version
+
+TM_PATH = SCRIPT_DIR / ".translation-memory.db"
+MAX_BYTES = 64 * 1024 * 1024   # evict least-recently-used entries beyond this
+MAX_AGE_DAYS = 90              # evict entries unused for longer than this
+EVICT_EVERY = 100              # run eviction every N stores
+FUZZY_THRESHOLD = 0.75
+FUZZY_CANDIDATES = 50
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS tm (
+    id               INTEGER PRIMARY KEY,
+    source_key       TEXT NOT NULL,
+    from_lang        TEXT NOT NULL,
+    to_lang          TEXT NOT NULL,
+    mode             TEXT NOT NULL,
+    domain           TEXT NOT NULL,
+    glossary_version INTEGER NOT NULL,
+    source           TEXT NOT NULL,
+    translation      TEXT NOT NULL,
+    confidence       TEXT,
+    api              TEXT,
+    detected_lang    TEXT,
+    alternatives     TEXT,
+    gram_count       INTEGER NOT NULL,
+    size             INTEGER NOT NULL,
+    created          REAL NOT NULL,
+    last_used        REAL NOT NULL,
+    hits             INTEGER NOT NULL DEFAULT 0
+);
+CREATE UNIQUE INDEX IF NOT EXISTS tm_key
+    ON tm (source_key, from_lang, to_lang, mode, domain, glossary_version);
+CREATE INDEX IF NOT EXISTS tm_last_used ON tm (last_used);
+CREATE TABLE IF NOT EXISTS grams (
+    gram  TEXT NOT NULL,
+    tm_id INTEGER NOT NULL REFERENCES tm (id) ON DELETE CASCADE,
+    PRIMARY KEY (gram, tm_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS grams_tm ON grams (tm_id);
+CREATE TABLE IF NOT EXISTS counters (
+    name  TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+"""
+
+
+def normalize(text: str) -> str:
+    """Key form of a source string: trimmed, internal whitespace collapsed."""
+    return re.sub(r'\s+', ' ', text).strip()
+
+
+def trigrams(text: str) -> set:
+    """Character trigrams of a padded, lowercased string."""
+    padded = f"  {text.lower()} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class TranslationMemory:
+    """SQLite translation memory with LRU eviction and fuzzy lookup."""
+
+    def __init__(self, path=TM_PATH, max_bytes=MAX_BYTES, max_age_days=MAX_AGE_DAYS):
+        self.path = Path(path)
+        self.max_bytes = max_bytes
+        self.max_age_days = max_age_days
+        self.conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("PRAGMA foreign_keys=ON")
+        with self.conn:
+            self.conn.executescript(SCHEMA)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self.conn.close()
+
+    def _count(self, name: str, n: int = 1):
+        self.conn.execute(
+            "INSERT INTO counters (name, value) VALUES (?, ?) "
+            "ON CONFLICT (name) DO UPDATE SET value = value + excluded.value", (name, n))
+
+    def _key(self, source, from_lang, to_lang, mode, domain, version):
+        if version is None:
+            version = stack_version(domain or "")
+        return (normalize(source), from_lang, to_lang, mode or "", domain or "", version)
+
+    def lookup(self, source, from_lang, to_lang, mode="", domain="", version=None):
+        """Exact-match lookup; returns the stored entry as a dict, or None."""
+        key = self._key(source, from_lang, to_lang, mode, domain, version)
+        with self.conn:
+            row = self.conn.execute(
+                "SELECT * FROM tm WHERE source_key = ? AND from_lang = ? AND to_lang = ? "
+                "AND mode = ? AND domain = ? AND glossary_version = ?", key).fetchone()
+            if row is None:
+                self._count("misses")
+                return None
+            self.conn.execute("UPDATE tm SET last_used = ?, hits = hits + 1 WHERE id = ?",
+                              (time.time(), row["id"]))
+            self._count("hits")
+        return dict(row)
+
+    def store(self, source, translation, from_lang, to_lang, mode="", domain="", version=None,
+              confidence="", api="", detected_lang="", alternatives=""):
+        """Insert or refresh a completed translation."""
+        key = self._key(source, from_lang, to_lang, mode, domain, version)
+        grams = trigrams(key[0])
+        size = len(source.encode("utf-8")) + len(translation.encode("utf-8")) + len(alternatives.encode("utf-8"))
+        now = time.time()
+        with self.conn:
+            self.conn.execute(
+                "DELETE FROM tm WHERE source_key = ? AND from_lang = ? AND to_lang = ? "
+                "AND mode = ? AND domain = ? AND glossary_version = ?", key)
+            cur = self.conn.execute(
+                "INSERT INTO tm (source_key, from_lang, to_lang, mode, domain, glossary_version, "
+                "source, translation, confidence, api, detected_lang, alternatives, gram_count, "
+                "size, created, last_used) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                key + (source, translation, confidence, api, detected_lang, alternatives,
+                       len(grams), size, now, now))
+            self.conn.executemany("INSERT INTO grams (gram, tm_id) VALUES (?, ?)",
+                                  ((g, cur.lastrowid) for g in grams))
+            self._count("stores")
+            stores = self.conn.execute("SELECT value FROM counters WHERE name = 'stores'").fetchone()[0]
+        if stores % EVICT_EVERY == 0:
+            self.evict()
+
+    def fuzzy(self, source, from_lang, to_lang, mode="", domain="", version=None,
+              threshold=FUZZY_THRESHOLD, limit=5):
+        """Near matches scored by trigram Dice similarity, best first."""
+        key = self._key(source, from_lang, to_lang, mode, domain, version)
+        grams = trigrams(key[0])
+        if not grams:
+            return []
+        placeholders = ",".join("?" * len(grams))
+        # Filter on the key before the LIMIT so other language pairs and domains
+        # cannot crowd out candidates, and rank by Dice score rather than raw
+        # shared grams, which would favour long segments.
+        rows = self.conn.execute(
+            f"SELECT tm.*, shared FROM (SELECT grams.tm_id, COUNT(*) AS shared FROM grams "
+            f"JOIN tm ON tm.id = grams.tm_id "
+            f"WHERE grams.gram IN ({placeholders}) AND tm.from_lang = ? AND tm.to_lang = ? "
+            f"AND tm.mode = ? AND tm.domain = ? AND tm.glossary_version = ? "
+            f"GROUP BY grams.tm_id ORDER BY 2.0 * COUNT(*) / (? + tm.gram_count) DESC LIMIT ?) g "
+            f"JOIN tm ON tm.id = g.tm_id",
+            list(grams) + list(key[1:]) + [len(grams), FUZZY_CANDIDATES]).fetchall()
+        matches = []
+        for row in rows:
+            score = 2 * row["shared"] / (len(grams) + row["gram_count"])
+            if score >= threshold:
+                entry = dict(row)
+                entry["score"] = round(score, 3)
+                matches.append(entry)
+        matches.sort(key=lambda e: e["score"], reverse=True)
+        with self.conn:
+            self._count("fuzzy_hits" if matches else "fuzzy_misses")
+        return matches[:limit]
+
+    def evict(self) -> int:
+        """Drop entries past max age, then least-recently-used ones beyond max bytes."""
+        removed = 0
+        with self.conn:
+            if self.max_age_days:
+                cutoff = time.time() - self.max_age_days * 86400
+                removed += self.conn.execute("DELETE FROM tm WHERE last_used < ?", (cutoff,)).rowcount
+            total = self.conn.execute("SELECT COALESCE(SUM(size), 0) FROM tm").fetchone()[0]
+            if self.max_bytes and total > self.max_bytes:
+                excess, ids = total - self.max_bytes, []
+                for row in self.conn.execute("SELECT id, size FROM tm ORDER BY last_used"):
+                    if excess <= 0:
+                        break
+                    ids.append((row["id"],))
+                    excess -= row["size"]
+                self.conn.executemany("DELETE FROM tm WHERE id = ?", ids)
+                removed += len(ids)
+            if removed:
+                self._count("evictions", removed)
+        return removed
+
+    def stats(self) -> dict:
+        counters = {r["name"]: r["value"] for r in self.conn.execute("SELECT name, value FROM counters")}
+        entries, size = self.conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM tm").fetchone()
+        lookups = counters.get("hits", 0) + counters.get("misses", 0)
+        return {
+            "entries": entries,
+            "bytes": size,
+            "hits": counters.get("hits", 0),
+            "misses": counters.get("misses", 0),
+            "hit_rate": round(counters.get("hits", 0) / lookups, 3) if lookups else 0.0,
+            "fuzzy_hits": counters.get("fuzzy_hits", 0),
+            "stores": counters.get("stores", 0),
+            "evictions": counters.get("evictions", 0),
+        }
+
+    def clear(self) -> int:
+        with self.conn:
+            return self.conn.execute("DELETE FROM tm").rowcount
+
+
+def format_result(entry: dict) -> str:
+    """An entry in translate.sh's `text|||confidence|||api|||detected|||alternatives` form."""
+    return "|||".join([entry["translation"], entry.get("confidence") or "0", "memory",
+                       entry.get("detected_lang") or "", entry.get("alternatives") or ""])
+
+
+def parse_result(result: str) -> dict:
+    """Split a translate.sh result line into store() keyword arguments."""
+    parts = (result.split("|||") + [""] * 5)[:5]
+    if len(result.split("|||")) > 5:
+        parts[4] = "|||".join(result.split("|||")[4:])
+    return {"translation": parts[0], "confidence": parts[1], "api": parts[2],
+            "detected_lang": parts[3], "alternatives": parts[4]}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="💾 Translation Memory for Translator Pro")
+    subparsers = parser.add_subparsers(dest="command", help="Command to run")
+
+    def add_key_args(p):
+        p.add_argument("--from", dest="from_lang", default="auto", help="Source language code")
+        p.add_argument("--to", dest="to_lang", default="en", help="Target language code")
+        p.add_argument("--mode", default="", help="formal, informal or empty")
+        p.add_argument("--glossary", default="", help="Glossary domain used for the translation")
+        p.add_argument("source", help="Source text")
+
+    lookup_parser = subparsers.add_parser("lookup", help="Exact lookup; prints a translate.sh result line")
+    add_key_args(lookup_parser)
+
+    fuzzy_parser = subparsers.add_parser("fuzzy", help="List near matches above a threshold")
+    add_key_args(fuzzy_parser)
+    fuzzy_parser.add_argument("--threshold", type=float, default=FUZZY_THRESHOLD,
+                              help=f"Minimum similarity (default: {FUZZY_THRESHOLD})")
+    fuzzy_parser.add_argument("--limit", type=int, default=5, help="Maximum matches")
+
+    store_parser = subparsers.add_parser("store", help="Store a translate.sh result line")
+    add_key_args(store_parser)
+    store_parser.add_argument("--result", required=True, help="text|||confidence|||api|||detected|||alternatives")
+
+    subparsers.add_parser("stats", help="Show size and hit/miss counters")
+    subparsers.add_parser("evict", help="Run size/age eviction now")
+    subparsers.add_parser("clear", help="Delete every entry")
+
+    args = parser.parse_args()
+    if not args.command:
+        parser.print_help()
+        sys.exit(1)
+
+    with TranslationMemory() as tm:
+        if args.command == "lookup":
+            entry = tm.lookup(args.source, args.from_lang, args.to_lang, args.mode, args.glossary)
+            if entry:
+                print(format_result(entry))
+        elif args.command == "fuzzy":
+            matches = tm.fuzzy(args.source, args.from_lang, args.to_lang, args.mode, args.glossary,
+                               threshold=args.threshold, limit=args.limit)
+            if not matches:
+                print("No near matches.")
+            for m in matches:
+                print(f"  {m['score']:.2f}  {m['source']}  →  {m['translation']}")
+        elif args.command == "store":
+            tm.store(args.source, from_lang=args.from_lang, to_lang=args.to_lang, mode=args.mode,
+                     domain=args.glossary, **parse_result(args.result))
+        elif args.command == "stats":
+            stats = tm.stats()
+            print("\n💾 Translation Memory")
+            print("─" * 40)
+            print(f"  Entries:    {stats['entries']}")
+            print(f"  Size:       {stats['bytes'] / 1024:.1f} KB")
+            print(f"  Hits:       {stats['hits']}  (hit rate {stats['hit_rate']:.0%})")
+            print(f"  Misses:     {stats['misses']}")
+            print(f"  Fuzzy hits: {stats['fuzzy_hits']}")
+            print(f"  Evictions:  {stats['evictions']}")
+            print("─" * 40)
+        elif args.command == "evict":
+            print(f"🧹 Evicted {tm.evict()} entries")
+        elif args.command == "clear":
+            print(f"🗑️  Cleared {tm.clear()} entries")
+
+
+if __name__ == "__main__":
+    main()